@@ -6,7 +6,8 @@ https://smartsolution.developer.lge.com/ko/apiManage/thinq_connect?s=17623267465
 """
 
 import sys
-from typing import Dict, Any, Optional
+import logging
+from typing import Dict, Any, List, Optional
 import json
 
 # test.py에서 필요한 함수들 import
@@ -16,19 +17,29 @@ from test import (
     get_device_state,
     send_device_command
 )
+from thinq_logging import logger, pretty, fields
+from command_gate import command_gate
+from device_profiles import (
+    profile_cache,
+    get_profile_properties,
+    validate_enum,
+    clamp_temperature
+)
 import requests
 
 # 에어컨 디바이스 ID (이미지에서 확인된 ID)
 AIR_CONDITIONER_DEVICE_ID = "d9464856ccf8457aa9b09712905eca9f48eee5ebdb468400efd8569752302075"
 
 
-def get_air_conditioner_state(device_id: str = None, country: str = "KR") -> Dict[str, Any]:
+def get_air_conditioner_state(device_id: str = None, country: str = "KR", store=None) -> Dict[str, Any]:
     """
     에어컨의 현재 상태를 조회합니다.
     
     Args:
         device_id: 디바이스 ID (None이면 기본값 사용)
         country: ISO 3166-1 alpha-2 국가 코드 (예: KR, US, GB)
+        store: 푸시 이벤트 상태 저장소 (device_events.DeviceStateStore)
+               저장된 상태가 있으면 API를 호출하지 않고, 없으면 조회한 전체 상태를 저장합니다.
     
     Returns:
         API 응답 (JSON) - 에어컨 상태 포함
@@ -36,10 +47,16 @@ def get_air_conditioner_state(device_id: str = None, country: str = "KR") -> Dic
     if device_id is None:
         device_id = AIR_CONDITIONER_DEVICE_ID
     
-    print(f"\n{'=' * 80}")
-    print(f"❄️  에어컨 상태 조회")
-    print(f"{'=' * 80}")
-    print(f"디바이스 ID: {device_id}")
+    # MQTT 푸시로 갱신되는 상태 저장소 우선
+    if store is not None:
+        pushed_state = store.get(device_id)
+        if pushed_state is not None:
+            return {'response': pushed_state}
+    
+    logger.debug("\n%s", '=' * 80)
+    logger.debug("❄️  에어컨 상태 조회")
+    logger.debug("%s", '=' * 80)
+    logger.debug("디바이스 ID: %s", device_id)
     
     try:
         state_response = get_device_state(device_id, country=country)
@@ -48,13 +65,13 @@ def get_air_conditioner_state(device_id: str = None, country: str = "KR") -> Dic
         state = None
         
         # 응답 구조 분석
-        print(f"\n🔍 응답 구조 분석:")
-        print(f"   최상위 키: {list(state_response.keys())}")
+        logger.debug("\n🔍 응답 구조 분석:")
+        logger.debug("   최상위 키: %s", list(state_response.keys()))
         
         # 1. response 객체 확인 (OpenAPI 스펙에 따르면 여기에 있음)
         if 'response' in state_response:
             response = state_response['response']
-            print(f"   'response' 타입: {type(response)}")
+            logger.debug("   'response' 타입: %s", type(response))
             if isinstance(response, dict):
                 # response가 객체인 경우
                 if 'value' in response:
@@ -70,7 +87,7 @@ def get_air_conditioner_state(device_id: str = None, country: str = "KR") -> Dic
         # 2. result.value 경로 확인
         if state is None and 'result' in state_response:
             result = state_response['result']
-            print(f"   'result' 타입: {type(result)}")
+            logger.debug("   'result' 타입: %s", type(result))
             if isinstance(result, dict):
                 if 'value' in result:
                     state = result['value']
@@ -84,19 +101,21 @@ def get_air_conditioner_state(device_id: str = None, country: str = "KR") -> Dic
                 state = state_response['value']
         
         if state:
-            print(f"   ✅ 상태 정보를 찾았습니다!")
-            print_state_info(state)
+            logger.debug("   ✅ 상태 정보를 찾았습니다!")
+            if logger.isEnabledFor(logging.DEBUG):
+                print_state_info(state)
+            if store is not None:
+                store.replace(device_id, state)
             return state_response
         else:
-            print(f"\n⚠️  상태 정보를 찾을 수 없습니다.")
-            print(f"응답 구조:")
-            print(json.dumps(state_response, indent=2, ensure_ascii=False))
+            logger.warning("\n⚠️  상태 정보를 찾을 수 없습니다.")
+            logger.debug("응답 구조:")
+            logger.debug("%s", pretty(state_response))
             return state_response
     
     except Exception as e:
-        print(f"❌ 에어컨 상태 조회 실패: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.error("❌ 에어컨 상태 조회 실패: %s", e, extra=fields(device_id=device_id))
+        logger.debug("상세 오류", exc_info=True)
         raise
 
 
@@ -107,23 +126,23 @@ def print_state_info(state: Dict[str, Any]):
     Args:
         state: 에어컨 상태 데이터
     """
-    print(f"\n📊 현재 상태:")
-    print(f"{'─' * 80}")
+    logger.debug("\n📊 현재 상태:")
+    logger.debug("%s", '─' * 80)
     
     # 작동 모드
     if 'airConJobMode' in state:
         job_mode = state['airConJobMode'].get('currentJobMode', 'N/A')
-        print(f"   🔧 작동 모드: {job_mode}")
+        logger.debug("   🔧 작동 모드: %s", job_mode)
     
     # 전원 상태
     if 'operation' in state:
         operation = state['operation']
         if 'airConOperationMode' in operation:
             power_status = operation['airConOperationMode']
-            print(f"   ⚡ 전원: {power_status}")
+            logger.debug("   ⚡ 전원: %s", power_status)
         if 'airCleanOperationMode' in operation:
             air_clean = operation['airCleanOperationMode']
-            print(f"   🌬️  공기청정 모드: {air_clean}")
+            logger.debug("   🌬️  공기청정 모드: %s", air_clean)
     
     # 온도 정보
     if 'temperature' in state:
@@ -131,60 +150,267 @@ def print_state_info(state: Dict[str, Any]):
         current = temp.get('currentTemperature', 'N/A')
         target = temp.get('targetTemperature', 'N/A')
         unit = temp.get('unit', 'C')
-        print(f"   🌡️  현재 온도: {current}°{unit}")
-        print(f"   🎯 목표 온도: {target}°{unit}")
+        logger.debug("   🌡️  현재 온도: %s°%s", current, unit)
+        logger.debug("   🎯 목표 온도: %s°%s", target, unit)
     
     # 풍량
     if 'airFlow' in state:
         wind_strength = state['airFlow'].get('windStrength', 'N/A')
-        print(f"   💨 풍량: {wind_strength}")
+        logger.debug("   💨 풍량: %s", wind_strength)
     
     # 풍향
     if 'windDirection' in state:
         wind_dir = state['windDirection']
-        print(f"   🧭 풍향 설정:")
+        logger.debug("   🧭 풍향 설정:")
         for key, value in wind_dir.items():
             if value:
-                print(f"      • {key}: {'ON' if value else 'OFF'}")
+                logger.debug("      • %s: %s", key, 'ON' if value else 'OFF')
     
     # 공기질 센서
     if 'airQualitySensor' in state:
         sensor = state['airQualitySensor']
-        print(f"   🌍 공기질 정보:")
+        logger.debug("   🌍 공기질 정보:")
         if 'PM1' in sensor:
-            print(f"      • PM1: {sensor['PM1']}")
+            logger.debug("      • PM1: %s", sensor['PM1'])
         if 'PM2' in sensor:
-            print(f"      • PM2.5: {sensor['PM2']}")
+            logger.debug("      • PM2.5: %s", sensor['PM2'])
         if 'PM10' in sensor:
-            print(f"      • PM10: {sensor['PM10']}")
+            logger.debug("      • PM10: %s", sensor['PM10'])
         if 'humidity' in sensor:
-            print(f"      • 습도: {sensor['humidity']}%")
+            logger.debug("      • 습도: %s%%", sensor['humidity'])
     
     # 필터 정보
     if 'filterInfo' in state:
         filter_info = state['filterInfo']
         if 'filterRemainPercent' in filter_info:
-            print(f"   🔍 필터 잔여율: {filter_info['filterRemainPercent']}%")
+            logger.debug("   🔍 필터 잔여율: %s%%", filter_info['filterRemainPercent'])
     
     # 타이머
     if 'timer' in state:
         timer = state['timer']
-        print(f"   ⏰ 타이머:")
+        logger.debug("   ⏰ 타이머:")
         if 'absoluteStartTimer' in timer:
-            print(f"      • 시작 타이머: {timer['absoluteStartTimer']}")
+            logger.debug("      • 시작 타이머: %s", timer['absoluteStartTimer'])
         if 'absoluteStopTimer' in timer:
-            print(f"      • 종료 타이머: {timer['absoluteStopTimer']}")
+            logger.debug("      • 종료 타이머: %s", timer['absoluteStopTimer'])
     
     if 'sleepTimer' in state:
         sleep_timer = state['sleepTimer']
         if 'relativeStopTimer' in sleep_timer:
-            print(f"   😴 수면 타이머: {sleep_timer['relativeStopTimer']}")
+            logger.debug("   😴 수면 타이머: %s", sleep_timer['relativeStopTimer'])
+    
+    logger.debug("%s", '─' * 80)
+
+
+# 한글 입력 → API 값 변환
+JOB_MODE_MAP = {
+    "냉방": "COOL",
+    "제습": "AIR_DRY",
+    "공기청정": "AIR_CLEAN",
+    "자동": "AUTO"
+}
+
+WIND_STRENGTH_MAP = {
+    "강": "HIGH",
+    "중": "MID",
+    "약": "LOW",
+    "자동": "AUTO"
+}
+
+
+def build_temperature_command(target_temp: float, unit: str = "C") -> Dict[str, Any]:
+    """목표 온도 설정 명령을 생성합니다."""
+    if target_temp is None:
+        raise ValueError("목표 온도를 지정해주세요.")
+    
+    return {
+        "temperature": {
+            "targetTemperature": target_temp,
+            "unit": unit
+        }
+    }
+
+
+def build_job_mode_command(mode: str) -> Dict[str, Any]:
+    """작동 모드 설정 명령을 생성합니다. (한글 입력 시 영어로 변환)"""
+    return {
+        "airConJobMode": {
+            "currentJobMode": JOB_MODE_MAP.get(mode, mode)
+        }
+    }
+
+
+def build_wind_strength_command(strength: str) -> Dict[str, Any]:
+    """풍량 설정 명령을 생성합니다. (한글 입력 시 영어로 변환)"""
+    return {
+        "airFlow": {
+            "windStrength": WIND_STRENGTH_MAP.get(strength, strength)
+        }
+    }
+
+
+def build_wind_direction_command(direction: str, enabled: bool = True) -> Dict[str, Any]:
+    """풍향 설정 명령을 생성합니다."""
+    if direction is None:
+        raise ValueError("풍향 종류를 지정해주세요.")
+    
+    return {
+        "windDirection": {
+            direction: enabled
+        }
+    }
+
+
+def build_power_command(power_on: bool = True) -> Dict[str, Any]:
+    """전원 설정 명령을 생성합니다."""
+    return {
+        "operation": {
+            "airConOperationMode": "POWER_ON" if power_on else "POWER_OFF"
+        }
+    }
+
+
+def build_timer_command(start_hour: int = None, start_minute: int = None,
+                        stop_hour: int = None, stop_minute: int = None) -> Dict[str, Any]:
+    """타이머 설정 명령을 생성합니다."""
+    command = {}
+    
+    if start_hour is not None and start_minute is not None:
+        command["absoluteHourToStart"] = start_hour
+        command["absoluteMinuteToStart"] = start_minute
+    
+    if stop_hour is not None and stop_minute is not None:
+        command["absoluteHourToStop"] = stop_hour
+        command["absoluteMinuteToStop"] = stop_minute
+    
+    if not command:
+        raise ValueError("타이머 정보를 입력해주세요.")
     
-    print(f"{'─' * 80}")
+    return {
+        "timer": command
+    }
+
+
+def merge_commands(*commands: Dict[str, Any]) -> Dict[str, Any]:
+    """여러 제어 명령을 하나의 제어 payload로 합칩니다. (같은 리소스는 속성 단위로 병합)"""
+    merged = {}
+    for command in commands:
+        for resource, attributes in command.items():
+            if isinstance(attributes, dict):
+                merged.setdefault(resource, {}).update(attributes)
+            else:
+                merged[resource] = attributes
+    return merged
+
+
+def get_writable_attributes(profile: Dict[str, Any]) -> set:
+    """
+    디바이스 프로파일에서 쓰기 가능한 (리소스, 속성) 목록을 구합니다.
+    
+    Args:
+        profile: get_device_profile() 응답 또는 그 안의 프로파일 객체
+    """
+    writable = set()
+    for resource, attributes in get_profile_properties(profile).items():
+        if not isinstance(attributes, dict):
+            continue
+        for attribute, spec in attributes.items():
+            if isinstance(spec, dict) and 'w' in spec.get('mode', []):
+                writable.add((resource, attribute))
+    return writable
+
+
+def plan_control_commands(commands: List[Dict[str, Any]], profile: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+    """
+    제어 명령 목록을 실제로 보낼 payload 목록으로 만듭니다.
+    
+    프로파일에서 모든 속성이 쓰기 가능한 명령은 하나의 payload로 합치고(첫 명령 위치에서 전송),
+    그렇지 않은 명령은 원래 순서대로 따로 보냅니다. 프로파일이 없으면 전부 합칩니다.
+    
+    Args:
+        commands: build_*_command()로 만든 명령 목록 (적용 순서대로)
+        profile: 디바이스 프로파일 (None이면 확인하지 않음)
+    
+    Returns:
+        순서대로 전송할 payload 목록
+    """
+    if profile is None:
+        return [merge_commands(*commands)] if commands else []
+    
+    writable = get_writable_attributes(profile)
+    payloads = []
+    merged_index = None
+    mergeable = []
+    for command in commands:
+        # unit은 값의 단위를 나타낼 뿐이므로 쓰기 권한을 확인하지 않음
+        attributes = [(resource, attribute) for resource, value in command.items()
+                      for attribute in (value if isinstance(value, dict) else [None])
+                      if attribute != 'unit']
+        if all(attribute in writable for attribute in attributes):
+            if merged_index is None:
+                merged_index = len(payloads)
+                payloads.append(None)
+            mergeable.append(command)
+        else:
+            payloads.append(command)
+    
+    if merged_index is not None:
+        payloads[merged_index] = merge_commands(*mergeable)
+    return payloads
+
+
+def validate_command_values(profile: Dict[str, Any], mode: str = None, target_temp: float = None,
+                            unit: str = "C", wind_strength: str = None) -> Dict[str, Any]:
+    """
+    디바이스 프로파일로 제어 값을 검증합니다. (한글 입력은 영어로 변환, 온도는 허용 범위로 맞춤)
+    
+    Raises:
+        ValueError: 디바이스가 지원하지 않는 모드/풍량
+    
+    Returns:
+        {'mode', 'target_temp', 'wind_strength'} - 검증된 값 (지정하지 않은 항목은 None)
+    """
+    if mode is not None:
+        mode = JOB_MODE_MAP.get(mode, mode)
+    if wind_strength is not None:
+        wind_strength = WIND_STRENGTH_MAP.get(wind_strength, wind_strength)
+    
+    if profile is not None:
+        if mode is not None:
+            mode = validate_enum(profile, "airConJobMode", "currentJobMode", mode)
+        if target_temp is not None:
+            target_temp = clamp_temperature(profile, target_temp, unit)
+        if wind_strength is not None:
+            wind_strength = validate_enum(profile, "airFlow", "windStrength", wind_strength)
+    
+    return {
+        'mode': mode,
+        'target_temp': target_temp,
+        'wind_strength': wind_strength
+    }
+
+
+def send_gated_command(device_id: str, command: Dict[str, Any], country: str = "KR",
+                       charge: bool = True) -> Dict[str, Any]:
+    """
+    속도 제한/중복 제거를 거쳐 제어 명령을 전송합니다. (command_gate.py)
+    
+    charge=False면 속도 제한 토큰을 쓰지 않습니다 (이미 토큰을 쓴 요청을 나누어 다시 보낼 때).
+    
+    Raises:
+        CommandRateLimited: 디바이스별 명령 속도 제한 초과
+    
+    Returns:
+        API 응답 (JSON), 이미 적용된 값뿐이면 {'deduplicated': True}
+    """
+    return command_gate.submit(
+        device_id, command, lambda payload: send_device_command(device_id, payload, country=country),
+        charge=charge
+    )
 
 
 def set_temperature(device_id: str = None, target_temp: float = None, unit: str = "C", 
-                   country: str = "KR") -> Dict[str, Any]:
+                   country: str = "KR", validate: bool = True) -> Dict[str, Any]:
     """
     에어컨 목표 온도를 설정합니다.
     
@@ -193,6 +419,7 @@ def set_temperature(device_id: str = None, target_temp: float = None, unit: str
         target_temp: 목표 온도
         unit: 온도 단위 ("C" 또는 "F")
         country: ISO 3166-1 alpha-2 국가 코드
+        validate: True면 디바이스 프로파일의 허용 범위로 온도를 맞춤
     
     Returns:
         API 응답 (JSON)
@@ -200,30 +427,27 @@ def set_temperature(device_id: str = None, target_temp: float = None, unit: str
     if device_id is None:
         device_id = AIR_CONDITIONER_DEVICE_ID
     
-    if target_temp is None:
-        raise ValueError("목표 온도를 지정해주세요.")
+    if validate and target_temp is not None:
+        profile = profile_cache.get_or_none(device_id, country)
+        target_temp = validate_command_values(profile, target_temp=target_temp, unit=unit)['target_temp']
     
-    command = {
-        "temperature": {
-            "targetTemperature": target_temp,
-            "unit": unit
-        }
-    }
+    command = build_temperature_command(target_temp, unit)
     
-    print(f"\n{'=' * 80}")
-    print(f"🌡️  온도 설정: {target_temp}°{unit}")
-    print(f"{'=' * 80}")
+    logger.debug("\n%s", '=' * 80)
+    logger.debug("🌡️  온도 설정: %s°%s", target_temp, unit)
+    logger.debug("%s", '=' * 80)
     
     try:
-        response = send_device_command(device_id, command, country=country)
-        print(f"✅ 온도 설정 성공!")
+        response = send_gated_command(device_id, command, country=country)
+        logger.info("✅ 온도 설정 성공!")
         return response
     except Exception as e:
-        print(f"❌ 온도 설정 실패: {e}")
+        logger.error("❌ 온도 설정 실패: %s", e)
         raise
 
 
-def set_job_mode(device_id: str = None, mode: str = "COOL", country: str = "KR") -> Dict[str, Any]:
+def set_job_mode(device_id: str = None, mode: str = "COOL", country: str = "KR",
+                 validate: bool = True) -> Dict[str, Any]:
     """
     에어컨 작동 모드를 설정합니다.
     
@@ -231,6 +455,7 @@ def set_job_mode(device_id: str = None, mode: str = "COOL", country: str = "KR")
         device_id: 디바이스 ID (None이면 기본값 사용)
         mode: 작동 모드 ("COOL", "AIR_DRY", "AIR_CLEAN", "AUTO" 등)
         country: ISO 3166-1 alpha-2 국가 코드
+        validate: True면 디바이스 프로파일에서 지원하는 모드인지 확인 (아니면 ValueError)
     
     Returns:
         API 응답 (JSON)
@@ -238,37 +463,28 @@ def set_job_mode(device_id: str = None, mode: str = "COOL", country: str = "KR")
     if device_id is None:
         device_id = AIR_CONDITIONER_DEVICE_ID
     
-    mode_map = {
-        "냉방": "COOL",
-        "제습": "AIR_DRY",
-        "공기청정": "AIR_CLEAN",
-        "자동": "AUTO"
-    }
-    
-    # 한글 입력 시 영어로 변환
-    if mode in mode_map:
-        mode = mode_map[mode]
+    if validate:
+        profile = profile_cache.get_or_none(device_id, country)
+        mode = validate_command_values(profile, mode=mode)['mode']
     
-    command = {
-        "airConJobMode": {
-            "currentJobMode": mode
-        }
-    }
+    command = build_job_mode_command(mode)
+    mode = command["airConJobMode"]["currentJobMode"]
     
-    print(f"\n{'=' * 80}")
-    print(f"🔧 작동 모드 설정: {mode}")
-    print(f"{'=' * 80}")
+    logger.debug("\n%s", '=' * 80)
+    logger.debug("🔧 작동 모드 설정: %s", mode)
+    logger.debug("%s", '=' * 80)
     
     try:
-        response = send_device_command(device_id, command, country=country)
-        print(f"✅ 작동 모드 설정 성공!")
+        response = send_gated_command(device_id, command, country=country)
+        logger.info("✅ 작동 모드 설정 성공!")
         return response
     except Exception as e:
-        print(f"❌ 작동 모드 설정 실패: {e}")
+        logger.error("❌ 작동 모드 설정 실패: %s", e)
         raise
 
 
-def set_wind_strength(device_id: str = None, strength: str = "AUTO", country: str = "KR") -> Dict[str, Any]:
+def set_wind_strength(device_id: str = None, strength: str = "AUTO", country: str = "KR",
+                      validate: bool = True) -> Dict[str, Any]:
     """
     에어컨 풍량을 설정합니다.
     
@@ -276,6 +492,7 @@ def set_wind_strength(device_id: str = None, strength: str = "AUTO", country: st
         device_id: 디바이스 ID (None이면 기본값 사용)
         strength: 풍량 ("HIGH", "MID", "LOW", "AUTO")
         country: ISO 3166-1 alpha-2 국가 코드
+        validate: True면 디바이스 프로파일에서 지원하는 풍량인지 확인 (아니면 ValueError)
     
     Returns:
         API 응답 (JSON)
@@ -283,33 +500,23 @@ def set_wind_strength(device_id: str = None, strength: str = "AUTO", country: st
     if device_id is None:
         device_id = AIR_CONDITIONER_DEVICE_ID
     
-    strength_map = {
-        "강": "HIGH",
-        "중": "MID",
-        "약": "LOW",
-        "자동": "AUTO"
-    }
+    if validate:
+        profile = profile_cache.get_or_none(device_id, country)
+        strength = validate_command_values(profile, wind_strength=strength)['wind_strength']
     
-    # 한글 입력 시 영어로 변환
-    if strength in strength_map:
-        strength = strength_map[strength]
+    command = build_wind_strength_command(strength)
+    strength = command["airFlow"]["windStrength"]
     
-    command = {
-        "airFlow": {
-            "windStrength": strength
-        }
-    }
-    
-    print(f"\n{'=' * 80}")
-    print(f"💨 풍량 설정: {strength}")
-    print(f"{'=' * 80}")
+    logger.debug("\n%s", '=' * 80)
+    logger.debug("💨 풍량 설정: %s", strength)
+    logger.debug("%s", '=' * 80)
     
     try:
-        response = send_device_command(device_id, command, country=country)
-        print(f"✅ 풍량 설정 성공!")
+        response = send_gated_command(device_id, command, country=country)
+        logger.info("✅ 풍량 설정 성공!")
         return response
     except Exception as e:
-        print(f"❌ 풍량 설정 실패: {e}")
+        logger.error("❌ 풍량 설정 실패: %s", e)
         raise
 
 
@@ -331,25 +538,18 @@ def set_wind_direction(device_id: str = None, direction: str = None, enabled: bo
     if device_id is None:
         device_id = AIR_CONDITIONER_DEVICE_ID
     
-    if direction is None:
-        raise ValueError("풍향 종류를 지정해주세요.")
-    
-    command = {
-        "windDirection": {
-            direction: enabled
-        }
-    }
+    command = build_wind_direction_command(direction, enabled)
     
-    print(f"\n{'=' * 80}")
-    print(f"🧭 풍향 설정: {direction} = {enabled}")
-    print(f"{'=' * 80}")
+    logger.debug("\n%s", '=' * 80)
+    logger.debug("🧭 풍향 설정: %s = %s", direction, enabled)
+    logger.debug("%s", '=' * 80)
     
     try:
-        response = send_device_command(device_id, command, country=country)
-        print(f"✅ 풍향 설정 성공!")
+        response = send_gated_command(device_id, command, country=country)
+        logger.info("✅ 풍향 설정 성공!")
         return response
     except Exception as e:
-        print(f"❌ 풍향 설정 실패: {e}")
+        logger.error("❌ 풍향 설정 실패: %s", e)
         raise
 
 
@@ -368,24 +568,18 @@ def set_power(device_id: str = None, power_on: bool = True, country: str = "KR")
     if device_id is None:
         device_id = AIR_CONDITIONER_DEVICE_ID
     
-    power_mode = "POWER_ON" if power_on else "POWER_OFF"
+    command = build_power_command(power_on)
     
-    command = {
-        "operation": {
-            "airConOperationMode": power_mode
-        }
-    }
-    
-    print(f"\n{'=' * 80}")
-    print(f"⚡ 전원 {'켜기' if power_on else '끄기'}")
-    print(f"{'=' * 80}")
+    logger.debug("\n%s", '=' * 80)
+    logger.debug("⚡ 전원 %s", '켜기' if power_on else '끄기')
+    logger.debug("%s", '=' * 80)
     
     try:
-        response = send_device_command(device_id, command, country=country)
-        print(f"✅ 전원 설정 성공!")
+        response = send_gated_command(device_id, command, country=country)
+        logger.info("✅ 전원 설정 성공!")
         return response
     except Exception as e:
-        print(f"❌ 전원 설정 실패: {e}")
+        logger.error("❌ 전원 설정 실패: %s", e)
         raise
 
 
@@ -408,38 +602,115 @@ def set_timer(device_id: str = None, start_hour: int = None, start_minute: int =
     if device_id is None:
         device_id = AIR_CONDITIONER_DEVICE_ID
     
-    command = {}
+    timer_command = build_timer_command(start_hour, start_minute, stop_hour, stop_minute)
     
-    if start_hour is not None and start_minute is not None:
-        command["absoluteHourToStart"] = start_hour
-        command["absoluteMinuteToStart"] = start_minute
+    logger.debug("\n%s", '=' * 80)
+    logger.debug("⏰ 타이머 설정")
+    if start_hour is not None:
+        logger.debug("   시작: %02d:%02d", start_hour, start_minute)
+    if stop_hour is not None:
+        logger.debug("   종료: %02d:%02d", stop_hour, stop_minute)
+    logger.debug("%s", '=' * 80)
     
-    if stop_hour is not None and stop_minute is not None:
-        command["absoluteHourToStop"] = stop_hour
-        command["absoluteMinuteToStop"] = stop_minute
+    try:
+        response = send_gated_command(device_id, timer_command, country=country)
+        logger.info("✅ 타이머 설정 성공!")
+        return response
+    except Exception as e:
+        logger.error("❌ 타이머 설정 실패: %s", e)
+        raise
+
+
+def apply_settings(device_id: str = None, power_on: bool = None, mode: str = None,
+                   target_temp: float = None, unit: str = "C", wind_strength: str = None,
+                   wind_direction: str = None, wind_direction_enabled: bool = True,
+                   profile: Dict[str, Any] = None, country: str = "KR",
+                   validate: bool = True) -> Dict[str, Any]:
+    """
+    여러 설정(전원, 작동 모드, 온도, 풍량, 풍향)을 한 번의 제어 요청으로 적용합니다.
     
-    if not command:
-        raise ValueError("타이머 정보를 입력해주세요.")
+    프로파일이 주어지면 쓰기 가능한 속성만 합쳐 보내고 나머지는 순서대로 따로 보냅니다.
+    프로파일 없이 합친 요청이 거부(4xx)되면 설정별로 나누어 순서대로 다시 보냅니다.
+    나누어 보내는 요청은 거부된 요청이 이미 쓴 토큰으로 처리하여, 속도 제한 때문에 중간에 멈추지 않습니다.
+    전원 켜기는 가장 먼저, 전원 끄기는 가장 나중에 적용합니다.
     
-    timer_command = {
-        "timer": command
-    }
+    Args:
+        device_id: 디바이스 ID (None이면 기본값 사용)
+        power_on: True면 켜기, False면 끄기, None이면 변경하지 않음
+        mode: 작동 모드 ("COOL", "AIR_DRY", "AIR_CLEAN", "AUTO" 또는 한글)
+        target_temp: 목표 온도
+        unit: 온도 단위 ("C" 또는 "F")
+        wind_strength: 풍량 ("HIGH", "MID", "LOW", "AUTO" 또는 한글)
+        wind_direction: 풍향 종류
+        wind_direction_enabled: 풍향 활성화 여부
+        profile: 디바이스 프로파일 (None이면 validate일 때 프로파일 캐시에서 조회)
+        country: ISO 3166-1 alpha-2 국가 코드
+        validate: True면 프로파일로 모드/풍량을 확인하고 온도를 허용 범위로 맞춤
     
-    print(f"\n{'=' * 80}")
-    print(f"⏰ 타이머 설정")
-    if start_hour is not None:
-        print(f"   시작: {start_hour:02d}:{start_minute:02d}")
-    if stop_hour is not None:
-        print(f"   종료: {stop_hour:02d}:{stop_minute:02d}")
-    print(f"{'=' * 80}")
+    Returns:
+        {'payloads': 전송한 payload 목록, 'responses': API 응답 목록}
+    """
+    if device_id is None:
+        device_id = AIR_CONDITIONER_DEVICE_ID
     
+    if profile is None and validate:
+        profile = profile_cache.get_or_none(device_id, country)
+    if validate:
+        values = validate_command_values(profile, mode=mode, target_temp=target_temp, unit=unit,
+                                         wind_strength=wind_strength)
+        mode, target_temp, wind_strength = values['mode'], values['target_temp'], values['wind_strength']
+    
+    commands = []
+    if power_on:
+        commands.append(build_power_command(True))
+    if mode is not None:
+        commands.append(build_job_mode_command(mode))
+    if target_temp is not None:
+        commands.append(build_temperature_command(target_temp, unit))
+    if wind_strength is not None:
+        commands.append(build_wind_strength_command(wind_strength))
+    if wind_direction is not None:
+        commands.append(build_wind_direction_command(wind_direction, wind_direction_enabled))
+    if power_on is False:
+        commands.append(build_power_command(False))
+    
+    if not commands:
+        raise ValueError("적용할 설정을 하나 이상 지정해주세요.")
+    
+    payloads = plan_control_commands(commands, profile)
+    
+    logger.debug("\n%s", '=' * 80)
+    logger.debug("🎛️  설정 일괄 적용: 명령 %s개 → 요청 %s번", len(commands), len(payloads))
+    logger.debug("%s", '=' * 80)
+    
+    responses = []
     try:
-        response = send_device_command(device_id, timer_command, country=country)
-        print(f"✅ 타이머 설정 성공!")
-        return response
+        for payload in payloads:
+            responses.append(send_gated_command(device_id, payload, country=country))
+    except requests.exceptions.HTTPError as e:
+        status = e.response.status_code if e.response is not None else None
+        if profile is not None or len(commands) == 1 or status is None or not 400 <= status < 500:
+            logger.error("❌ 설정 일괄 적용 실패: %s", e)
+            raise
+        # 디바이스가 여러 속성을 한 번에 받지 않으면 설정별로 순서대로 전송
+        # (합친 요청이 쓴 토큰으로 처리하여, 속도 제한으로 일부만 적용된 채 멈추지 않음)
+        logger.warning("⚠️  합친 명령이 거부되어 설정별로 나누어 전송합니다.")
+        payloads = commands
+        try:
+            for payload in payloads:
+                responses.append(send_gated_command(device_id, payload, country=country, charge=False))
+        except Exception as e:
+            logger.error("❌ 설정 일괄 적용 실패: %s", e)
+            raise
     except Exception as e:
-        print(f"❌ 타이머 설정 실패: {e}")
+        logger.error("❌ 설정 일괄 적용 실패: %s", e)
         raise
+    
+    logger.info("✅ 설정 일괄 적용 성공!")
+    return {
+        'payloads': payloads,
+        'responses': responses
+    }
 
 
 if __name__ == "__main__":
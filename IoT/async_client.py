@@ -0,0 +1,205 @@
+"""
+LG ThinQ 비동기(asyncio) 클라이언트
+
+여러 침실의 에어컨 상태 조회와 제어 명령을 동시에 보내기 위한 클라이언트입니다.
+HTTP 호출은 test.py의 연결 풀 클라이언트(ThinQClient)를 스레드 풀에서 실행하며,
+동시에 진행되는 호출 수는 max_concurrency로 제한됩니다.
+온도/모드/풍량 설정은 동기 set_*과 같이 디바이스 프로파일로 값을 확인합니다 (device_profiles.py).
+제어 명령은 동기 클라이언트와 같은 command_gate(디바이스별 속도 제한, 중복 제거, 요청 병합)를 거칩니다.
+
+사용 예시:
+    async with AsyncThinQClient(max_concurrency=16) as client:
+        states = await client.get_device_states(device_ids)
+        results = await client.send_device_commands({device_id: build_power_command(True)})
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, Iterable, Optional
+
+import test as thinq
+from test import ThinQClient
+from airconditional import (
+    build_temperature_command,
+    build_job_mode_command,
+    build_wind_strength_command,
+    build_wind_direction_command,
+    build_power_command,
+    build_timer_command,
+    validate_command_values
+)
+from device_profiles import profile_cache
+from command_gate import command_gate
+
+# 기본 동시 호출 수
+DEFAULT_MAX_CONCURRENCY = 10
+
+
+class AsyncThinQClient:
+    """동시 호출 수가 제한된 asyncio ThinQ 클라이언트"""
+    
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, country: str = "KR",
+                 base_url: str = None, client: Optional[ThinQClient] = None):
+        """
+        Args:
+            max_concurrency: 동시에 진행할 최대 API 호출 수
+            country: ISO 3166-1 alpha-2 국가 코드
+            base_url: 사용할 베이스 URL (None이면 기본값 사용)
+            client: 사용할 HTTP 클라이언트 (None이면 max_concurrency 크기의 연결 풀 생성)
+        """
+        self.max_concurrency = max_concurrency
+        self.country = country
+        self.base_url = base_url
+        self._owns_client = client is None
+        self.client = client if client is not None else ThinQClient(pool_size=max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="thinq")
+    
+    async def _call(self, function, *args, **kwargs):
+        """동기 API 함수를 스레드 풀에서 실행 (스레드 수 = 최대 동시 호출 수)"""
+        kwargs.setdefault("country", self.country)
+        kwargs.setdefault("base_url", self.base_url)
+        kwargs["client"] = self.client
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(function, *args, **kwargs))
+    
+    async def _validate(self, device_id: str, **values) -> Dict[str, Any]:
+        """프로파일로 제어 값 확인 (프로파일 조회는 스레드 풀에서, 실패하면 검증 없이 진행)"""
+        def validate():
+            profile = profile_cache.get_or_none(device_id, self.country)
+            return validate_command_values(profile, **values)
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, validate)
+    
+    async def close(self):
+        """스레드 풀과 (직접 만든 경우) 연결 풀 종료"""
+        self._executor.shutdown(wait=False)
+        if self._owns_client:
+            self.client.close()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.close()
+    
+    # ==================== 단일 디바이스 ====================
+    
+    async def get_devices(self) -> Dict[str, Any]:
+        """디바이스 목록 조회"""
+        return await self._call(thinq.get_devices, debug=False)
+    
+    async def get_device_state(self, device_id: str) -> Dict[str, Any]:
+        """디바이스 현재 상태 조회"""
+        return await self._call(thinq.get_device_state, device_id)
+    
+    async def send_device_command(self, device_id: str, command: Dict[str, Any],
+                                  conditional_control: bool = False) -> Dict[str, Any]:
+        """
+        디바이스 제어 명령 전송 (command_gate를 거침)
+        
+        Raises:
+            CommandRateLimited: 디바이스별 명령 속도 제한 초과
+        
+        Returns:
+            API 응답 (JSON), 이미 적용된 값뿐이면 {'deduplicated': True}
+        """
+        send = partial(thinq.send_device_command, device_id, country=self.country, base_url=self.base_url,
+                       client=self.client, conditional_control=conditional_control)
+        loop = asyncio.get_running_loop()
+        # 토큰 대기(time.sleep)도 스레드 풀에서 수행
+        return await loop.run_in_executor(self._executor, command_gate.submit, device_id, command, send)
+    
+    async def set_temperature(self, device_id: str, target_temp: float, unit: str = "C",
+                              validate: bool = True) -> Dict[str, Any]:
+        """목표 온도 설정 (validate면 프로파일의 허용 범위로 맞춤)"""
+        if validate:
+            target_temp = (await self._validate(device_id, target_temp=target_temp, unit=unit))['target_temp']
+        return await self.send_device_command(device_id, build_temperature_command(target_temp, unit))
+    
+    async def set_job_mode(self, device_id: str, mode: str = "COOL", validate: bool = True) -> Dict[str, Any]:
+        """작동 모드 설정 (validate면 지원하지 않는 모드는 ValueError)"""
+        if validate:
+            mode = (await self._validate(device_id, mode=mode))['mode']
+        return await self.send_device_command(device_id, build_job_mode_command(mode))
+    
+    async def set_wind_strength(self, device_id: str, strength: str = "AUTO",
+                                validate: bool = True) -> Dict[str, Any]:
+        """풍량 설정 (validate면 지원하지 않는 풍량은 ValueError)"""
+        if validate:
+            strength = (await self._validate(device_id, wind_strength=strength))['wind_strength']
+        return await self.send_device_command(device_id, build_wind_strength_command(strength))
+    
+    async def set_wind_direction(self, device_id: str, direction: str, enabled: bool = True) -> Dict[str, Any]:
+        """풍향 설정"""
+        return await self.send_device_command(device_id, build_wind_direction_command(direction, enabled))
+    
+    async def set_power(self, device_id: str, power_on: bool = True) -> Dict[str, Any]:
+        """전원 켜기/끄기"""
+        return await self.send_device_command(device_id, build_power_command(power_on))
+    
+    async def set_timer(self, device_id: str, start_hour: int = None, start_minute: int = None,
+                        stop_hour: int = None, stop_minute: int = None) -> Dict[str, Any]:
+        """타이머 설정"""
+        command = build_timer_command(start_hour, start_minute, stop_hour, stop_minute)
+        return await self.send_device_command(device_id, command)
+    
+    # ==================== 여러 디바이스 동시 처리 ====================
+    
+    async def get_device_states(self, device_ids: Iterable[str]) -> Dict[str, Any]:
+        """
+        여러 디바이스 상태를 동시에 조회
+        
+        Returns:
+            디바이스 ID → 상태 응답 (실패한 디바이스는 예외 객체)
+        """
+        device_ids = list(device_ids)
+        results = await asyncio.gather(*(self.get_device_state(device_id) for device_id in device_ids),
+                                       return_exceptions=True)
+        return dict(zip(device_ids, results))
+    
+    async def send_device_commands(self, commands: Dict[str, Dict[str, Any]],
+                                   conditional_control: bool = False) -> Dict[str, Any]:
+        """
+        여러 디바이스에 제어 명령을 동시에 전송
+        
+        Args:
+            commands: 디바이스 ID → 제어 명령
+            conditional_control: 조건부 제어 여부
+        
+        Returns:
+            디바이스 ID → 제어 응답 (실패하거나 속도 제한에 걸린 디바이스는 예외 객체, CommandRateLimited 포함)
+        """
+        device_ids = list(commands)
+        results = await asyncio.gather(
+            *(self.send_device_command(device_id, commands[device_id], conditional_control)
+              for device_id in device_ids),
+            return_exceptions=True
+        )
+        return dict(zip(device_ids, results))
+
+
+if __name__ == "__main__":
+    """
+    등록된 모든 디바이스 상태 동시 조회 테스트
+    """
+    import sys
+    import time
+    
+    async def main():
+        async with AsyncThinQClient() as client:
+            devices_result = await client.get_devices()
+            devices = devices_result.get('response') or []
+            device_ids = [device.get('deviceId') for device in devices if device.get('deviceId')]
+            print(f"📱 디바이스 {len(device_ids)}개 상태 동시 조회")
+            
+            start = time.perf_counter()
+            states = await client.get_device_states(device_ids)
+            elapsed = time.perf_counter() - start
+            
+            failed = [device_id for device_id, state in states.items() if isinstance(state, Exception)]
+            print(f"✅ 완료: 성공 {len(states) - len(failed)}개, 실패 {len(failed)}개 ({elapsed:.2f}초)")
+            return 1 if failed else 0
+    
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,241 @@
+"""
+ThinQ 제어 명령 속도 제한 및 중복 제거
+
+send_device_command 앞에서 디바이스별로 제어 명령을 걸러 PAT 토큰 쿼터와 클라우드 부하를 줄입니다.
+- 중복 제거: 현재 상태(state_provider) 또는 최근에 적용한 값과 같은 속성은 빼고, 남는 것이 없으면 보내지 않음
+- 속도 제한: 디바이스별 토큰 버킷 (초당 rate개, 최대 burst개까지 연속 전송)
+- 요청 병합: 토큰을 기다리는 동안 들어온 같은 디바이스 명령은 하나로 합쳐 최신 값만 한 번에 전송
+
+토큰을 max_wait 초 넘게 기다려야 하면 CommandRateLimited를 발생시킵니다.
+상태는 프로세스마다 따로 유지됩니다 (gunicorn 워커별).
+
+환경 변수:
+- THINQ_COMMAND_RATE: 디바이스별 초당 명령 수 (기본 0.5, 0이면 속도 제한 없음)
+- THINQ_COMMAND_BURST: 연속 전송 가능한 명령 수 (기본 3)
+- THINQ_COMMAND_MAX_WAIT: 토큰을 기다리는 최대 시간(초, 기본 10)
+- THINQ_COMMAND_DEDUP_TTL: 최근에 적용한 값을 중복 판단에 쓰는 시간(초, 기본 60, 0이면 사용 안 함)
+"""
+
+import os
+import time
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+from thinq_logging import logger
+
+DEFAULT_RATE = 0.5
+DEFAULT_BURST = 3
+DEFAULT_MAX_WAIT = 10.0
+DEFAULT_DEDUP_TTL = 60.0
+
+
+class CommandRateLimited(Exception):
+    """디바이스 명령 속도 제한 초과 (max_wait 안에 보낼 수 없음)"""
+    
+    def __init__(self, device_id: str, retry_after: float):
+        super().__init__(f"디바이스 제어 요청이 너무 많습니다. {retry_after:.1f}초 후 다시 시도하세요.")
+        self.device_id = device_id
+        self.retry_after = retry_after
+
+
+def _merge(target: Dict[str, Any], command: Dict[str, Any]):
+    """명령을 리소스 단위로 합침 (같은 속성은 나중 값 사용)"""
+    for resource, attributes in command.items():
+        if isinstance(attributes, dict) and isinstance(target.get(resource), dict):
+            target[resource].update(attributes)
+        else:
+            target[resource] = dict(attributes) if isinstance(attributes, dict) else attributes
+
+
+class DeviceCommandGate:
+    """디바이스별 토큰 버킷 + 중복 제거 + 대기 중 요청 병합"""
+    
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST,
+                 max_wait: float = DEFAULT_MAX_WAIT, dedup_ttl: float = DEFAULT_DEDUP_TTL,
+                 state_provider: Callable[[str], Optional[Dict[str, Any]]] = None):
+        """
+        Args:
+            rate: 디바이스별 초당 명령 수 (0이면 속도 제한 없음)
+            burst: 연속 전송 가능한 명령 수
+            max_wait: 토큰을 기다리는 최대 시간(초)
+            dedup_ttl: 최근 적용 값을 중복 판단에 쓰는 시간(초)
+            state_provider: device_id → 현재 상태 dict (없으면 None) 함수
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self.dedup_ttl = dedup_ttl
+        self.state_provider = state_provider
+        self._buckets = {}     # device_id → [토큰 수, 마지막 충전 시각]
+        self._applied = {}     # device_id → {(리소스, 속성): (값, 적용 시각)}
+        self._pending = {}     # device_id → (합친 명령, Future)
+        self._lock = threading.Lock()
+        self.sent = 0
+        self.deduplicated = 0
+        self.collapsed = 0
+        self.rejected = 0
+    
+    @classmethod
+    def from_env(cls):
+        """환경 변수 설정으로 생성"""
+        return cls(
+            rate=float(os.environ.get('THINQ_COMMAND_RATE', DEFAULT_RATE)),
+            burst=int(os.environ.get('THINQ_COMMAND_BURST', DEFAULT_BURST)),
+            max_wait=float(os.environ.get('THINQ_COMMAND_MAX_WAIT', DEFAULT_MAX_WAIT)),
+            dedup_ttl=float(os.environ.get('THINQ_COMMAND_DEDUP_TTL', DEFAULT_DEDUP_TTL))
+        )
+    
+    def _current_state(self, device_id: str) -> Optional[Dict[str, Any]]:
+        if self.state_provider is None:
+            return None
+        try:
+            return self.state_provider(device_id)
+        except Exception as e:
+            logger.debug("중복 판단용 상태 조회 실패: %s", e)
+            return None
+    
+    def _drop_noops(self, device_id: str, command: Dict[str, Any], state: Optional[Dict[str, Any]],
+                    now: float) -> Dict[str, Any]:
+        """현재 상태 또는 최근 적용 값과 같은 속성을 뺀 명령 (unit만 남은 리소스도 제거)"""
+        applied = self._applied.get(device_id, {})
+        remaining = {}
+        for resource, attributes in command.items():
+            if not isinstance(attributes, dict):
+                remaining[resource] = attributes
+                continue
+            current = (state or {}).get(resource)
+            changed = {}
+            for attribute, value in attributes.items():
+                if attribute == 'unit':
+                    # 단위는 값과 함께 보내야 하므로 비교하지 않음
+                    changed[attribute] = value
+                    continue
+                if isinstance(current, dict) and attribute in current:
+                    if current[attribute] == value:
+                        continue
+                elif (resource, attribute) in applied:
+                    applied_value, applied_at = applied[(resource, attribute)]
+                    if applied_value == value and now - applied_at < self.dedup_ttl:
+                        continue
+                changed[attribute] = value
+            if any(attribute != 'unit' for attribute in changed):
+                remaining[resource] = changed
+        return remaining
+    
+    def _reserve_token(self, device_id: str, now: float) -> float:
+        """토큰 하나를 예약하고 기다려야 하는 시간(초)을 반환 (토큰이 음수면 그만큼 대기)"""
+        if self.rate <= 0:
+            return 0.0
+        bucket = self._buckets.get(device_id)
+        if bucket is None:
+            bucket = self._buckets[device_id] = [float(self.burst), now]
+        bucket[0] = min(float(self.burst), bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        wait = 0.0 if bucket[0] >= 1 else (1 - bucket[0]) / self.rate
+        if wait > self.max_wait:
+            raise CommandRateLimited(device_id, wait)
+        bucket[0] -= 1
+        return wait
+    
+    def _record(self, device_id: str, command: Dict[str, Any]):
+        now = time.monotonic()
+        applied = self._applied.setdefault(device_id, {})
+        for resource, attributes in command.items():
+            if isinstance(attributes, dict):
+                for attribute, value in attributes.items():
+                    applied[(resource, attribute)] = (value, now)
+    
+    def submit(self, device_id: str, command: Dict[str, Any], send: Callable[[Dict[str, Any]], Any],
+               charge: bool = True) -> Any:
+        """
+        명령 전송 (중복 제거, 속도 제한, 대기 중 요청 병합 적용)
+        
+        Args:
+            device_id: 디바이스 ID
+            command: 제어 명령
+            send: 최종 payload를 받아 실제로 전송하는 함수
+            charge: False면 토큰을 쓰지 않고 바로 전송 (이미 토큰을 쓴 요청을 나누어 다시 보낼 때)
+        
+        Returns:
+            send()의 반환값, 보낼 것이 없으면 {'deduplicated': True}
+        
+        Raises:
+            CommandRateLimited: max_wait 안에 보낼 수 없음
+        """
+        state = self._current_state(device_id)
+        now = time.monotonic()
+        
+        with self._lock:
+            command = self._drop_noops(device_id, command, state, now)
+            if not command:
+                self.deduplicated += 1
+                logger.debug("이미 적용된 명령이라 보내지 않습니다: %s", device_id)
+                return {'deduplicated': True}
+            
+            pending = self._pending.get(device_id)
+            if not charge:
+                future = None
+                leader = True
+            elif pending is not None:
+                # 토큰을 기다리는 명령에 합쳐 최신 값으로 한 번만 전송
+                _merge(pending[0], command)
+                self.collapsed += 1
+                future = pending[1]
+                leader = False
+            else:
+                try:
+                    wait = self._reserve_token(device_id, now)
+                except CommandRateLimited:
+                    self.rejected += 1
+                    raise
+                future = None
+                if wait > 0:
+                    future = Future()
+                    self._pending[device_id] = (command, future)
+                leader = True
+        
+        if not leader:
+            return future.result(timeout=self.max_wait + 30)
+        
+        if future is not None:
+            time.sleep(wait)
+            with self._lock:
+                command, _ = self._pending.pop(device_id)
+        
+        try:
+            result = send(command)
+        except BaseException as e:
+            if future is not None:
+                future.set_exception(e)
+            raise
+        
+        with self._lock:
+            self.sent += 1
+            self._record(device_id, command)
+        if future is not None:
+            future.set_result(result)
+        return result
+    
+    def forget(self, device_id: str = None):
+        """최근 적용 값 삭제 (리모컨 등 다른 경로로 상태가 바뀐 경우, None이면 전체)"""
+        with self._lock:
+            if device_id is None:
+                self._applied.clear()
+            else:
+                self._applied.pop(device_id, None)
+    
+    def stats(self) -> Dict[str, Any]:
+        """전송/중복 제거/병합/거부 통계"""
+        with self._lock:
+            return {
+                'rate_per_second': self.rate,
+                'burst': self.burst,
+                'sent': self.sent,
+                'deduplicated': self.deduplicated,
+                'collapsed': self.collapsed,
+                'rejected': self.rejected
+            }
+
+
+command_gate = DeviceCommandGate.from_env()
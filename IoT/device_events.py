@@ -0,0 +1,287 @@
+"""
+LG ThinQ 디바이스 이벤트(MQTT 푸시) 구독 및 상태 저장소
+
+상태를 주기적으로 조회하는 대신, Route API의 mqttServer에 연결하여
+디바이스 상태 변경 이벤트(pushType: DEVICE_STATUS)를 받아 메모리 저장소를 갱신합니다.
+이벤트에는 변경된 항목만 들어 있으므로, 처음 한 번은 상태 조회 API로 전체 상태를 채웁니다.
+
+- DeviceStateStore: 디바이스별 최신 상태 (이벤트 report를 기존 상태에 병합)
+- DeviceEventSubscriber: MQTT 연결/구독 (paho-mqtt 필요, 로컬 브로커로 테스트 가능)
+
+MQTT 연결이 끊기면 그 사이 이벤트를 놓쳤을 수 있으므로 저장소를 비우고,
+다시 연결될 때까지 저장소는 상태를 돌려주지 않습니다(호출 측이 상태 조회 API 사용).
+
+사용 예시:
+    store = DeviceStateStore()
+    subscriber = DeviceEventSubscriber(store, mqtt_url="mqtt://localhost:1883", topics=["app/clients/test/push"])
+    subscriber.start()
+"""
+
+import os
+import ssl
+import json
+import time
+import threading
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+try:
+    import paho.mqtt.client as mqtt
+    MQTT_AVAILABLE = True
+except ImportError:
+    mqtt = None
+    MQTT_AVAILABLE = False
+
+from thinq_logging import logger
+from test import (
+    generate_device_api_header,
+    get_api_base_url,
+    get_default_client,
+    route_cache,
+    CLIENT_ID
+)
+
+# 이벤트 구독 만료 시간 (시간 단위, 최소 1 ~ 최대 24)
+EVENT_SUBSCRIBE_HOURS = 24
+
+# MQTT 기본 포트
+MQTT_PORT = 1883
+MQTTS_PORT = 8883
+MQTT_KEEPALIVE = 60
+
+
+def _merge(target: Dict[str, Any], report: Dict[str, Any]):
+    """이벤트 report(변경된 항목만 포함)를 기존 상태에 재귀적으로 병합"""
+    for key, value in report.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge(target[key], value)
+        else:
+            target[key] = value
+
+
+class DeviceStateStore:
+    """푸시 이벤트로 갱신되는 스레드 안전한 디바이스 상태 저장소"""
+    
+    def __init__(self):
+        self._states = {}      # device_id → (상태, 갱신 시각)
+        self._lock = threading.Lock()
+        self.live = False      # MQTT 연결 중일 때만 저장된 상태를 신뢰
+        self.events = 0
+    
+    def get(self, device_id: str) -> Optional[Dict[str, Any]]:
+        """저장된 상태 (연결이 끊겼거나 아직 전체 상태가 없으면 None)"""
+        with self._lock:
+            if not self.live or device_id not in self._states:
+                return None
+            return json.loads(json.dumps(self._states[device_id][0]))
+    
+    def replace(self, device_id: str, state: Dict[str, Any]):
+        """상태 조회 API로 받은 전체 상태 저장"""
+        with self._lock:
+            self._states[device_id] = (json.loads(json.dumps(state)), time.time())
+    
+    def apply_event(self, device_id: str, report: Dict[str, Any]) -> bool:
+        """
+        이벤트 report 병합
+        
+        Returns:
+            전체 상태가 있어 병합했으면 True (없으면 다음 조회에서 전체 상태를 받아야 함)
+        """
+        with self._lock:
+            self.events += 1
+            if device_id not in self._states:
+                return False
+            state, _ = self._states[device_id]
+            _merge(state, report)
+            self._states[device_id] = (state, time.time())
+            return True
+    
+    def set_live(self, live: bool):
+        """MQTT 연결 상태 반영 (연결이 바뀌면 놓친 이벤트가 있을 수 있으므로 비움)"""
+        with self._lock:
+            if live != self.live:
+                self._states.clear()
+            self.live = live
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.time()
+            return {
+                'live': self.live,
+                'devices': len(self._states),
+                'events': self.events,
+                'oldest_update_seconds': round(now - min(t for _, t in self._states.values()), 1) if self._states else None
+            }
+
+
+def parse_event(payload: bytes) -> Optional[tuple]:
+    """
+    MQTT 메시지에서 (device_id, report) 추출
+    
+    {"event": {"deviceId": ..., "pushType": "DEVICE_STATUS", "report": {...}}} 또는
+    event 객체가 최상위에 펼쳐진 형식을 모두 지원합니다. 상태 이벤트가 아니면 None.
+    """
+    try:
+        message = json.loads(payload)
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(message, dict):
+        return None
+    
+    event = message.get('event', message)
+    if not isinstance(event, dict) or event.get('pushType', 'DEVICE_STATUS') != 'DEVICE_STATUS':
+        return None
+    device_id = event.get('deviceId')
+    report = event.get('report')
+    if not device_id or not isinstance(report, dict):
+        return None
+    return device_id, report
+
+
+def subscribe_device_events(device_id: str, hours: int = EVENT_SUBSCRIBE_HOURS, country: str = "KR") -> Dict[str, Any]:
+    """
+    디바이스 상태 변경 이벤트 구독 (만료 시간이 지나면 자동 해제되므로 주기적으로 다시 호출)
+    
+    Args:
+        device_id: 디바이스 ID
+        hours: 구독 유지 시간 (1~24)
+        country: ISO 3166-1 alpha-2 국가 코드
+    """
+    url = f"{get_api_base_url(country)}/event/{device_id}/subscribe"
+    body = {"expire": {"unit": "HOUR", "timer": max(1, min(24, hours))}}
+    response = get_default_client().post(url, headers=generate_device_api_header(country=country), json=body)
+    response.raise_for_status()
+    return response.json()
+
+
+class DeviceEventSubscriber:
+    """ThinQ MQTT 서버 이벤트 구독자"""
+    
+    def __init__(self, store: DeviceStateStore, mqtt_url: str = None, topics: List[str] = None,
+                 client_id: str = None, certfile: str = None, keyfile: str = None, ca_certs: str = None,
+                 device_ids: List[str] = None, country: str = "KR"):
+        """
+        Args:
+            store: 갱신할 상태 저장소
+            mqtt_url: MQTT 서버 주소 (mqtt://host:port 또는 mqtts://host:port, None이면 Route API의 mqttServer)
+            topics: 구독할 토픽 목록 (클라이언트 인증서 발급 시 받은 subscriptions)
+            client_id: MQTT 클라이언트 ID (None이면 CLIENT_ID)
+            certfile, keyfile, ca_certs: mqtts 연결용 클라이언트 인증서/키, CA 인증서 경로
+            device_ids: 이벤트를 구독할 디바이스 ID 목록 (만료 전에 주기적으로 다시 구독)
+            country: ISO 3166-1 alpha-2 국가 코드
+        """
+        if not MQTT_AVAILABLE:
+            raise ImportError("paho-mqtt가 설치되어 있지 않습니다. pip install paho-mqtt")
+        
+        self.store = store
+        self.mqtt_url = mqtt_url
+        self.topics = list(topics or [])
+        self.client_id = client_id or CLIENT_ID
+        self.certfile = certfile
+        self.keyfile = keyfile
+        self.ca_certs = ca_certs
+        self.device_ids = list(device_ids or [])
+        self.country = country
+        self._client = None
+        self._stop = threading.Event()
+    
+    @classmethod
+    def from_env(cls, store: DeviceStateStore, device_ids: List[str] = None):
+        """
+        환경 변수 설정으로 구독자 생성
+        
+        - THINQ_MQTT_URL: MQTT 서버 주소 (없으면 Route API의 mqttServer)
+        - THINQ_MQTT_TOPICS: 구독할 토픽 (쉼표로 구분)
+        - THINQ_MQTT_CERT / THINQ_MQTT_KEY / THINQ_MQTT_CA: 인증서 경로
+        """
+        topics = [t.strip() for t in os.environ.get('THINQ_MQTT_TOPICS', '').split(',') if t.strip()]
+        return cls(
+            store,
+            mqtt_url=os.environ.get('THINQ_MQTT_URL'),
+            topics=topics,
+            certfile=os.environ.get('THINQ_MQTT_CERT'),
+            keyfile=os.environ.get('THINQ_MQTT_KEY'),
+            ca_certs=os.environ.get('THINQ_MQTT_CA'),
+            device_ids=device_ids
+        )
+    
+    def _create_client(self):
+        try:
+            return mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, client_id=self.client_id)
+        except AttributeError:
+            # paho-mqtt 1.x
+            return mqtt.Client(client_id=self.client_id)
+    
+    def start(self):
+        """MQTT 서버에 연결하고 백그라운드 스레드에서 이벤트 수신 시작 (끊기면 자동 재연결)"""
+        url = self.mqtt_url or route_cache.get(self.country).get('mqttServer')
+        if not url:
+            raise ValueError("MQTT 서버 주소를 알 수 없습니다.")
+        if '://' not in url:
+            url = f"mqtts://{url}"
+        parsed = urlparse(url)
+        secure = parsed.scheme in ('mqtts', 'ssl', 'tls')
+        
+        client = self._create_client()
+        client.on_connect = self._on_connect
+        client.on_disconnect = self._on_disconnect
+        client.on_message = self._on_message
+        if secure:
+            client.tls_set(ca_certs=self.ca_certs, certfile=self.certfile, keyfile=self.keyfile,
+                           cert_reqs=ssl.CERT_REQUIRED)
+        client.reconnect_delay_set(min_delay=1, max_delay=60)
+        
+        logger.info("📡 MQTT 연결 중: %s:%s", parsed.hostname,
+                    parsed.port or (MQTTS_PORT if secure else MQTT_PORT))
+        client.connect_async(parsed.hostname, parsed.port or (MQTTS_PORT if secure else MQTT_PORT), MQTT_KEEPALIVE)
+        client.loop_start()
+        self._client = client
+        
+        if self.device_ids:
+            self._stop.clear()
+            threading.Thread(target=self._renew_subscriptions, name="thinq-event-subscribe", daemon=True).start()
+    
+    def _renew_subscriptions(self):
+        """디바이스 이벤트 구독이 만료되기 전에 다시 구독"""
+        interval = max(EVENT_SUBSCRIBE_HOURS * 3600 - 600, 600)
+        while not self._stop.is_set():
+            for device_id in self.device_ids:
+                try:
+                    subscribe_device_events(device_id, EVENT_SUBSCRIBE_HOURS, self.country)
+                except Exception as e:
+                    logger.warning("⚠️  디바이스 이벤트 구독 실패 (%s): %s", device_id, e)
+            self._stop.wait(interval)
+    
+    def stop(self):
+        """연결 종료"""
+        self._stop.set()
+        if self._client is not None:
+            self._client.loop_stop()
+            self._client.disconnect()
+            self._client = None
+        self.store.set_live(False)
+    
+    def _on_connect(self, client, userdata, flags, reason_code, *args):
+        if reason_code != 0:
+            logger.error("❌ MQTT 연결 실패: %s", reason_code)
+            return
+        for topic in self.topics:
+            client.subscribe(topic, qos=1)
+        self.store.set_live(True)
+        logger.info("✅ MQTT 연결 성공 (토픽 %s개 구독)", len(self.topics))
+    
+    def _on_disconnect(self, client, userdata, *args):
+        self.store.set_live(False)
+        logger.warning("⚠️  MQTT 연결 끊김, 재연결을 시도합니다.")
+    
+    def _on_message(self, client, userdata, message):
+        self.handle_message(message.payload)
+    
+    def handle_message(self, payload: bytes) -> bool:
+        """수신한 메시지를 저장소에 반영 (상태 이벤트면 True)"""
+        event = parse_event(payload)
+        if event is None:
+            return False
+        device_id, report = event
+        self.store.apply_event(device_id, report)
+        return True
@@ -0,0 +1,254 @@
+"""
+LG ThinQ 디바이스 프로파일 캐시 및 제어 값 검증
+
+디바이스 프로파일(속성별 타입, 읽기/쓰기 가능 여부, 허용 값/범위)은 거의 바뀌지 않으므로
+디바이스마다 한 번 조회하여 메모리와 디스크에 저장하고, 제어 명령을 보내기 전에 값을 검증합니다.
+허용되지 않는 모드/풍량은 클라우드에 보내기 전에 ValueError로 거부하고, 온도는 범위 안으로 맞춥니다.
+
+디스크 캐시 파일에는 캐시 형식 버전(PROFILE_CACHE_VERSION)과 조회 시각이 기록되어,
+형식이 바뀌었거나 PROFILE_MAX_AGE가 지난 파일은 다시 조회합니다.
+
+환경 변수:
+- THINQ_PROFILE_CACHE_DIR: 디스크 캐시 경로 (기본 IoT/.profile_cache, 빈 값이면 메모리만 사용)
+- THINQ_PROFILE_MAX_AGE: 디스크 캐시 유효 시간(초, 기본 7일)
+- THINQ_PROFILE_FAILURE_RETRY: 조회 실패 후 다시 조회하기까지의 시간(초, 기본 60)
+
+사용 예시:
+    profile = profile_cache.get(device_id)
+    target_temp = clamp_temperature(profile, 35)       # 범위 밖이면 최대값으로
+    mode = validate_enum(profile, "airConJobMode", "currentJobMode", "COOL")
+"""
+
+import os
+import json
+import time
+import threading
+from typing import Any, Dict, Optional
+
+from thinq_logging import logger
+from test import get_device_profile
+
+# 디스크 캐시 형식 버전 (저장 형식이 바뀌면 올려서 기존 파일을 무시)
+PROFILE_CACHE_VERSION = 1
+
+PROFILE_MAX_AGE = 7 * 24 * 60 * 60
+# 조회 실패를 기억하는 시간(초) (그동안 get_or_none은 조회하지 않고 바로 None)
+PROFILE_FAILURE_RETRY = 60.0
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.profile_cache')
+
+
+def get_profile_properties(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    프로파일(또는 get_device_profile() 응답)에서 리소스별 속성 정의를 구합니다.
+    위치가 여러 개인 디바이스는 property가 배열이므로 하나로 합칩니다.
+    """
+    if 'response' in profile:
+        profile = profile['response']
+    elif 'result' in profile:
+        profile = profile['result']
+    
+    properties = profile.get('property', {}) if isinstance(profile, dict) else {}
+    if isinstance(properties, list):
+        merged = {}
+        for item in properties:
+            if not isinstance(item, dict):
+                continue
+            for resource, attributes in item.items():
+                if isinstance(attributes, dict):
+                    merged.setdefault(resource, {}).update(attributes)
+        properties = merged
+    return properties if isinstance(properties, dict) else {}
+
+
+def get_attribute_spec(profile: Dict[str, Any], resource: str, attribute: str) -> Optional[Dict[str, Any]]:
+    """속성 정의 (type, mode, value) - 프로파일에 없으면 None"""
+    spec = get_profile_properties(profile).get(resource, {}).get(attribute)
+    return spec if isinstance(spec, dict) else None
+
+
+def _writable_value(spec: Dict[str, Any]) -> Any:
+    """속성 정의의 쓰기 허용 값 (value에 r/w가 나뉘어 있으면 w)"""
+    value = spec.get('value')
+    if isinstance(value, dict) and 'w' in value:
+        return value['w']
+    return value
+
+
+def validate_enum(profile: Dict[str, Any], resource: str, attribute: str, value: str) -> str:
+    """
+    enum 속성 값 검증
+    
+    Raises:
+        ValueError: 쓰기 불가능한 속성이거나 허용되지 않는 값
+    """
+    spec = get_attribute_spec(profile, resource, attribute)
+    if spec is None:
+        return value
+    if 'w' not in spec.get('mode', ['w']):
+        raise ValueError(f"{resource}.{attribute}은(는) 이 디바이스에서 변경할 수 없습니다.")
+    
+    allowed = _writable_value(spec)
+    if isinstance(allowed, list) and allowed and value not in allowed:
+        raise ValueError(f"지원하지 않는 {attribute} 값: {value} (가능한 값: {', '.join(map(str, allowed))})")
+    return value
+
+
+def clamp_temperature(profile: Dict[str, Any], target_temp: float, unit: str = "C") -> float:
+    """
+    목표 온도를 프로파일의 범위(min/max)와 간격(step)에 맞춥니다.
+    
+    Raises:
+        ValueError: 목표 온도를 변경할 수 없는 디바이스
+    """
+    spec = get_attribute_spec(profile, 'temperature', 'targetTemperature')
+    
+    # 단위별 범위가 따로 있는 프로파일 (temperatureInUnits)
+    if spec is None:
+        for item in get_profile_properties(profile).get('temperatureInUnits', []) or []:
+            if isinstance(item, dict) and item.get('unit') == unit and isinstance(item.get('targetTemperature'), dict):
+                spec = item['targetTemperature']
+                break
+    if spec is None:
+        return target_temp
+    if 'w' not in spec.get('mode', ['w']):
+        raise ValueError("목표 온도는 이 디바이스에서 변경할 수 없습니다.")
+    
+    value_range = _writable_value(spec)
+    if not isinstance(value_range, dict):
+        return target_temp
+    
+    minimum = value_range.get('min')
+    maximum = value_range.get('max')
+    step = value_range.get('step')
+    clamped = target_temp
+    if step:
+        base = minimum if minimum is not None else 0
+        clamped = base + round((clamped - base) / step) * step
+    if minimum is not None:
+        clamped = max(minimum, clamped)
+    if maximum is not None:
+        clamped = min(maximum, clamped)
+    
+    if clamped != target_temp:
+        logger.warning("⚠️  목표 온도 %s°%s → %s°%s (허용 범위 %s~%s)",
+                       target_temp, unit, clamped, unit, minimum, maximum)
+    return clamped
+
+
+class DeviceProfileCache:
+    """
+    디바이스 프로파일 캐시 (메모리 + 디스크)
+    
+    - 디바이스마다 한 번만 조회 (동시 조회는 잠금으로 한 번만 수행)
+    - 디스크 파일의 형식 버전이 다르거나 max_age가 지나면 다시 조회
+    - get_or_none의 조회 실패는 failure_retry 초 동안 기억하여 제어할 때마다 다시 조회하지 않음
+    """
+    
+    def __init__(self, cache_dir: Optional[str] = DEFAULT_CACHE_DIR, max_age: float = PROFILE_MAX_AGE,
+                 failure_retry: float = PROFILE_FAILURE_RETRY):
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        self.failure_retry = failure_retry
+        self._profiles = {}    # device_id → 프로파일
+        self._failures = {}    # device_id → 다시 조회할 수 있는 시각 (time.monotonic)
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_env(cls):
+        """환경 변수 설정으로 캐시 생성"""
+        return cls(
+            cache_dir=os.environ.get('THINQ_PROFILE_CACHE_DIR', DEFAULT_CACHE_DIR) or None,
+            max_age=float(os.environ.get('THINQ_PROFILE_MAX_AGE', PROFILE_MAX_AGE)),
+            failure_retry=float(os.environ.get('THINQ_PROFILE_FAILURE_RETRY', PROFILE_FAILURE_RETRY))
+        )
+    
+    def _path(self, device_id: str) -> str:
+        return os.path.join(self.cache_dir, f"{device_id}.json")
+    
+    def _load(self, device_id: str) -> Optional[Dict[str, Any]]:
+        """디스크에서 유효한 프로파일 읽기 (없거나 오래되었으면 None)"""
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._path(device_id), encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('version') != PROFILE_CACHE_VERSION or entry.get('device_id') != device_id:
+            return None
+        if time.time() - entry.get('fetched_at', 0) > self.max_age:
+            return None
+        return entry.get('profile')
+    
+    def _save(self, device_id: str, profile: Dict[str, Any]):
+        """디스크에 저장 (임시 파일에 쓴 뒤 교체하여 다른 프로세스가 깨진 파일을 읽지 않게 함)"""
+        if not self.cache_dir:
+            return
+        entry = {
+            'version': PROFILE_CACHE_VERSION,
+            'device_id': device_id,
+            'fetched_at': time.time(),
+            'profile': profile
+        }
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{self._path(device_id)}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(device_id))
+        except OSError as e:
+            logger.warning("⚠️  프로파일 캐시 저장 실패 (%s): %s", device_id, e)
+    
+    def get(self, device_id: str, country: str = "KR") -> Dict[str, Any]:
+        """프로파일 조회 (메모리 → 디스크 → Device API 순서)"""
+        profile = self._profiles.get(device_id)
+        if profile is not None:
+            return profile
+        
+        with self._lock:
+            profile = self._profiles.get(device_id)
+            if profile is not None:
+                return profile
+            
+            profile = self._load(device_id)
+            if profile is None:
+                response = get_device_profile(device_id, country=country)
+                profile = response.get('response', response.get('result', response))
+                self._save(device_id, profile)
+            self._profiles[device_id] = profile
+            return profile
+    
+    def get_or_none(self, device_id: str, country: str = "KR") -> Optional[Dict[str, Any]]:
+        """프로파일 조회 (실패하면 검증 없이 진행할 수 있도록 None, 실패는 failure_retry 초 동안 기억)"""
+        retry_at = self._failures.get(device_id)
+        if retry_at is not None and time.monotonic() < retry_at:
+            logger.debug("최근 프로파일 조회 실패로 검증 없이 제어합니다: %s", device_id)
+            return None
+        
+        try:
+            profile = self.get(device_id, country)
+        except Exception as e:
+            logger.warning("⚠️  프로파일을 조회할 수 없어 검증 없이 제어합니다 (%.0f초 후 다시 조회): %s",
+                           self.failure_retry, e)
+            self._failures[device_id] = time.monotonic() + self.failure_retry
+            return None
+        self._failures.pop(device_id, None)
+        return profile
+    
+    def invalidate(self, device_id: str = None):
+        """프로파일 삭제 (펌웨어 업데이트 등으로 바뀐 경우, None이면 전체)"""
+        with self._lock:
+            device_ids = [device_id] if device_id is not None else list(self._profiles)
+            if device_id is None:
+                self._failures.clear()
+            for key in device_ids:
+                self._profiles.pop(key, None)
+                self._failures.pop(key, None)
+                if self.cache_dir:
+                    try:
+                        os.remove(self._path(key))
+                    except OSError:
+                        pass
+
+
+profile_cache = DeviceProfileCache.from_env()
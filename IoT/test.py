@@ -2,7 +2,15 @@ import base64
 import requests
 import uuid
 import socket
+import time
+import logging
+import threading
+from concurrent.futures import Future
 from typing import Optional, Dict, Any
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from thinq_logging import logger, pretty, fields
 
 # ThinQ API 베이스 URL (OpenAPI 스펙 기준)
 # Region별 Base URL:
@@ -20,6 +28,104 @@ PAT_TOKEN = "thinqpat_6db40a76ffca2c2476f106133c69125c94493ac0e028a973aa9b"
 # Client ID (고유한 클라이언트 식별자)
 CLIENT_ID = "test-client-123456"
 
+# HTTP 연결 설정 (keep-alive 연결 풀 재사용)
+HTTP_POOL_SIZE = 10          # 호스트당 유지할 연결 수
+HTTP_MAX_RETRIES = 3         # 연결 실패 및 GET 요청의 일시적 오류 재시도 횟수
+HTTP_BACKOFF_FACTOR = 0.3    # 재시도 대기 시간 (0.3초, 0.6초, 1.2초 ...)
+HTTP_TIMEOUT = 10            # 요청 제한 시간(초)
+HTTP_RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# 리전 엔드포인트(Route API 응답) 캐시 설정
+ROUTE_CACHE_TTL = 6 * 60 * 60      # Route 응답 유효 시간(초)
+ROUTE_REFRESH_MARGIN = 10 * 60     # 만료 전 이 시간 안에 들어오면 백그라운드에서 미리 갱신(초)
+ROUTE_FAILURE_BACKOFF = 60         # 조회 실패 후 다시 조회하지 않는 시간(초, 그동안 이전 정보나 기본 서버 사용)
+DNS_CACHE_TTL = 5 * 60             # 도메인 해석 결과 유효 시간(초)
+
+
+class ThinQClient:
+    """
+    연결 풀을 재사용하는 ThinQ API HTTP 클라이언트
+    
+    requests.Session으로 TCP/TLS 연결을 유지하므로, 상태 조회 후 제어처럼
+    연속된 호출은 같은 연결을 재사용하여 핸드셰이크 비용이 들지 않습니다.
+    제어 명령(POST)은 중복 실행을 막기 위해 연결 실패일 때만 재시도합니다.
+    """
+    
+    def __init__(self, pool_size: int = HTTP_POOL_SIZE, max_retries: int = HTTP_MAX_RETRIES,
+                 backoff_factor: float = HTTP_BACKOFF_FACTOR, timeout: float = HTTP_TIMEOUT):
+        """
+        Args:
+            pool_size: 호스트당 유지할 keep-alive 연결 수
+            max_retries: 재시도 횟수 (0이면 재시도 안 함)
+            backoff_factor: 재시도 간 지수 백오프 계수
+            timeout: 요청 제한 시간(초)
+        """
+        self.timeout = timeout
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=HTTP_RETRY_STATUS,
+            allowed_methods=frozenset(["GET"]),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+    
+    def get(self, url: str, headers: dict) -> requests.Response:
+        return self.session.get(url, headers=headers, timeout=self.timeout)
+    
+    def post(self, url: str, headers: dict, json: Any = None) -> requests.Response:
+        return self.session.post(url, headers=headers, json=json, timeout=self.timeout)
+    
+    def close(self):
+        """풀에 유지 중인 연결 종료"""
+        self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> ThinQClient:
+    """모듈 함수들이 공유하는 기본 클라이언트 (처음 호출 시 생성)"""
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = ThinQClient()
+    return _default_client
+
+
+def configure_default_client(**kwargs) -> ThinQClient:
+    """
+    기본 클라이언트 설정 변경 (기존 연결은 닫힘)
+    
+    Args:
+        **kwargs: ThinQClient 생성 인자 (pool_size, max_retries, backoff_factor, timeout)
+    
+    Returns:
+        새 기본 클라이언트
+    """
+    global _default_client
+    with _default_client_lock:
+        previous = _default_client
+        _default_client = ThinQClient(**kwargs)
+    if previous is not None:
+        previous.close()
+    return _default_client
+
 
 def generate_message_id() -> str:
     """
@@ -78,7 +184,7 @@ def generate_device_api_header(country: str = "KR", client_id: str = None) -> di
         raise ValueError("PAT_TOKEN이 설정되지 않았습니다. https://connect-pat.lgthinq.com 에서 토큰을 발급받으세요.")
     
     if not PAT_TOKEN.startswith("thinqpat_"):
-        print(f"⚠️  경고: PAT 토큰이 'thinqpat_'로 시작하지 않습니다. 올바른 형식인지 확인하세요.")
+        logger.warning("⚠️  경고: PAT 토큰이 'thinqpat_'로 시작하지 않습니다. 올바른 형식인지 확인하세요.")
     
     return {
         "Authorization": f"Bearer {PAT_TOKEN}",
@@ -115,11 +221,33 @@ def check_domain_resolution(domain: str) -> bool:
     except socket.gaierror:
         return False
     except Exception as e:
-        print(f"도메인 확인 중 오류: {e}")
+        logger.debug("도메인 확인 중 오류: %s", e)
+        return False
+
+
+_resolved_domains = {}
+_resolved_domains_lock = threading.Lock()
+
+
+def check_domain_resolution_cached(domain: str, ttl: float = DNS_CACHE_TTL) -> bool:
+    """
+    check_domain_resolution()의 결과를 도메인별로 ttl초 동안 재사용합니다.
+    해석에 성공한 결과만 저장하므로 실패한 도메인은 다음 호출에서 다시 확인합니다.
+    """
+    now = time.monotonic()
+    with _resolved_domains_lock:
+        if _resolved_domains.get(domain, 0) > now:
+            return True
+    
+    if not check_domain_resolution(domain):
         return False
+    with _resolved_domains_lock:
+        _resolved_domains[domain] = now + ttl
+    return True
 
 
-def get_route_domain(country: str = "KR", service_phase: str = "OP", base_url: str = None) -> Dict[str, Any]:
+def get_route_domain(country: str = "KR", service_phase: str = "OP", base_url: str = None,
+                     client: Optional[ThinQClient] = None) -> Dict[str, Any]:
     """
     ThinQ Platform의 Backend 주소를 조회합니다.
     리전별, 형상별 도메인 이름을 조회하는 API입니다.
@@ -128,63 +256,192 @@ def get_route_domain(country: str = "KR", service_phase: str = "OP", base_url: s
         country: ISO 3166-1 alpha-2 국가 코드 (예: KR, US, GB)
         service_phase: 서비스 형상 (예: OP)
         base_url: 사용할 베이스 URL (None이면 기본값 사용)
+        client: 사용할 HTTP 클라이언트 (None이면 공유 기본 클라이언트)
     
     Returns:
         API 응답 (JSON)
     """
     if base_url is None:
         base_url = THINQ_API_BASE_URL
-    
-    # 도메인 해석 확인
-    print(f"\n도메인 확인 중: {base_url}")
-    if not check_domain_resolution(base_url):
-        print(f"❌ 도메인을 해석할 수 없습니다: {base_url}")
-        print("\n💡 가능한 해결 방법:")
-        print("1. 인터넷 연결을 확인하세요")
-        print("2. VPN이나 프록시 설정을 확인하세요")
+    if client is None:
+        client = get_default_client()
+    
+    # 도메인 해석 확인 (최근에 해석된 도메인은 건너뜀)
+    logger.debug("\n도메인 확인 중: %s", base_url)
+    if not check_domain_resolution_cached(base_url):
+        logger.error("❌ 도메인을 해석할 수 없습니다: %s", base_url)
+        logger.debug("\n💡 가능한 해결 방법:")
+        logger.debug("1. 인터넷 연결을 확인하세요")
+        logger.debug("2. VPN이나 프록시 설정을 확인하세요")
         raise ConnectionError(f"도메인을 해석할 수 없습니다: {base_url}")
     
-    print(f"✅ 도메인 해석 성공")
+    logger.debug("✅ 도메인 해석 성공")
     
     url = f"{base_url}/route"
     headers = generate_route_api_header(country=country, service_phase=service_phase)
     
-    print(f"\nAPI 호출 중: {url}")
-    print(f"헤더: {headers}")
+    logger.info("\nAPI 호출 중: %s", url, extra=fields(method='GET', url=url))
+    logger.debug("헤더: %s", headers)
     
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = client.get(url, headers=headers)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.Timeout:
-        print(f"❌ 요청 시간 초과")
+        logger.error("❌ 요청 시간 초과")
         raise
     except requests.exceptions.ConnectionError as e:
-        print(f"❌ 연결 실패: {e}")
+        logger.error("❌ 연결 실패: %s", e)
         raise
     except requests.exceptions.HTTPError as e:
-        print(f"❌ HTTP 에러 발생")
+        logger.error("❌ HTTP 에러 발생")
         if hasattr(e, 'response') and e.response is not None:
-            print(f"응답 상태 코드: {e.response.status_code}")
-            print(f"응답 내용: {e.response.text}")
+            logger.error("응답 상태 코드: %s", e.response.status_code)
+            logger.error("응답 내용: %s", e.response.text)
         raise
     except requests.exceptions.RequestException as e:
-        print(f"❌ API 호출 실패: {e}")
+        logger.error("❌ API 호출 실패: %s", e)
         if hasattr(e, 'response') and e.response is not None:
-            print(f"응답 상태 코드: {e.response.status_code}")
-            print(f"응답 내용: {e.response.text}")
+            logger.error("응답 상태 코드: %s", e.response.status_code)
+            logger.error("응답 내용: %s", e.response.text)
         raise
 
 
-def get_devices(country: str = "KR", base_url: str = None, debug: bool = True) -> Dict[str, Any]:
+class RouteCache:
+    """
+    Route API 응답(리전별 apiServer, mqttServer 등) 캐시
+    
+    - 만료 전 ROUTE_REFRESH_MARGIN 안에 조회되면 백그라운드 스레드에서 미리 갱신
+    - 만료 후 갱신에 실패하면 이전 응답을 계속 사용
+    - 실패는 failure_backoff 초 동안 기억하여 그동안 다시 조회하지 않음 (이전 응답 또는 예외)
+    - 동시 조회는 한 번으로 병합 (이전 응답이 있으면 기다리지 않고 이전 응답 사용)
+    """
+    
+    def __init__(self, ttl: float = ROUTE_CACHE_TTL, refresh_margin: float = ROUTE_REFRESH_MARGIN,
+                 failure_backoff: float = ROUTE_FAILURE_BACKOFF):
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.failure_backoff = failure_backoff
+        self._entries = {}        # (country, service_phase) → (route 응답, 만료 시각)
+        self._failures = {}       # (country, service_phase) → (다시 조회할 수 있는 시각, 예외)
+        self._in_flight = {}      # (country, service_phase) → Future
+        self._refreshing = set()
+        self._lock = threading.Lock()
+    
+    def _fetch(self, key: tuple) -> Dict[str, Any]:
+        country, service_phase = key
+        route = get_route_domain(country=country, service_phase=service_phase).get('response', {})
+        with self._lock:
+            self._entries[key] = (route, time.monotonic() + self.ttl)
+            self._failures.pop(key, None)
+        return route
+    
+    def _refresh_in_background(self, key: tuple):
+        def refresh():
+            try:
+                self._fetch(key)
+            except Exception as e:
+                logger.warning("⚠️  Route 정보 백그라운드 갱신 실패: %s", e)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+        
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        threading.Thread(target=refresh, name="thinq-route-refresh", daemon=True).start()
+    
+    def get(self, country: str = "KR", service_phase: str = "OP") -> Dict[str, Any]:
+        """
+        Route 정보 조회 (캐시 우선)
+        
+        Returns:
+            Route API의 response 객체 (apiServer, mqttServer, webSocketServer)
+        """
+        key = (country, service_phase)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= now:
+                failure = self._failures.get(key)
+                future = self._in_flight.get(key)
+                leader = future is None
+                if failure is not None and now < failure[0]:
+                    # 최근에 실패했으면 다시 조회하지 않음
+                    if entry is not None:
+                        return entry[0]
+                    raise failure[1]
+                if leader:
+                    future = Future()
+                    self._in_flight[key] = future
+        
+        if entry is not None and entry[1] > now:
+            if entry[1] - now < self.refresh_margin:
+                self._refresh_in_background(key)
+            return entry[0]
+        
+        if not leader:
+            # 다른 요청이 조회 중이면 이전 정보를 쓰거나 그 결과를 기다림
+            if entry is not None:
+                return entry[0]
+            return future.result(timeout=HTTP_TIMEOUT * (HTTP_MAX_RETRIES + 1) + 5)
+        
+        try:
+            route = self._fetch(key)
+        except Exception as e:
+            with self._lock:
+                self._in_flight.pop(key, None)
+                self._failures[key] = (time.monotonic() + self.failure_backoff, e)
+            future.set_exception(e)
+            if entry is not None:
+                logger.warning("⚠️  Route 정보 갱신 실패, %.0f초 동안 이전 정보를 사용합니다.", self.failure_backoff)
+                return entry[0]
+            logger.warning("⚠️  Route 정보를 조회할 수 없어 %.0f초 동안 기본 API 서버를 사용합니다: %s",
+                           self.failure_backoff, e)
+            raise
+        
+        with self._lock:
+            self._in_flight.pop(key, None)
+        future.set_result(route)
+        return route
+    
+    def api_base_url(self, country: str = "KR", service_phase: str = "OP") -> str:
+        """리전 API 서버 주소 (조회 실패 시 THINQ_API_BASE_URL)"""
+        try:
+            api_server = self.get(country, service_phase).get('apiServer')
+        except Exception as e:
+            # 실패 경고는 조회한 요청에서 한 번만 기록 (재조회 대기 중에는 debug)
+            logger.debug("Route 정보 없이 기본 API 서버를 사용합니다: %s", e)
+            api_server = None
+        return api_server.rstrip('/') if api_server else THINQ_API_BASE_URL
+    
+    def invalidate(self):
+        """저장된 Route 정보 삭제 (다음 조회 시 다시 요청)"""
+        with self._lock:
+            self._entries.clear()
+            self._failures.clear()
+
+
+route_cache = RouteCache()
+
+
+def get_api_base_url(country: str = "KR") -> str:
+    """Device API 호출에 사용할 리전 API 서버 주소 (Route 캐시 사용)"""
+    return route_cache.api_base_url(country)
+
+
+def get_devices(country: str = "KR", base_url: str = None, debug: bool = None,
+                client: Optional[ThinQClient] = None) -> Dict[str, Any]:
     """
     ThinQ Platform에 등록한 디바이스 목록을 조회합니다.
     다른 API를 사용하기 전에 반드시 한 번은 호출되어야 합니다.
     
     Args:
         country: ISO 3166-1 alpha-2 국가 코드 (예: KR, US, GB)
-        base_url: 사용할 베이스 URL (None이면 기본값 사용)
-        debug: 디버그 정보 출력 여부
+        base_url: 사용할 베이스 URL (None이면 Route 캐시의 리전 API 서버)
+        debug: 응답 전체 등 디버그 정보 출력 여부 (None이면 로거가 DEBUG 레벨일 때만)
+        client: 사용할 HTTP 클라이언트 (None이면 공유 기본 클라이언트)
     
     Returns:
         API 응답 (JSON) - 디바이스 목록 포함
@@ -192,25 +449,30 @@ def get_devices(country: str = "KR", base_url: str = None, debug: bool = True) -
     import json
     
     if base_url is None:
-        base_url = THINQ_API_BASE_URL
+        base_url = get_api_base_url(country)
+    if client is None:
+        client = get_default_client()
+    
+    if debug is None:
+        debug = logger.isEnabledFor(logging.DEBUG)
     
     url = f"{base_url}/devices"
     headers = generate_device_api_header(country=country)
     
-    print(f"\nAPI 호출 중: {url}")
+    logger.info("\nAPI 호출 중: %s", url, extra=fields(method='GET', url=url))
     if debug:
-        print(f"헤더: {json.dumps(headers, indent=2, ensure_ascii=False)}")
+        logger.debug("헤더: %s", pretty(headers))
     
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = client.get(url, headers=headers)
         
         # 응답 상태 코드 확인
-        print(f"응답 상태 코드: {response.status_code}")
+        logger.debug("응답 상태 코드: %s", response.status_code)
         
         if debug:
-            print(f"\n응답 헤더:")
+            logger.debug("\n응답 헤더:")
             for key, value in response.headers.items():
-                print(f"  {key}: {value}")
+                logger.debug("  %s: %s", key, value)
         
         response.raise_for_status()
         
@@ -218,82 +480,83 @@ def get_devices(country: str = "KR", base_url: str = None, debug: bool = True) -
         response_data = response.json()
         
         if debug:
-            print(f"\n📥 API 응답 (전체):")
-            print(json.dumps(response_data, indent=2, ensure_ascii=False))
-            print(f"\n📥 API 응답 구조 분석:")
-            print(f"  최상위 키: {list(response_data.keys())}")
+            logger.debug("\n📥 API 응답 (전체):")
+            logger.debug("%s", pretty(response_data))
+            logger.debug("\n📥 API 응답 구조 분석:")
+            logger.debug("  최상위 키: %s", list(response_data.keys()))
             
             # 사용자 정보 확인
-            print(f"\n👤 사용자/인증 정보 확인:")
+            logger.debug("\n👤 사용자/인증 정보 확인:")
             if 'result' in response_data:
                 result = response_data['result']
                 if isinstance(result, dict):
                     # 사용자 관련 키 확인
                     user_keys = [k for k in result.keys() if 'user' in k.lower() or 'account' in k.lower() or 'auth' in k.lower()]
                     if user_keys:
-                        print(f"  사용자 관련 키: {user_keys}")
+                        logger.debug("  사용자 관련 키: %s", user_keys)
                     # 메시지 ID 확인 (요청 추적)
                     if 'messageId' in response_data:
-                        print(f"  응답 메시지 ID: {response_data.get('messageId')}")
+                        logger.debug("  응답 메시지 ID: %s", response_data.get('messageId'))
                     if 'timestamp' in response_data:
-                        print(f"  응답 타임스탬프: {response_data.get('timestamp')}")
+                        logger.debug("  응답 타임스탬프: %s", response_data.get('timestamp'))
             
             # 디바이스 정보 확인
             if 'result' in response_data:
-                print(f"  result 타입: {type(response_data['result'])}")
+                logger.debug("  result 타입: %s", type(response_data['result']))
                 if isinstance(response_data['result'], dict):
-                    print(f"  result 키: {list(response_data['result'].keys())}")
+                    logger.debug("  result 키: %s", list(response_data['result'].keys()))
                     if 'devices' in response_data['result']:
                         devices = response_data['result']['devices']
-                        print(f"  devices 개수: {len(devices) if isinstance(devices, list) else 'N/A'}")
+                        logger.debug("  devices 개수: %s", len(devices) if isinstance(devices, list) else 'N/A')
                         if isinstance(devices, list) and len(devices) > 0:
-                            print(f"  첫 번째 디바이스 키: {list(devices[0].keys())}")
+                            logger.debug("  첫 번째 디바이스 키: %s", list(devices[0].keys()))
                         elif isinstance(devices, list) and len(devices) == 0:
-                            print(f"  ⚠️  디바이스 목록이 비어있습니다!")
-                            print(f"     - PAT 토큰이 올바른 계정의 것인지 확인하세요")
-                            print(f"     - 해당 계정에 등록된 디바이스가 있는지 확인하세요")
-                            print(f"     - ThinQ 앱에서 디바이스가 정상적으로 등록되어 있는지 확인하세요")
+                            logger.warning("  ⚠️  디바이스 목록이 비어있습니다!")
+                            logger.debug("     - PAT 토큰이 올바른 계정의 것인지 확인하세요")
+                            logger.debug("     - 해당 계정에 등록된 디바이스가 있는지 확인하세요")
+                            logger.debug("     - ThinQ 앱에서 디바이스가 정상적으로 등록되어 있는지 확인하세요")
         
         return response_data
     except requests.exceptions.HTTPError as e:
-        print(f"❌ HTTP 에러 발생")
+        logger.error("❌ HTTP 에러 발생")
         if hasattr(e, 'response') and e.response is not None:
             status_code = e.response.status_code
-            print(f"응답 상태 코드: {status_code}")
+            logger.error("응답 상태 코드: %s", status_code)
             
             # 인증 관련 에러 체크
             if status_code == 401:
-                print(f"\n🔐 인증 실패 (401 Unauthorized)")
-                print(f"   가능한 원인:")
-                print(f"   1. PAT 토큰이 잘못되었거나 만료되었습니다")
-                print(f"   2. PAT 토큰이 다른 계정의 것입니다")
-                print(f"   3. Authorization 헤더 형식이 잘못되었습니다")
-                print(f"   해결 방법:")
-                print(f"   - https://connect-pat.lgthinq.com 에서 새로운 PAT 토큰을 발급받으세요")
-                print(f"   - 코드의 PAT_TOKEN 변수를 올바른 토큰으로 업데이트하세요")
+                logger.debug("\n🔐 인증 실패 (401 Unauthorized)")
+                logger.debug("   가능한 원인:")
+                logger.debug("   1. PAT 토큰이 잘못되었거나 만료되었습니다")
+                logger.debug("   2. PAT 토큰이 다른 계정의 것입니다")
+                logger.debug("   3. Authorization 헤더 형식이 잘못되었습니다")
+                logger.debug("   해결 방법:")
+                logger.debug("   - https://connect-pat.lgthinq.com 에서 새로운 PAT 토큰을 발급받으세요")
+                logger.debug("   - 코드의 PAT_TOKEN 변수를 올바른 토큰으로 업데이트하세요")
             elif status_code == 400:
-                print(f"\n⚠️  잘못된 요청 (400 Bad Request)")
-                print(f"   가능한 원인:")
-                print(f"   1. 필수 헤더가 누락되었습니다")
-                print(f"   2. 헤더 형식이 잘못되었습니다")
-                print(f"   3. x-client-id가 올바르지 않습니다")
+                logger.warning("\n⚠️  잘못된 요청 (400 Bad Request)")
+                logger.debug("   가능한 원인:")
+                logger.debug("   1. 필수 헤더가 누락되었습니다")
+                logger.debug("   2. 헤더 형식이 잘못되었습니다")
+                logger.debug("   3. x-client-id가 올바르지 않습니다")
             
-            print(f"\n응답 내용: {e.response.text}")
+            logger.error("\n응답 내용: %s", e.response.text)
             try:
                 error_json = e.response.json()
-                print(f"에러 응답 (JSON): {json.dumps(error_json, indent=2, ensure_ascii=False)}")
+                logger.error("에러 응답 (JSON): %s", pretty(error_json))
             except:
                 pass
         raise
     except requests.exceptions.RequestException as e:
-        print(f"❌ API 호출 실패: {e}")
+        logger.error("❌ API 호출 실패: %s", e)
         if hasattr(e, 'response') and e.response is not None:
-            print(f"응답 상태 코드: {e.response.status_code}")
-            print(f"응답 내용: {e.response.text}")
+            logger.error("응답 상태 코드: %s", e.response.status_code)
+            logger.error("응답 내용: %s", e.response.text)
         raise
 
 
-def get_device_profile(device_id: str, country: str = "KR", base_url: str = None) -> Dict[str, Any]:
+def get_device_profile(device_id: str, country: str = "KR", base_url: str = None,
+                       client: Optional[ThinQClient] = None) -> Dict[str, Any]:
     """
     디바이스 프로파일을 조회합니다.
     디바이스 프로파일은 LG 가전의 속성을 기술한 정보입니다.
@@ -301,77 +564,85 @@ def get_device_profile(device_id: str, country: str = "KR", base_url: str = None
     Args:
         device_id: 디바이스 ID
         country: ISO 3166-1 alpha-2 국가 코드 (예: KR, US, GB)
-        base_url: 사용할 베이스 URL (None이면 기본값 사용)
+        base_url: 사용할 베이스 URL (None이면 Route 캐시의 리전 API 서버)
+        client: 사용할 HTTP 클라이언트 (None이면 공유 기본 클라이언트)
     
     Returns:
         API 응답 (JSON) - 디바이스 프로파일 포함
     """
     if base_url is None:
-        base_url = THINQ_API_BASE_URL
+        base_url = get_api_base_url(country)
+    if client is None:
+        client = get_default_client()
     
     url = f"{base_url}/devices/{device_id}/profile"
     headers = generate_device_api_header(country=country)
     
-    print(f"\nAPI 호출 중: {url}")
+    logger.info("\nAPI 호출 중: %s", url, extra=fields(method='GET', url=url))
     
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = client.get(url, headers=headers)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.HTTPError as e:
-        print(f"❌ HTTP 에러 발생")
+        logger.error("❌ HTTP 에러 발생")
         if hasattr(e, 'response') and e.response is not None:
-            print(f"응답 상태 코드: {e.response.status_code}")
-            print(f"응답 내용: {e.response.text}")
+            logger.error("응답 상태 코드: %s", e.response.status_code)
+            logger.error("응답 내용: %s", e.response.text)
         raise
     except requests.exceptions.RequestException as e:
-        print(f"❌ API 호출 실패: {e}")
+        logger.error("❌ API 호출 실패: %s", e)
         if hasattr(e, 'response') and e.response is not None:
-            print(f"응답 상태 코드: {e.response.status_code}")
-            print(f"응답 내용: {e.response.text}")
+            logger.error("응답 상태 코드: %s", e.response.status_code)
+            logger.error("응답 내용: %s", e.response.text)
         raise
 
 
-def get_device_state(device_id: str, country: str = "KR", base_url: str = None) -> Dict[str, Any]:
+def get_device_state(device_id: str, country: str = "KR", base_url: str = None,
+                     client: Optional[ThinQClient] = None) -> Dict[str, Any]:
     """
     디바이스 현재 상태를 조회합니다.
     
     Args:
         device_id: 디바이스 ID
         country: ISO 3166-1 alpha-2 국가 코드 (예: KR, US, GB)
-        base_url: 사용할 베이스 URL (None이면 기본값 사용)
+        base_url: 사용할 베이스 URL (None이면 Route 캐시의 리전 API 서버)
+        client: 사용할 HTTP 클라이언트 (None이면 공유 기본 클라이언트)
     
     Returns:
         API 응답 (JSON) - 디바이스 상태 포함
     """
     if base_url is None:
-        base_url = THINQ_API_BASE_URL
+        base_url = get_api_base_url(country)
+    if client is None:
+        client = get_default_client()
     
     url = f"{base_url}/devices/{device_id}/state"
     headers = generate_device_api_header(country=country)
     
-    print(f"\nAPI 호출 중: {url}")
+    logger.info("\nAPI 호출 중: %s", url, extra=fields(method='GET', url=url))
     
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = client.get(url, headers=headers)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.HTTPError as e:
-        print(f"❌ HTTP 에러 발생")
+        logger.error("❌ HTTP 에러 발생")
         if hasattr(e, 'response') and e.response is not None:
-            print(f"응답 상태 코드: {e.response.status_code}")
-            print(f"응답 내용: {e.response.text}")
+            logger.error("응답 상태 코드: %s", e.response.status_code)
+            logger.error("응답 내용: %s", e.response.text)
         raise
     except requests.exceptions.RequestException as e:
-        print(f"❌ API 호출 실패: {e}")
+        logger.error("❌ API 호출 실패: %s", e)
         if hasattr(e, 'response') and e.response is not None:
-            print(f"응답 상태 코드: {e.response.status_code}")
-            print(f"응답 내용: {e.response.text}")
+            logger.error("응답 상태 코드: %s", e.response.status_code)
+            logger.error("응답 내용: %s", e.response.text)
         raise
 
 
 def send_device_command(device_id: str, command: Dict[str, Any], country: str = "KR", 
-                       conditional_control: bool = False, base_url: str = None) -> Dict[str, Any]:
+                       conditional_control: bool = False, base_url: str = None,
+                       client: Optional[ThinQClient] = None) -> Dict[str, Any]:
     """
     디바이스에 제어 명령을 전송합니다.
     
@@ -380,13 +651,16 @@ def send_device_command(device_id: str, command: Dict[str, Any], country: str =
         command: 제어 명령 (JSON 객체)
         country: ISO 3166-1 alpha-2 국가 코드 (예: KR, US, GB)
         conditional_control: 조건부 제어 여부 (True면 상태 조회 후 제어 가능한 상태에서만 제어)
-        base_url: 사용할 베이스 URL (None이면 기본값 사용)
+        base_url: 사용할 베이스 URL (None이면 Route 캐시의 리전 API 서버)
+        client: 사용할 HTTP 클라이언트 (None이면 공유 기본 클라이언트)
     
     Returns:
         API 응답 (JSON)
     """
     if base_url is None:
-        base_url = THINQ_API_BASE_URL
+        base_url = get_api_base_url(country)
+    if client is None:
+        client = get_default_client()
     
     url = f"{base_url}/devices/{device_id}/control"
     headers = generate_device_api_header(country=country)
@@ -394,24 +668,24 @@ def send_device_command(device_id: str, command: Dict[str, Any], country: str =
     if conditional_control:
         headers["x-conditional-control"] = "true"
     
-    print(f"\nAPI 호출 중: {url}")
-    print(f"제어 명령: {command}")
+    logger.info("\nAPI 호출 중: %s", url, extra=fields(method='POST', url=url))
+    logger.info("제어 명령: %s", command, extra=fields(device_id=device_id))
     
     try:
-        response = requests.post(url, headers=headers, json=command, timeout=10)
+        response = client.post(url, headers=headers, json=command)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.HTTPError as e:
-        print(f"❌ HTTP 에러 발생")
+        logger.error("❌ HTTP 에러 발생")
         if hasattr(e, 'response') and e.response is not None:
-            print(f"응답 상태 코드: {e.response.status_code}")
-            print(f"응답 내용: {e.response.text}")
+            logger.error("응답 상태 코드: %s", e.response.status_code)
+            logger.error("응답 내용: %s", e.response.text)
         raise
     except requests.exceptions.RequestException as e:
-        print(f"❌ API 호출 실패: {e}")
+        logger.error("❌ API 호출 실패: %s", e)
         if hasattr(e, 'response') and e.response is not None:
-            print(f"응답 상태 코드: {e.response.status_code}")
-            print(f"응답 내용: {e.response.text}")
+            logger.error("응답 상태 코드: %s", e.response.status_code)
+            logger.error("응답 내용: %s", e.response.text)
         raise
 
 
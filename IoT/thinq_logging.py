@@ -0,0 +1,97 @@
+"""
+LG ThinQ 클라이언트 로깅
+
+IoT 모듈은 print 대신 'thinq' 로거로 출력하며, 모드에 따라 출력량과 형식이 정해집니다.
+- console: 메시지를 그대로 stdout에 출력 (CLI/테스트 스크립트 기본값, 응답 전체 등 DEBUG까지)
+- json: 한 줄 JSON(시각, 레벨, 메시지, 추가 필드)으로 stderr에 출력 (INFO 이상)
+- quiet: 한 줄 JSON으로 WARNING 이상만 출력 (서버 기본값)
+
+응답 JSON 전체처럼 만들기 비싼 메시지는 pretty()로 감싸 해당 레벨이 출력될 때만 포맷합니다.
+    logger.debug("응답: %s", pretty(response_data))
+
+환경 변수:
+- THINQ_LOG_MODE: console / json / quiet (기본 console)
+- THINQ_LOG_LEVEL: 모드 기본 레벨 대신 사용할 레벨 (예: DEBUG, INFO)
+"""
+
+import os
+import sys
+import json
+import logging
+from typing import Any, Dict
+
+logger = logging.getLogger('thinq')
+
+LOG_MODES = {
+    'console': logging.DEBUG,
+    'json': logging.INFO,
+    'quiet': logging.WARNING,
+}
+
+
+class pretty:
+    """출력될 때만 json.dumps(indent=2)로 포맷되는 값"""
+    
+    __slots__ = ('value',)
+    
+    def __init__(self, value: Any):
+        self.value = value
+    
+    def __str__(self):
+        try:
+            return json.dumps(self.value, indent=2, ensure_ascii=False, default=str)
+        except (TypeError, ValueError):
+            return str(self.value)
+
+
+def fields(**kwargs) -> Dict[str, Any]:
+    """JSON 로그에 추가할 필드 (logger.info(..., extra=fields(url=url)))"""
+    return {'fields': kwargs}
+
+
+class JsonFormatter(logging.Formatter):
+    """한 줄 JSON 포맷"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage().strip(),
+        }
+        entry.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def configure_logging(mode: str = None, level: str = None) -> logging.Logger:
+    """
+    로깅 모드 설정 (기존 핸들러 교체)
+    
+    Args:
+        mode: console / json / quiet (None이면 THINQ_LOG_MODE, 기본 console)
+        level: 로그 레벨 이름 (None이면 THINQ_LOG_LEVEL, 없으면 모드 기본값)
+    """
+    mode = (mode or os.environ.get('THINQ_LOG_MODE') or 'console').lower()
+    if mode not in LOG_MODES:
+        raise ValueError(f"지원하지 않는 로그 모드: {mode} (가능한 값: {', '.join(LOG_MODES)})")
+    level = level or os.environ.get('THINQ_LOG_LEVEL')
+    
+    if mode == 'console':
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+    else:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(JsonFormatter())
+    
+    for old in list(logger.handlers):
+        logger.removeHandler(old)
+    logger.addHandler(handler)
+    logger.setLevel(getattr(logging, level.upper()) if level else LOG_MODES[mode])
+    logger.propagate = False
+    return logger
+
+
+if not logger.handlers:
+    configure_logging()
@@ -3,43 +3,60 @@ import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from sklearn.compose import ColumnTransformer
-from sklearn.pipeline import Pipeline
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor, VotingRegressor, ExtraTreesRegressor
 from sklearn.metrics import mean_squared_error, r2_score, classification_report, confusion_matrix
 from sklearn.model_selection import cross_val_score
 import joblib
+import argparse
+import os
+import sys
 import warnings
 warnings.filterwarnings('ignore')
 
+# 피처 정의/추론 모듈은 서버와 공유 (model/server)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../server'))
+
+from ensemble_sweep import build_ensemble, run_sweep, pareto_front, select_smallest, DEFAULT_N_ESTIMATORS, DEFAULT_MAX_DEPTH
+from feature_store import load_training_frame, DEFAULT_CACHE_DIR
+from derived_features import NUMERIC_FEATURES, CATEGORICAL_FEATURES, build_feature_frame
+from parallel_cv import cross_validate_parallel, fold_averaged_ensemble
+from flat_model import export_flat_model, flat_model_path
+from fast_predictor import feature_order_path
+
+parser = argparse.ArgumentParser(description="AI 서비스용 체온 예측 모델 학습")
+parser.add_argument('--data', default="/Users/Iris/인공지능서비스개발2/data/extracted_data_sampled_20rows.csv",
+                    help="학습용 피처 테이블 CSV (extract_features.py 출력 형식)")
+parser.add_argument('--feature-cache', default=DEFAULT_CACHE_DIR, help="정제/파생 피처 캐시 폴더")
+parser.add_argument('--no-feature-cache', action='store_true', help="피처 캐시를 사용하지 않음")
+parser.add_argument('--refresh-features', action='store_true', help="캐시가 있어도 피처를 다시 계산")
+parser.add_argument('--n-estimators', type=int, default=DEFAULT_N_ESTIMATORS, help="모델별 트리 수 (기본 1000)")
+parser.add_argument('--max-depth', type=int, default=DEFAULT_MAX_DEPTH, help="RandomForest 최대 깊이 (ExtraTrees는 +5, 기본 20)")
+parser.add_argument('--sweep', action='store_true', help="트리 수/깊이 조합을 탐색하고 허용 오차 안의 가장 작은 모델로 학습")
+parser.add_argument('--sweep-sizes', default='50,100,200,500,1000', help="탐색할 트리 수 목록")
+parser.add_argument('--sweep-depths', default='10,15,20', help="탐색할 RandomForest 최대 깊이 목록")
+parser.add_argument('--rmse-tolerance', type=float, default=0.01, help="최소 RMSE 대비 허용 오차(°C)")
+parser.add_argument('--sweep-report', default='ensemble_sweep_report.csv', help="탐색 결과 CSV 경로")
+parser.add_argument('--parallel-cv', action='store_true',
+                    help="CV 폴드와 최종 학습을 프로세스 병렬로 실행하고 폴드 모델로 CV 점수 계산 (재학습 없음)")
+parser.add_argument('--cv-workers', type=int, default=None, help="병렬 CV 동시 작업 수 (기본: CPU 수)")
+parser.add_argument('--skip-final-fit', action='store_true',
+                    help="전체 학습 데이터 학습을 건너뛰고 폴드 모델 평균을 최종 모델로 사용 (--parallel-cv 포함)")
+args = parser.parse_args()
+if args.skip_final_fit:
+    args.parallel_cv = True
+
 print("🚀 AI 서비스용 체온 예측 모델 학습 (나이 피처 포함)")
 print("=" * 60)
 
-# 1️⃣ 데이터 불러오기 및 전처리
+# 1️⃣ 데이터 불러오기 및 전처리 (정제/파생 피처 결과는 캐시에서 재사용)
+cache_dir = None if args.no_feature_cache else args.feature_cache
 try:
-    df = pd.read_csv("/Users/Iris/인공지능서비스개발2/data/extracted_data_sampled_20rows.csv")
-    print(f"데이터 로드 완료: {df.shape[0]}행, {df.shape[1]}열")
+    df, cache_hit = load_training_frame(args.data, cache_dir=cache_dir, refresh=args.refresh_features)
+    print(f"데이터 로드 완료: {df.shape[0]}행, {df.shape[1]}열" + (" (피처 캐시 사용)" if cache_hit else ""))
 except FileNotFoundError:
     print("❌ 데이터 파일을 찾을 수 없습니다!")
     exit(1)
 
-# sid 컬럼이 있는지 확인 후 제거
-if "sid" in df.columns:
-    df = df.drop(columns=["sid"])
-    print("✅ sid 컬럼 제거 완료")
-
-# 결측값 처리
-print(f"결측값 처리 전: {df.shape[0]}행")
-df = df.dropna()
-print(f"결측값 처리 후: {df.shape[0]}행")
-
-# 온도 0 값 제거 (비정상적인 데이터)
 if "TEMP_median" in df.columns:
-    temp_zero_count = (df["TEMP_median"] == 0).sum()
-    if temp_zero_count > 0:
-        print(f"⚠️  온도 0인 비정상 데이터 {temp_zero_count}개 발견, 제거합니다.")
-        df = df[df["TEMP_median"] != 0]
-        print(f"온도 0 값 제거 후: {df.shape[0]}행")
-    
     # 온도 범위 확인
     temp_min = df["TEMP_median"].min()
     temp_max = df["TEMP_median"].max()
@@ -63,19 +80,13 @@ print("6. age (8.7%) - 나이")
 
 # 필수 피처 정의
 essential_features = ['bmi', 'mean_sa02', 'HRV_SDNN', 'HR_mean', 'age']  # age 추가
-cat_features = ['gender']
+cat_features = list(CATEGORICAL_FEATURES)
 
-# 파생 피처 계산
-print("\n🔧 필수 파생 피처 계산")
-df['hrv_hr_ratio'] = df['HRV_SDNN'] / df['HR_mean']
-df['bmi_hr_interaction'] = df['bmi'] * df['HR_mean']
+# 파생 피처 (hrv_hr_ratio, bmi_hr_interaction, age_bmi_interaction, age_hrv_ratio)는
+# load_training_frame()에서 서버와 같은 공식으로 계산됨 (../server/derived_features.py)
 
-# 나이 관련 파생 피처 추가
-df['age_bmi_interaction'] = df['age'] * df['bmi']  # 나이와 BMI 상호작용
-df['age_hrv_ratio'] = df['age'] / (df['HRV_SDNN'] + 1)  # 나이와 HRV 비율 (0으로 나누기 방지)
-
-# 최종 필수 피처 (6개 + 파생 피처)
-final_features = ['bmi', 'mean_sa02', 'HRV_SDNN', 'hrv_hr_ratio', 'bmi_hr_interaction', 'age', 'age_bmi_interaction', 'age_hrv_ratio']
+# 최종 필수 피처 (6개 + 파생 피처, 서버 입력 열 순서와 동일)
+final_features = list(NUMERIC_FEATURES)
 
 print(f"✅ 최종 필수 피처: {final_features}")
 
@@ -120,44 +131,50 @@ preprocessor = ColumnTransformer(transformers=transformers)
 # 5️⃣ 최적화된 앙상블 모델
 print("\n🎯 최적화된 앙상블 모델 구성 (나이 피처 포함)")
 
-# RandomForest 파이프라인
-rf_pipeline = Pipeline([
-    ("preprocess", preprocessor),
-    ("model", RandomForestRegressor(n_estimators=1000, max_depth=20, min_samples_split=3, 
-                                   min_samples_leaf=1, random_state=42, n_jobs=-1))
-])
-
-# ExtraTrees 파이프라인
-et_pipeline = Pipeline([
-    ("preprocess", preprocessor),
-    ("model", ExtraTreesRegressor(n_estimators=1000, max_depth=25, min_samples_split=2,
-                                 min_samples_leaf=1, random_state=42, n_jobs=-1))
-])
-
-# GradientBoosting 파이프라인 (최적 파라미터)
-gb_pipeline = Pipeline([
-    ("preprocess", preprocessor),
-    ("model", GradientBoostingRegressor(
-        n_estimators=1000, 
-        learning_rate=0.01, 
-        max_depth=6, 
-        subsample=0.9, 
-        random_state=42
-    ))
-])
-
-# 최적화된 앙상블 모델 생성
-ensemble = VotingRegressor([
-    ('rf', rf_pipeline),
-    ('et', et_pipeline), 
-    ('gb', gb_pipeline)
-])
+n_estimators, max_depth = args.n_estimators, args.max_depth
+
+# 트리 수/깊이 탐색: 검증 RMSE, 예측 지연 시간, 저장 크기 비교
+if args.sweep:
+    sizes = [int(v) for v in args.sweep_sizes.split(',')]
+    depths = [int(v) for v in args.sweep_depths.split(',')]
+    print(f"\n🔍 앙상블 크기 탐색: 트리 {sizes} × 깊이 {depths}")
+    sweep_results = pareto_front(run_sweep(preprocessor, X_train, y_train, X_valid, y_valid, sizes, depths))
+    
+    print("\n📊 정확도/비용 파레토 표 (* = 파레토 최적):")
+    table = sweep_results.sort_values(['rmse', 'pickle_mb'])
+    table['pareto'] = table['pareto'].map({True: '*', False: ''})
+    print(table.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    sweep_results.to_csv(args.sweep_report, index=False)
+    print(f"✅ 탐색 결과 저장: {args.sweep_report}")
+    
+    selected = select_smallest(sweep_results, args.rmse_tolerance)
+    n_estimators, max_depth = int(selected['n_estimators']), int(selected['max_depth'])
+    print(f"\n✅ 선택된 구성 (최소 RMSE + {args.rmse_tolerance}°C 이내에서 가장 작은 모델): "
+          f"트리 {n_estimators}개, 깊이 {max_depth} (RMSE {selected['rmse']:.4f}°C, "
+          f"단일 예측 {selected['single_ms']:.1f}ms, {selected['pickle_mb']:.1f}MB)")
+
+# RandomForest + ExtraTrees + GradientBoosting, 전처리는 한 번만 수행하고 변환된 행렬을 세 모델에 나눠 전달
+print(f"앙상블 구성: 모델별 트리 {n_estimators}개, RandomForest 깊이 {max_depth}")
+ensemble = build_ensemble(preprocessor, n_estimators, max_depth)
 
 # 6️⃣ 모델 학습 및 성능 평가
 print("\n📊 모델 학습 및 성능 평가")
 
 # 앙상블 모델 학습
-ensemble.fit(X_train, y_train)
+if args.parallel_cv:
+    # 5개 폴드 + 최종 학습을 동시에 실행 (교차 검증은 폴드 모델의 검증 폴드 예측으로 계산)
+    print(f"병렬 교차 검증: 폴드 5개{' (최종 학습 생략)' if args.skip_final_fit else ' + 최종 학습'} 동시 실행")
+    cv_result = cross_validate_parallel(ensemble, X_train, y_train, cv=5, workers=args.cv_workers,
+                                        final_fit=not args.skip_final_fit)
+    print(f"  학습 시간: {cv_result['wall_seconds']:.1f}초 "
+          f"(작업별 합계 {sum(cv_result['fit_seconds']):.1f}초)")
+    if args.skip_final_fit:
+        ensemble = fold_averaged_ensemble(cv_result['fold_models'])
+        print(f"  최종 모델: 폴드 모델 5개 평균 (멤버 {len(ensemble.estimators_)}개)")
+    else:
+        ensemble = cv_result['final_model']
+else:
+    ensemble.fit(X_train, y_train)
 y_pred_ensemble = ensemble.predict(X_valid)
 
 # 성능 평가
@@ -171,9 +188,14 @@ print(f"  RMSE: {np.sqrt(mse_ensemble):.4f}°C")
 
 # 교차 검증 성능
 print("\n📊 교차 검증 성능 (5-fold CV):")
-cv_scores = cross_val_score(ensemble, X_train, y_train, cv=5, scoring='r2')
+if args.parallel_cv:
+    cv_scores = cv_result['fold_r2']
+else:
+    cv_scores = cross_val_score(ensemble, X_train, y_train, cv=5, scoring='r2')
 print(f"  CV R² Score: {cv_scores.mean():.4f} (+/- {cv_scores.std() * 2:.4f})")
 print(f"  CV 개별 점수: {cv_scores}")
+if args.parallel_cv:
+    print(f"  Out-of-fold R²: {cv_result['oof_r2']:.4f}, RMSE: {cv_result['oof_rmse']:.4f}°C")
 
 # 분류 성능 평가 (냉기/적정/더위)
 print("\n📊 분류 성능 평가")
@@ -296,9 +318,22 @@ print(df_summary.to_string(index=False))
 # 7️⃣ 모델 저장
 print("\n💾 모델 저장")
 model_path = '/Users/Iris/인공지능서비스개발2/model/ai_thermal_model_with_age.pkl'
-joblib.dump(ensemble, model_path)
+# 비압축 저장: 서버에서 joblib.load(mmap_mode='r')로 큰 배열을 메모리 매핑할 수 있음
+joblib.dump(ensemble, model_path, compress=0)
 print(f"✅ AI 서비스 모델 저장 완료: {model_path}")
 
+# 피처 열 순서 저장 (서버가 DataFrame 없이 NumPy 행을 같은 순서로 채움)
+import json
+feature_order = {'numeric_features': final_features, 'categorical_features': cat_features}
+with open(feature_order_path(model_path), 'w', encoding='utf-8') as f:
+    json.dump(feature_order, f, ensure_ascii=False, indent=2)
+print(f"✅ 피처 열 순서 저장 완료: {feature_order_path(model_path)}")
+
+# 평탄화 추론 모델 저장 (서버 고속 추론용, 원본 모델과 예측값 비트 단위 동일)
+flat_path = flat_model_path(model_path)
+flat_model = export_flat_model(ensemble, flat_path)
+print(f"✅ 평탄화 추론 모델 저장 완료: {flat_path} (트리 {flat_model.n_trees}개, 노드 {flat_model.n_nodes}개)")
+
 # 8️⃣ 예측 함수 정의 및 저장
 def predict_temperature_with_age(hr_mean, hrv_sdnn, bmi, mean_sa02, gender, age):
     """
@@ -315,24 +350,8 @@ def predict_temperature_with_age(hr_mean, hrv_sdnn, bmi, mean_sa02, gender, age)
     Returns:
     - 예측된 체온 (°C)
     """
-    # 파생 피처 계산
-    hrv_hr_ratio = hrv_sdnn / hr_mean
-    bmi_hr_interaction = bmi * hr_mean
-    age_bmi_interaction = age * bmi
-    age_hrv_ratio = age / (hrv_sdnn + 1)  # 0으로 나누기 방지
-    
-    # 데이터 준비
-    data = pd.DataFrame({
-        'bmi': [bmi],
-        'mean_sa02': [mean_sa02], 
-        'HRV_SDNN': [hrv_sdnn],
-        'hrv_hr_ratio': [hrv_hr_ratio],
-        'bmi_hr_interaction': [bmi_hr_interaction],
-        'age': [age],
-        'age_bmi_interaction': [age_bmi_interaction],
-        'age_hrv_ratio': [age_hrv_ratio],
-        'gender': [gender]
-    })
+    # 데이터 준비 (파생 피처는 서버와 같은 공식)
+    data = build_feature_frame(hr_mean, hrv_sdnn, bmi, mean_sa02, gender, age)
     
     # 예측
     temp_pred = ensemble.predict(data)[0]
@@ -384,6 +403,8 @@ print("✅ 메모리 효율적")
 
 print("\n📁 저장된 파일:")
 print("- ai_thermal_model_with_age.pkl: 학습된 모델 (나이 포함)")
+print("- ai_thermal_model_with_age.flat.npz: 평탄화 추론 모델 (서버용)")
+print("- ai_thermal_model_with_age.features.json: 피처 열 순서 (서버 고속 예측 경로용)")
 print("- predict_function_with_age.pkl: 예측 함수 (나이 포함)")
 
 print(f"\n🏆 AI 서비스용 체온 예측 모델 완성! (나이 피처 포함) 🎉")
@@ -0,0 +1,119 @@
+"""
+피처 계산 처리량 벤치마크 (derived_features.py)
+
+행 수(기본 1, 1,000, 1,000,000)마다 다음 경로의 소요 시간과 초당 처리 행 수를 측정합니다.
+- records → DataFrame (기존): 키마다 리스트를 만든 뒤 DataFrame 생성 (이전 /predict_batch 경로)
+- records → 행렬: columns_from_records() + feature_matrix() (현재 /predict_batch 평탄화 엔진 경로)
+- 배열 → 행렬: 이미 배열로 된 입력의 feature_matrix()
+- 스칼라 → 행: 미리 할당한 행을 채우는 단일 예측 경로 (1행일 때만)
+- 학습 테이블: add_derived_features() (학습 스크립트/피처 캐시 경로)
+
+사용법:
+    python benchmark_features.py
+    python benchmark_features.py --sizes 1,1000,100000
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../server'))
+from derived_features import (add_derived_features, build_feature_frame, columns_from_records,
+                              feature_matrix, NUMERIC_FEATURES)
+
+DEFAULT_SIZES = '1,1000,1000000'
+
+# 한 경로를 반복 측정하는 최소 시간(초)
+MIN_MEASURE_SECONDS = 0.2
+
+
+def make_inputs(n, seed=42):
+    """서버 입력 범위의 무작위 입력 배열"""
+    rng = np.random.default_rng(seed)
+    return {
+        'hr_mean': rng.uniform(40, 120, n),
+        'hrv_sdnn': rng.uniform(10, 300, n),
+        'bmi': rng.uniform(15, 45, n),
+        'mean_sa02': rng.uniform(85, 100, n),
+        'gender': rng.choice(np.array(['M', 'F'], dtype=object), n),
+        'age': rng.integers(18, 90, n)
+    }
+
+
+def legacy_frame(records):
+    """이전 /predict_batch 경로 (키별 리스트 → DataFrame)"""
+    return build_feature_frame(
+        hr_mean=[float(r['hr_mean']) for r in records],
+        hrv_sdnn=[float(r['hrv_sdnn']) for r in records],
+        bmi=[float(r['bmi']) for r in records],
+        mean_sa02=[float(r['mean_sa02']) for r in records],
+        gender=[str(r['gender']) for r in records],
+        age=[int(r['age']) for r in records]
+    )
+
+
+def measure(function):
+    """최소 MIN_MEASURE_SECONDS 동안 반복한 호출당 중앙값 시간(초)"""
+    times = []
+    deadline = time.perf_counter() + MIN_MEASURE_SECONDS
+    while not times or (time.perf_counter() < deadline and len(times) < 1000):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def run_benchmark(sizes):
+    """행 수 × 경로별 측정 결과 DataFrame"""
+    indicators = ['M']
+    results = []
+    for n in sizes:
+        inputs = make_inputs(n)
+        records = pd.DataFrame(inputs).to_dict('records')
+        table = pd.DataFrame({
+            'HR_mean': inputs['hr_mean'], 'HRV_SDNN': inputs['hrv_sdnn'], 'bmi': inputs['bmi'],
+            'mean_sa02': inputs['mean_sa02'], 'age': inputs['age'], 'gender': inputs['gender']
+        })
+        
+        paths = {
+            'records → DataFrame (기존)': lambda: legacy_frame(records),
+            'records → 행렬': lambda: feature_matrix(**columns_from_records(records),
+                                                     indicator_categories=indicators),
+            '배열 → 행렬': lambda: feature_matrix(**inputs, indicator_categories=indicators),
+            '학습 테이블': lambda: add_derived_features(table)
+        }
+        if n == 1:
+            row = np.zeros((1, len(NUMERIC_FEATURES) + len(indicators)))
+            scalar = {key: (values[0].item() if hasattr(values[0], 'item') else values[0])
+                      for key, values in inputs.items()}
+            paths['스칼라 → 행'] = lambda: feature_matrix(**scalar, indicator_categories=indicators, out=row)
+        
+        for name, function in paths.items():
+            seconds = measure(function)
+            results.append({'rows': n, 'path': name, 'ms': seconds * 1000, 'rows_per_s': n / seconds})
+            print(f"  {n:>9,d}행 | {name:<24} {seconds * 1000:10.3f}ms  {n / seconds:14,.0f}행/초")
+    
+    return pd.DataFrame(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="피처 계산 처리량 벤치마크")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help="측정할 행 수 목록 (기본 1,1000,1000000)")
+    args = parser.parse_args()
+    
+    sizes = [int(v) for v in args.sizes.split(',')]
+    print(f"🚀 피처 계산 벤치마크: {sizes}행")
+    results = run_benchmark(sizes)
+    
+    legacy = results[results['path'] == 'records → DataFrame (기존)'].set_index('rows')['ms']
+    vectorized = results[results['path'] == 'records → 행렬'].set_index('rows')['ms']
+    print("\n📊 일괄 예측 입력 준비 속도 향상 (기존 / 현재):")
+    for n in sizes:
+        print(f"  {n:>9,d}행: {legacy[n] / vectorized[n]:.1f}배")
+
+
+if __name__ == '__main__':
+    main()
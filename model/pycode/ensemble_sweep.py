@@ -0,0 +1,166 @@
+"""
+앙상블 크기/깊이 탐색 (정확도 ↔ 추론 비용 트레이드오프)
+
+트리 수와 최대 깊이 조합마다 앙상블을 학습하여
+검증 RMSE, 단일/배치 예측 지연 시간, 저장 크기를 측정하고
+파레토 최적 조합과 RMSE 허용 오차 안에서 가장 작은 모델을 찾습니다.
+
+학습 스크립트에서 사용:
+    python aI_service_model_with_age.py --sweep --sweep-sizes 50,100,200,500,1000 --rmse-tolerance 0.01
+"""
+
+import io
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+import joblib
+from sklearn.base import clone
+from sklearn.pipeline import Pipeline
+from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor, VotingRegressor, ExtraTreesRegressor
+from sklearn.metrics import mean_squared_error
+
+# 기본 구성 (트리 1000개, RF 깊이 20, ET 깊이 = RF + 5)
+DEFAULT_N_ESTIMATORS = 1000
+DEFAULT_MAX_DEPTH = 20
+ET_EXTRA_DEPTH = 5
+
+# GradientBoosting은 트리 수 × 학습률을 기본 구성(1000 × 0.01)과 같게 유지
+GB_LEARNING_BUDGET = 10.0
+GB_MAX_LEARNING_RATE = 0.3
+
+# 지연 시간 측정 반복 횟수
+LATENCY_REPEATS = 50
+
+
+def build_ensemble(preprocessor, n_estimators=DEFAULT_N_ESTIMATORS, max_depth=DEFAULT_MAX_DEPTH):
+    """
+    전처리 공유 앙상블 생성
+    
+    Parameters:
+    - preprocessor: ColumnTransformer (복제하여 사용)
+    - n_estimators: 모델별 트리 수
+    - max_depth: RandomForest 최대 깊이 (ExtraTrees는 +5, GradientBoosting은 6 고정)
+    """
+    # RandomForest
+    rf_model = RandomForestRegressor(n_estimators=n_estimators, max_depth=max_depth, min_samples_split=3,
+                                     min_samples_leaf=1, random_state=42, n_jobs=-1)
+    
+    # ExtraTrees
+    et_model = ExtraTreesRegressor(n_estimators=n_estimators, max_depth=max_depth + ET_EXTRA_DEPTH,
+                                   min_samples_split=2, min_samples_leaf=1, random_state=42, n_jobs=-1)
+    
+    # GradientBoosting (트리 수가 줄면 학습률을 높여 같은 학습량 유지)
+    gb_model = GradientBoostingRegressor(
+        n_estimators=n_estimators,
+        learning_rate=min(GB_LEARNING_BUDGET / n_estimators, GB_MAX_LEARNING_RATE),
+        max_depth=6,
+        subsample=0.9,
+        random_state=42
+    )
+    
+    # 전처리는 한 번만 수행하고 변환된 행렬을 세 모델에 나눠 전달
+    return Pipeline([
+        ("preprocess", clone(preprocessor)),
+        ("ensemble", VotingRegressor([
+            ('rf', rf_model),
+            ('et', et_model),
+            ('gb', gb_model)
+        ]))
+    ])
+
+
+def _set_single_threaded(model):
+    """운영 서버 워커와 같은 조건(단일 스레드)으로 측정"""
+    model.set_params(**{key: 1 for key in model.get_params() if key.endswith('n_jobs')})
+
+
+def _median_ms(function, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times) * 1000)
+
+
+def _load_flat_engine():
+    """서버의 평탄화 추론 엔진 (없으면 None)"""
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../server'))
+    try:
+        from flat_model import FlatEnsemble
+        return FlatEnsemble
+    except ImportError:
+        return None
+
+
+def measure_model(model, X_valid, y_valid, repeats=LATENCY_REPEATS, flat_engine=None):
+    """학습된 모델의 정확도, 지연 시간, 저장 크기 측정"""
+    _set_single_threaded(model)
+    y_pred = model.predict(X_valid)
+    
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer, compress=0)
+    
+    single_rows = [X_valid.iloc[[i % len(X_valid)]] for i in range(repeats)]
+    rows = iter(single_rows)
+    result = {
+        'rmse': float(np.sqrt(mean_squared_error(y_valid, y_pred))),
+        'single_ms': _median_ms(lambda: model.predict(next(rows)), repeats),
+        'batch_ms': _median_ms(lambda: model.predict(X_valid), max(3, repeats // 10)),
+        'pickle_mb': buffer.getbuffer().nbytes / 1024 ** 2
+    }
+    
+    if flat_engine is not None:
+        flat = flat_engine.from_model(model)
+        X_flat = [flat.transform_frame(row) for row in single_rows]
+        rows = iter(X_flat)
+        result['flat_single_ms'] = _median_ms(lambda: flat.predict_raw(next(rows)), repeats)
+    
+    return result
+
+
+def run_sweep(preprocessor, X_train, y_train, X_valid, y_valid, sizes, depths, repeats=LATENCY_REPEATS):
+    """
+    트리 수 × 깊이 조합을 학습하고 측정
+    
+    Returns:
+    - 조합별 측정 결과 DataFrame
+    """
+    flat_engine = _load_flat_engine()
+    results = []
+    for max_depth in depths:
+        for n_estimators in sizes:
+            start = time.perf_counter()
+            model = build_ensemble(preprocessor, n_estimators, max_depth)
+            model.fit(X_train, y_train)
+            fit_seconds = time.perf_counter() - start
+            
+            result = {'n_estimators': n_estimators, 'max_depth': max_depth, 'fit_s': fit_seconds}
+            result.update(measure_model(model, X_valid, y_valid, repeats, flat_engine))
+            results.append(result)
+            print(f"  트리 {n_estimators:5d}개, 깊이 {max_depth:3d}: RMSE {result['rmse']:.4f}°C, "
+                  f"단일 {result['single_ms']:.1f}ms, 배치 {result['batch_ms']:.1f}ms, "
+                  f"크기 {result['pickle_mb']:.1f}MB")
+    
+    return pd.DataFrame(results)
+
+
+def pareto_front(results, objectives=('rmse', 'single_ms', 'pickle_mb')):
+    """모든 목표(작을수록 좋음)에서 다른 조합에 지배되지 않는 조합 표시"""
+    values = results[list(objectives)].to_numpy()
+    pareto = []
+    for i in range(len(values)):
+        dominated = np.any(np.all(values <= values[i], axis=1) & np.any(values < values[i], axis=1))
+        pareto.append(not dominated)
+    results = results.copy()
+    results['pareto'] = pareto
+    return results
+
+
+def select_smallest(results, rmse_tolerance):
+    """최소 RMSE + 허용 오차 안에서 저장 크기가 가장 작은 조합"""
+    best_rmse = results['rmse'].min()
+    candidates = results[results['rmse'] <= best_rmse + rmse_tolerance]
+    return candidates.sort_values(['pickle_mb', 'single_ms']).iloc[0]
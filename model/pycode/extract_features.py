@@ -0,0 +1,366 @@
+"""
+DREAMT 64Hz 원데이터에서 학습용 피처 테이블 추출 (스트리밍)
+
+피험자별 원데이터(수 GB)를 통째로 읽지 않고 block_rows 행씩 읽어
+윈도우(기본 30초 = 1920행) 단위로 피처를 계산합니다.
+메모리에는 블록 하나와 아직 끝나지 않은 윈도우 하나만 유지됩니다.
+
+피험자끼리는 독립적이므로 프로세스 풀에서 병렬로 추출하여 피험자별 샤드(<output>.shards/S002.csv)로
+저장한 뒤 하나의 테이블로 합칩니다. 중단된 경우 다시 실행하면 완료된 샤드는 건너뜁니다.
+샤드마다 원데이터 파일의 크기/수정 시각(<sid>.source.json)을 함께 기록하여, 원데이터가 바뀐 피험자는 다시 추출합니다.
+
+윈도우별 피처 (학습 스크립트 입력과 같은 컬럼):
+- HR_mean: HR 평균
+- HRV_SDNN: 연속으로 반복된 값을 뺀 IBI의 표준편차 (ms)
+- TEMP_median: TEMP 중앙값
+- Sleep_Stage: 가장 많이 나온 수면 단계
+- mean_sa02: 원데이터에 SpO2 컬럼이 있으면 윈도우 평균, 없으면 participant_info의 Mean_SaO2
+- gender, bmi, age: participant_info
+
+사용법:
+    python extract_features.py --raw-dir ../data/data_64Hz --participants ../data/participant_info.csv \\
+        --output ../data/extracted_features.csv --per-subject 20 --workers 8
+    python aI_service_model_with_age.py --data ../data/extracted_features.csv
+"""
+
+import os
+import glob
+import json
+import hashlib
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+SAMPLE_RATE = 64
+WINDOW_SECONDS = 30
+BLOCK_ROWS = 1_000_000
+
+# DREAMT의 IBI는 초 단위, HRV_SDNN은 ms 단위로 저장
+IBI_SCALE = 1000.0
+
+RAW_COLUMNS = ['HR', 'IBI', 'TEMP', 'Sleep_Stage']
+SPO2_COLUMNS = ('SpO2', 'SPO2', 'SaO2', 'SAO2')
+OUTPUT_COLUMNS = ['sid', 'HR_mean', 'HRV_SDNN', 'Sleep_Stage', 'TEMP_median', 'gender', 'bmi', 'mean_sa02', 'age']
+
+RAW_FILE_PATTERN = '*_whole_df.csv'
+SHARD_PARAMS_FILE = '_params.json'
+
+
+def load_participants(path):
+    """
+    participant_info.csv → {sid: {'gender', 'bmi', 'mean_sa02', 'age'}}
+    
+    Mean_SaO2는 '95%' 형식도 허용합니다.
+    """
+    info = pd.read_csv(path)
+    info.columns = [c.strip() for c in info.columns]
+    mean_sa02 = pd.to_numeric(info['Mean_SaO2'].astype(str).str.rstrip('%'), errors='coerce')
+    return {
+        str(row.SID): {
+            'gender': row.GENDER,
+            'bmi': row.BMI,
+            'mean_sa02': sa02,
+            'age': row.AGE
+        }
+        for row, sa02 in zip(info.itertuples(index=False), mean_sa02)
+    }
+
+
+def subject_files(raw_dir):
+    """원데이터 폴더의 (sid, 파일 경로) 목록 (S002_whole_df.csv → S002)"""
+    paths = sorted(glob.glob(os.path.join(raw_dir, RAW_FILE_PATTERN)))
+    return [(os.path.basename(path).split('_')[0], path) for path in paths]
+
+
+def _window_features(frame, window_ids, last_ibi, spo2_column):
+    """
+    완성된 윈도우들의 피처 계산
+    
+    Parameters:
+    - frame: 윈도우 경계로 잘린 원데이터 블록
+    - window_ids: 행별 윈도우 번호
+    - last_ibi: 직전 블록의 마지막 IBI (블록 경계의 반복 값 제거용)
+    """
+    hr = pd.to_numeric(frame['HR'], errors='coerce')
+    temp = pd.to_numeric(frame['TEMP'], errors='coerce')
+    ibi = pd.to_numeric(frame['IBI'], errors='coerce')
+    
+    # 64Hz로 채워진 IBI는 같은 박동이 여러 행에 반복되므로 값이 바뀌는 행만 사용
+    previous = ibi.shift(1)
+    previous.iloc[0] = last_ibi
+    beats = (ibi * IBI_SCALE).where(ibi.notna() & (ibi != previous))
+    
+    grouped = pd.DataFrame({'w': window_ids, 'hr': hr, 'temp': temp, 'beat': beats}).groupby('w')
+    features = pd.DataFrame({
+        'HR_mean': grouped['hr'].mean(),
+        'HRV_SDNN': grouped['beat'].std(ddof=0),
+        'TEMP_median': grouped['temp'].median()
+    })
+    
+    stages = pd.DataFrame({'w': window_ids, 'stage': frame['Sleep_Stage'].to_numpy()})
+    counts = stages.dropna().groupby(['w', 'stage']).size()
+    if len(counts):
+        features['Sleep_Stage'] = counts.groupby(level=0).idxmax().map(lambda key: key[1])
+    else:
+        features['Sleep_Stage'] = np.nan
+    
+    if spo2_column is not None:
+        spo2 = pd.to_numeric(frame[spo2_column], errors='coerce')
+        features['mean_sa02'] = pd.DataFrame({'w': window_ids, 'spo2': spo2}).groupby('w')['spo2'].mean()
+    
+    return features, (ibi.iloc[-1] if len(ibi) else last_ibi)
+
+
+def iter_window_features(path, window_rows=SAMPLE_RATE * WINDOW_SECONDS, block_rows=BLOCK_ROWS,
+                         min_rows=None):
+    """
+    원데이터 파일을 블록 단위로 읽으며 윈도우 피처 DataFrame을 차례로 반환
+    
+    Parameters:
+    - window_rows: 윈도우 크기(행)
+    - block_rows: 한 번에 읽을 행 수
+    - min_rows: 마지막 미완성 윈도우를 포함할 최소 행 수 (기본: 윈도우의 절반)
+    """
+    min_rows = window_rows // 2 if min_rows is None else min_rows
+    header = pd.read_csv(path, nrows=0).columns
+    spo2_column = next((c for c in SPO2_COLUMNS if c in header), None)
+    usecols = RAW_COLUMNS + ([spo2_column] if spo2_column else [])
+    
+    carry = None        # 다음 블록으로 넘길 미완성 윈도우
+    first_window = 0    # carry 첫 행의 윈도우 번호
+    last_ibi = np.nan
+    
+    for block in pd.read_csv(path, usecols=usecols, chunksize=block_rows):
+        if carry is not None and len(carry):
+            block = pd.concat([carry, block], ignore_index=True)
+        complete = len(block) // window_rows * window_rows
+        carry = block.iloc[complete:]
+        if complete == 0:
+            continue
+        
+        frame = block.iloc[:complete]
+        window_ids = first_window + np.arange(complete) // window_rows
+        features, last_ibi = _window_features(frame, window_ids, last_ibi, spo2_column)
+        first_window += complete // window_rows
+        yield features
+    
+    if carry is not None and len(carry) >= max(min_rows, 1):
+        window_ids = np.full(len(carry), first_window)
+        features, _ = _window_features(carry, window_ids, last_ibi, spo2_column)
+        yield features
+
+
+def extract_subject(sid, path, participant, window_rows=SAMPLE_RATE * WINDOW_SECONDS,
+                    block_rows=BLOCK_ROWS, per_subject=0, random_state=42):
+    """
+    피험자 한 명의 윈도우 피처 테이블 (OUTPUT_COLUMNS 순서)
+    
+    Parameters:
+    - participant: load_participants()의 피험자 정보 (없으면 해당 컬럼은 결측)
+    - per_subject: 0보다 크면 윈도우를 이 개수만큼 무작위 추출
+    """
+    parts = list(iter_window_features(path, window_rows, block_rows))
+    if not parts:
+        return pd.DataFrame(columns=OUTPUT_COLUMNS)
+    
+    features = pd.concat(parts)
+    participant = participant or {}
+    features['sid'] = sid
+    for column in ('gender', 'bmi', 'age'):
+        features[column] = participant.get(column, np.nan)
+    if 'mean_sa02' not in features:
+        features['mean_sa02'] = participant.get('mean_sa02', np.nan)
+    
+    if per_subject and len(features) > per_subject:
+        features = features.sample(n=per_subject, random_state=random_state).sort_index()
+    return features[OUTPUT_COLUMNS].reset_index(drop=True)
+
+
+def _write_shard(features, shard_path):
+    tmp_path = shard_path + '.tmp'
+    features.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, shard_path)
+
+
+def _source_path(shard_path):
+    """샤드의 원데이터 기록 파일 경로 (S002.csv → S002.source.json)"""
+    return os.path.splitext(shard_path)[0] + '.source.json'
+
+
+def _source_stamp(path):
+    """원데이터 파일의 크기와 수정 시각"""
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _shard_done(shard_path, path):
+    """샤드가 있고 추출 당시 원데이터와 지금 원데이터의 크기/수정 시각이 같은지 확인"""
+    if not os.path.exists(shard_path):
+        return False
+    try:
+        with open(_source_path(shard_path), 'r', encoding='utf-8') as f:
+            return json.load(f) == _source_stamp(path)
+    except (OSError, ValueError):
+        return False
+
+
+def participants_hash(participants):
+    """participant_info 내용의 SHA-256 (값이 바뀌면 샤드를 새로 만듦)"""
+    text = json.dumps(participants, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def extract_shard(sid, path, participant, shard_path, window_rows=SAMPLE_RATE * WINDOW_SECONDS,
+                  block_rows=BLOCK_ROWS, per_subject=0):
+    """
+    피험자 한 명을 추출하여 샤드 CSV로 저장 (프로세스 풀 작업 단위)
+    
+    Returns:
+    - (sid, 윈도우 수, 원데이터 크기(바이트), 소요 시간(초))
+    """
+    start = time.perf_counter()
+    stamp = _source_stamp(path)
+    features = extract_subject(sid, path, participant, window_rows, block_rows, per_subject)
+    _write_shard(features, shard_path)
+    with open(_source_path(shard_path), 'w', encoding='utf-8') as f:
+        json.dump(stamp, f)
+    return sid, len(features), os.path.getsize(path), time.perf_counter() - start
+
+
+def _prepare_shard_dir(shard_dir, params, rebuild):
+    """샤드 폴더 준비 (추출 설정이나 participant_info가 바뀌었거나 rebuild면 기존 샤드 삭제)"""
+    os.makedirs(shard_dir, exist_ok=True)
+    params_path = os.path.join(shard_dir, SHARD_PARAMS_FILE)
+    previous = None
+    if os.path.exists(params_path):
+        with open(params_path, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+    if rebuild or previous != params:
+        for pattern in ('*.csv', '*.source.json'):
+            for shard in glob.glob(os.path.join(shard_dir, pattern)):
+                os.remove(shard)
+    with open(params_path, 'w', encoding='utf-8') as f:
+        json.dump(params, f)
+
+
+def merge_shards(shard_paths, output):
+    """샤드 CSV를 순서대로 이어 붙여 피처 테이블 저장 (행 수 반환)"""
+    tmp_path = output + '.tmp'
+    rows = 0
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as out:
+        out.write(','.join(OUTPUT_COLUMNS) + '\n')
+        for shard_path in shard_paths:
+            with open(shard_path, 'r', encoding='utf-8', newline='') as f:
+                next(f, None)    # 샤드 헤더
+                for line in f:
+                    out.write(line)
+                    rows += 1
+    os.replace(tmp_path, output)
+    return rows
+
+
+def build_features(subjects, participants, output, shard_dir=None, workers=None,
+                   window_rows=SAMPLE_RATE * WINDOW_SECONDS, block_rows=BLOCK_ROWS, per_subject=0,
+                   rebuild=False):
+    """
+    피험자별 추출을 프로세스 풀에서 병렬로 실행하고 샤드를 합쳐 저장
+    
+    Parameters:
+    - subjects: subject_files()의 (sid, 경로) 목록
+    - participants: load_participants() 결과
+    - shard_dir: 피험자별 샤드 폴더 (기본: output + '.shards', 원데이터가 그대로인 완료된 샤드는 다시 추출하지 않음)
+    - workers: 프로세스 수 (기본: CPU 수, 1이면 현재 프로세스에서 실행)
+    - rebuild: 기존 샤드를 무시하고 전부 다시 추출
+    
+    Returns:
+    - 통계 dict (피험자 수, 행 수, 처리량)
+    """
+    shard_dir = shard_dir or output + '.shards'
+    workers = workers or os.cpu_count() or 1
+    params = {'window_rows': window_rows, 'per_subject': per_subject, 'participants': participants_hash(participants)}
+    _prepare_shard_dir(shard_dir, params, rebuild)
+    
+    shard_paths = [os.path.join(shard_dir, f"{sid}.csv") for sid, _ in subjects]
+    todo = [(sid, path, shard_path) for (sid, path), shard_path in zip(subjects, shard_paths)
+            if not _shard_done(shard_path, path)]
+    for sid, _ in subjects:
+        if sid not in participants:
+            print(f"⚠️  participant_info에 없는 피험자: {sid}")
+    
+    total_bytes = sum(os.path.getsize(path) for _, path, _ in todo)
+    print(f"🚀 피처 추출: 피험자 {len(todo)}명 (완료된 샤드 {len(subjects) - len(todo)}개 재사용), "
+          f"원데이터 {total_bytes / 1024 ** 3:.2f}GB, 프로세스 {min(workers, max(len(todo), 1))}개")
+    
+    start = time.perf_counter()
+    done_bytes = 0
+    
+    def report(i, result):
+        nonlocal done_bytes
+        sid, windows, size, seconds = result
+        done_bytes += size
+        elapsed = time.perf_counter() - start
+        rate = done_bytes / elapsed if elapsed > 0 else 0.0
+        eta = (total_bytes - done_bytes) / rate if rate > 0 else 0.0
+        print(f"  [{i}/{len(todo)}] {sid}: 윈도우 {windows}개, {seconds:.1f}초 | "
+              f"{rate / 1024 ** 2:.1f}MB/s, 남은 시간 {eta:.0f}초")
+    
+    jobs = [(sid, path, participants.get(sid), shard_path, window_rows, block_rows, per_subject)
+            for sid, path, shard_path in todo]
+    if workers == 1 or len(jobs) <= 1:
+        for i, job in enumerate(jobs, 1):
+            report(i, extract_shard(*job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(extract_shard, *job) for job in jobs]
+            for i, future in enumerate(as_completed(futures), 1):
+                report(i, future.result())
+    extract_seconds = time.perf_counter() - start
+    
+    rows = merge_shards(shard_paths, output)
+    total_seconds = time.perf_counter() - start
+    return {
+        'subjects': len(subjects),
+        'extracted': len(todo),
+        'rows': rows,
+        'raw_gb': total_bytes / 1024 ** 3,
+        'extract_seconds': extract_seconds,
+        'total_seconds': total_seconds,
+        'mb_per_second': total_bytes / 1024 ** 2 / extract_seconds if extract_seconds > 0 else 0.0,
+        'subjects_per_minute': len(todo) * 60 / extract_seconds if extract_seconds > 0 else 0.0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DREAMT 64Hz 원데이터 → 학습용 피처 테이블 (스트리밍, 피험자별 병렬)")
+    parser.add_argument('--raw-dir', required=True, help=f"피험자별 원데이터 폴더 ({RAW_FILE_PATTERN})")
+    parser.add_argument('--participants', required=True, help="participant_info.csv 경로")
+    parser.add_argument('--output', required=True, help="피처 테이블 CSV 경로")
+    parser.add_argument('--window-seconds', type=float, default=WINDOW_SECONDS, help="윈도우 길이(초, 기본 30)")
+    parser.add_argument('--sample-rate', type=int, default=SAMPLE_RATE, help="원데이터 샘플링 주파수(Hz, 기본 64)")
+    parser.add_argument('--block-rows', type=int, default=BLOCK_ROWS, help="한 번에 읽을 행 수 (기본 1,000,000)")
+    parser.add_argument('--per-subject', type=int, default=0, help="피험자별 무작위 추출 윈도우 수 (0이면 전체)")
+    parser.add_argument('--workers', type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    parser.add_argument('--shard-dir', default=None, help="피험자별 샤드 폴더 (기본: <output>.shards)")
+    parser.add_argument('--rebuild', action='store_true', help="완료된 샤드도 다시 추출")
+    args = parser.parse_args()
+    
+    subjects = subject_files(args.raw_dir)
+    if not subjects:
+        print(f"❌ 원데이터 파일을 찾을 수 없습니다: {os.path.join(args.raw_dir, RAW_FILE_PATTERN)}")
+        exit(1)
+    
+    stats = build_features(subjects, load_participants(args.participants), args.output,
+                           shard_dir=args.shard_dir, workers=args.workers,
+                           window_rows=int(args.sample_rate * args.window_seconds),
+                           block_rows=args.block_rows, per_subject=args.per_subject, rebuild=args.rebuild)
+    
+    print(f"✅ 피처 테이블 저장 완료: {args.output} ({stats['rows']}행, 피험자 {stats['subjects']}명)")
+    print(f"📊 추출 {stats['extract_seconds']:.1f}초 (피험자 {stats['extracted']}명, {stats['raw_gb']:.2f}GB), "
+          f"{stats['mb_per_second']:.1f}MB/s, 분당 {stats['subjects_per_minute']:.1f}명, "
+          f"병합 포함 {stats['total_seconds']:.1f}초")
+
+
+if __name__ == '__main__':
+    main()
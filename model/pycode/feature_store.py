@@ -0,0 +1,148 @@
+"""
+학습용 피처 테이블 캐시 (열 단위 NumPy 바이너리)
+
+CSV 파싱, 결측값/온도 0 제거, 파생 피처 계산 결과를 .npz(열마다 타입이 있는 배열)로 저장하고
+원본 파일과 변환 코드가 바뀌지 않았으면 다시 계산하지 않고 불러옵니다.
+하이퍼파라미터만 바꿔 다시 학습할 때 데이터 준비 시간이 거의 사라집니다.
+
+캐시 키 = 원본 파일 내용의 SHA-256 + 변환 함수 소스 코드의 SHA-256
+(정제 코드나 derived_features.py를 고치면 자동으로 새 캐시를 만듭니다)
+
+학습 스크립트에서 사용:
+    python aI_service_model_with_age.py --data ../data/extracted_features.csv
+    python aI_service_model_with_age.py --refresh-features   # 캐시 무시하고 다시 계산
+    python aI_service_model_with_age.py --no-feature-cache
+"""
+
+import os
+import sys
+import glob
+import hashlib
+import inspect
+import numpy as np
+import pandas as pd
+
+# 파생 피처 공식은 서버와 공유 (model/server/derived_features.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../server'))
+from derived_features import add_derived_features
+
+FEATURE_STORE_VERSION = 1
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.feature_cache')
+
+# 원본 파일 해시 계산 시 한 번에 읽을 크기
+HASH_BLOCK_BYTES = 1024 * 1024
+
+
+def clean_training_frame(df):
+    """sid 제거, 결측값 제거, 온도 0(비정상) 행 제거"""
+    # sid 컬럼이 있는지 확인 후 제거
+    if "sid" in df.columns:
+        df = df.drop(columns=["sid"])
+        print("✅ sid 컬럼 제거 완료")
+    
+    # 결측값 처리
+    print(f"결측값 처리 전: {df.shape[0]}행")
+    df = df.dropna()
+    print(f"결측값 처리 후: {df.shape[0]}행")
+    
+    # 온도 0 값 제거 (비정상적인 데이터)
+    if "TEMP_median" in df.columns:
+        temp_zero_count = (df["TEMP_median"] == 0).sum()
+        if temp_zero_count > 0:
+            print(f"⚠️  온도 0인 비정상 데이터 {temp_zero_count}개 발견, 제거합니다.")
+            df = df[df["TEMP_median"] != 0]
+            print(f"온도 0 값 제거 후: {df.shape[0]}행")
+    return df
+
+
+# 캐시 키에 소스 코드가 포함되는 변환 단계 (순서대로 적용)
+TRANSFORMS = (clean_training_frame, add_derived_features)
+
+
+def file_hash(path):
+    """파일 내용의 SHA-256 (블록 단위로 읽음)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def transform_hash(transforms=TRANSFORMS):
+    """변환 함수 소스 코드의 SHA-256"""
+    digest = hashlib.sha256(f"v{FEATURE_STORE_VERSION}".encode())
+    for transform in transforms:
+        # 다른 모듈의 변환은 모듈 전체(함께 쓰는 공식 포함)를 해시
+        module = inspect.getmodule(transform)
+        source = inspect.getsource(transform if module is sys.modules[__name__] else module)
+        digest.update(source.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def cache_key(path, transforms=TRANSFORMS):
+    return hashlib.sha256((file_hash(path) + transform_hash(transforms)).encode()).hexdigest()[:20]
+
+
+def cache_path(path, key, cache_dir=DEFAULT_CACHE_DIR):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{stem}.{key}.npz")
+
+
+def save_frame(df, path):
+    """DataFrame을 열별 배열로 저장 (문자열 열은 고정 길이 유니코드, pickle 사용 안 함)"""
+    arrays = {}
+    for i, column in enumerate(df.columns):
+        values = df[column].to_numpy()
+        if values.dtype == object:
+            values = values.astype(str)
+        arrays[f"col{i}"] = values
+    arrays['columns'] = np.array([str(c) for c in df.columns])
+    
+    tmp_path = path + '.tmp.npz'
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+
+
+def load_frame(path):
+    """save_frame()으로 저장한 DataFrame 읽기"""
+    with np.load(path, allow_pickle=False) as data:
+        columns = [str(column) for column in data['columns']]
+        return pd.DataFrame({column: data[f"col{i}"] for i, column in enumerate(columns)})
+
+
+def load_training_frame(path, cache_dir=DEFAULT_CACHE_DIR, refresh=False, transforms=TRANSFORMS):
+    """
+    정제 + 파생 피처가 계산된 학습 테이블 (캐시가 있으면 재사용)
+    
+    Parameters:
+    - path: 피처 테이블 CSV
+    - cache_dir: 캐시 폴더 (None이면 캐시 사용 안 함)
+    - refresh: 캐시가 있어도 다시 계산하여 덮어씀
+    
+    Returns:
+    - (DataFrame, 캐시 적중 여부)
+    """
+    if cache_dir is None:
+        df = pd.read_csv(path)
+        for transform in transforms:
+            df = transform(df)
+        return df.reset_index(drop=True), False
+    
+    key = cache_key(path, transforms)
+    cached = cache_path(path, key, cache_dir)
+    if not refresh and os.path.exists(cached):
+        return load_frame(cached), True
+    
+    df = pd.read_csv(path)
+    for transform in transforms:
+        df = transform(df)
+    df = df.reset_index(drop=True)
+    
+    os.makedirs(cache_dir, exist_ok=True)
+    # 같은 원본의 이전 캐시는 삭제
+    for old in glob.glob(cache_path(path, '*', cache_dir)):
+        if old != cached:
+            os.remove(old)
+    save_frame(df, cached)
+    return df, False
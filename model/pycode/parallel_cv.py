@@ -0,0 +1,116 @@
+"""
+교차 검증 폴드 병렬 학습 (폴드 모델 재사용)
+
+기존 학습은 전체 학습 데이터로 한 번 학습한 뒤 cross_val_score가 같은 앙상블을 5번 더 순차 학습합니다.
+여기서는 폴드 학습(과 최종 학습)을 프로세스 풀에서 동시에 실행하고,
+폴드 모델의 검증 폴드 예측(out-of-fold)으로 CV 점수를 계산하여 다시 학습하지 않습니다.
+
+- 폴드 분할은 cross_val_score(cv=5)와 같은 KFold(셔플 없음)라 폴드별 R²가 기존과 같습니다.
+- 작업마다 RandomForest/ExtraTrees 스레드 수를 CPU 수 / 동시 작업 수로 나눠 과다 사용을 막습니다.
+- final_fit=False면 전체 데이터 학습을 건너뛰고 fold_averaged_ensemble()로 폴드 모델 평균을 최종 모델로 사용합니다
+  (모델 크기와 예측 시간은 폴드 수만큼 커집니다).
+
+학습 스크립트에서 사용:
+    python aI_service_model_with_age.py --parallel-cv
+    python aI_service_model_with_age.py --parallel-cv --skip-final-fit --n-estimators 200
+"""
+
+import os
+import time
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.ensemble import VotingRegressor
+from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.model_selection import KFold
+from sklearn.pipeline import Pipeline
+from sklearn.utils import Bunch
+
+
+def _tree_n_jobs_params(model):
+    """트리 모델의 n_jobs 파라미터 이름 (VotingRegressor 자체의 n_jobs는 제외)"""
+    params = model.get_params()
+    return [key for key in params if key.endswith('__n_jobs')
+            and not isinstance(params[key[:-len('__n_jobs')]], VotingRegressor)]
+
+
+def _fit_job(model, X, y, train_index, n_jobs):
+    """작업 프로세스에서 앙상블 하나를 학습 (원래 n_jobs 설정으로 되돌려 반환)"""
+    start = time.perf_counter()
+    model = clone(model)
+    params = model.get_params()
+    keys = _tree_n_jobs_params(model)
+    original = {key: params[key] for key in keys}
+    model.set_params(**{key: n_jobs for key in keys})
+    model.fit(X.iloc[train_index], y.iloc[train_index])
+    model.set_params(**original)
+    return model, time.perf_counter() - start
+
+
+def cross_validate_parallel(model, X, y, cv=5, workers=None, final_fit=True):
+    """
+    CV 폴드와 최종 학습을 병렬로 실행
+    
+    Parameters:
+    - model: 학습 전 앙상블 (복제하여 사용)
+    - cv: 폴드 수
+    - workers: 동시 작업 프로세스 수 (기본: min(작업 수, CPU 수))
+    - final_fit: 전체 X, y로 학습한 최종 모델도 함께 만들지 여부
+    
+    Returns:
+    - dict: fold_models, final_model(없으면 None), oof_pred, fold_r2, oof_r2, oof_rmse, fit_seconds, wall_seconds
+    """
+    folds = list(KFold(n_splits=cv).split(X))
+    train_indices = [train for train, _ in folds]
+    if final_fit:
+        train_indices.append(np.arange(len(X)))
+    
+    cpus = os.cpu_count() or 1
+    workers = min(len(train_indices), workers or cpus)
+    inner_jobs = max(1, cpus // workers)
+    
+    start = time.perf_counter()
+    results = Parallel(n_jobs=workers)(
+        delayed(_fit_job)(model, X, y, train_index, inner_jobs) for train_index in train_indices
+    )
+    
+    # 폴드 모델의 검증 폴드 예측으로 CV 지표 계산 (재학습 없음)
+    fold_models = [fitted for fitted, _ in results[:cv]]
+    oof_pred = np.empty(len(y))
+    fold_r2 = []
+    for fitted, (_, test_index) in zip(fold_models, folds):
+        oof_pred[test_index] = fitted.predict(X.iloc[test_index])
+        fold_r2.append(r2_score(y.iloc[test_index], oof_pred[test_index]))
+    
+    return {
+        'fold_models': fold_models,
+        'final_model': results[cv][0] if final_fit else None,
+        'oof_pred': oof_pred,
+        'fold_r2': np.asarray(fold_r2),
+        'oof_r2': r2_score(y, oof_pred),
+        'oof_rmse': float(np.sqrt(mean_squared_error(y, oof_pred))),
+        'fit_seconds': [seconds for _, seconds in results],
+        'wall_seconds': time.perf_counter() - start
+    }
+
+
+def fold_averaged_ensemble(fold_models):
+    """
+    폴드 모델들의 예측 평균을 내는 학습 완료 VotingRegressor
+    
+    각 폴드의 (전처리 → 회귀 모델) 멤버를 Pipeline(preprocess, model)으로 풀어 한 층으로 합치므로
+    서버의 평탄화 엔진/고속 경로가 기존 VotingRegressor(Pipeline × N) 구조로 그대로 읽을 수 있습니다.
+    """
+    estimators = []
+    for i, fold_model in enumerate(fold_models):
+        preprocessor = fold_model.named_steps['preprocess']
+        voting = fold_model.steps[-1][1]
+        if voting.weights is not None and len(set(voting.weights)) > 1:
+            raise ValueError("가중치가 다른 앙상블은 폴드 평균으로 합칠 수 없습니다.")
+        for (name, _), regressor in zip(voting.estimators, voting.estimators_):
+            estimators.append((f"fold{i}_{name}", Pipeline([('preprocess', preprocessor), ('model', regressor)])))
+    
+    ensemble = VotingRegressor(estimators)
+    ensemble.estimators_ = [pipeline for _, pipeline in estimators]
+    ensemble.named_estimators_ = Bunch(**dict(estimators))
+    return ensemble
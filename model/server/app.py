@@ -11,10 +11,21 @@ import pandas as pd
 import numpy as np
 import os
 import sys
+import time
+import threading
 import zipfile
 import tempfile
 import logging
 
+from flat_model import FlatEnsemble, flat_model_path, ensemble_members
+from fast_predictor import FastPredictor, load_feature_order
+from derived_features import (build_feature_frame, feature_matrix, columns_from_records, InvalidRecordError,
+                              INPUT_KEYS, MODEL_FEATURES)
+from prediction_cache import PredictionCache
+from lookup_table import LookupTablePredictor, max_error_from_env
+from device_state_cache import DeviceStateCache
+from sleep_controller import BiometricsStore
+
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -29,13 +40,26 @@ try:
         set_wind_strength,
         set_power,
         set_timer,
+        apply_settings,
         AIR_CONDITIONER_DEVICE_ID
     )
+    from device_events import DeviceStateStore, DeviceEventSubscriber, MQTT_AVAILABLE
+    from thinq_logging import configure_logging
+    # 요청 경로에서는 IoT 클라이언트의 상세 출력 없이 경고 이상만 한 줄 JSON으로 기록 (THINQ_LOG_MODE로 변경)
+    try:
+        configure_logging(os.environ.get('THINQ_LOG_MODE', 'quiet'))
+    except ValueError as e:
+        logger.warning(f"⚠️  {e}, quiet 모드를 사용합니다.")
+        configure_logging('quiet')
     AIR_CONDITIONER_AVAILABLE = True
     logger.info("✅ 에어컨 모듈 로드 성공")
 except ImportError as e:
     logger.warning(f"⚠️  에어컨 모듈을 불러올 수 없습니다: {e}")
     AIR_CONDITIONER_AVAILABLE = False
+    MQTT_AVAILABLE = False
+
+# 제어 명령 속도 제한/중복 제거 (IoT/command_gate.py, 표준 라이브러리만 사용)
+from command_gate import command_gate, CommandRateLimited
 
 app = Flask(__name__)
 CORS(app)  # CORS 허용
@@ -43,10 +67,40 @@ CORS(app)  # CORS 허용
 # 전역 변수
 model = None
 model_loaded = False
+flat_model = None  # 평탄화 추론 엔진 (없으면 sklearn 모델 사용)
+fast_predictor = None  # pandas를 거치지 않는 단일 예측 경로
+model_version = 0  # 모델을 (재)로드할 때마다 증가, 예측 캐시 키에 포함
+prediction_cache = PredictionCache.from_env()
+
+# 에어컨 상태 캐시 (ThinQ 클라우드 호출 절감)
+device_state_cache = DeviceStateCache.from_env()
+
+# MQTT 푸시 이벤트로 갱신되는 에어컨 상태 (THINQ_MQTT_ENABLED=1일 때, 워커 프로세스마다 연결)
+DEVICE_EVENTS_ENABLED = os.environ.get('THINQ_MQTT_ENABLED') == '1'
+device_state_store = DeviceStateStore() if AIR_CONDITIONER_AVAILABLE else None
+device_event_subscriber = None
+device_events_lock = threading.Lock()
+
+# 수면 제어 데몬(sleep_controller.py)과 공유하는 생체 신호 저장소
+biometrics_store = BiometricsStore.from_env()
+
+# 예측 방식: 'model' (앙상블) 또는 'lookup_table' (미리 계산한 격자 보간, 격자 밖은 앙상블)
+PREDICTOR_MODE = os.environ.get('PREDICTOR_MODE', 'model')
+# 룩업 테이블 허용 최대 오차(°C), 측정 오차가 이보다 크면 테이블을 사용하지 않음
+LOOKUP_TABLE_MAX_ERROR = max_error_from_env()
+lookup_table = None
+
+# 고속 경로 검증용 입력 (DataFrame 경로와 예측값 비교)
+FAST_PATH_PROBES = [
+    {'hr_mean': 72.0, 'hrv_sdnn': 45.2, 'bmi': 22.5, 'mean_sa02': 98.5, 'gender': 'F', 'age': 30},
+    {'hr_mean': 95.0, 'hrv_sdnn': 35.8, 'bmi': 25.1, 'mean_sa02': 97.2, 'gender': 'M', 'age': 45},
+    {'hr_mean': 65.0, 'hrv_sdnn': 52.1, 'bmi': 18.5, 'mean_sa02': 99.1, 'gender': 'F', 'age': 25},
+    {'hr_mean': 68.0, 'hrv_sdnn': 28.5, 'bmi': 24.0, 'mean_sa02': 96.8, 'gender': 'M', 'age': 72}
+]
 
 def load_model():
     """앙상블 모델 로드"""
-    global model, model_loaded
+    global model, model_loaded, flat_model, fast_predictor, model_version, lookup_table
     
     try:
         # 모델 파일 경로 (age 포함 모델)
@@ -56,8 +110,9 @@ def load_model():
             logger.error(f"모델 파일을 찾을 수 없습니다: {model_path}")
             return False
         
-        # 모델 로드
-        model = joblib.load(model_path)
+        # 모델 로드 (비압축 저장 모델은 큰 배열을 메모리 매핑)
+        load_start = time.perf_counter()
+        model = joblib.load(model_path, mmap_mode='r')
         
         if model is None:
             logger.error("모델을 로드할 수 없습니다.")
@@ -65,12 +120,102 @@ def load_model():
             
         model_loaded = True
         logger.info("앙상블 모델 로드 완료")
+        
+        flat_model = load_flat_model(model_path)
+        fast_predictor = load_fast_predictor(model_path)
+        lookup_table = load_lookup_table(model_path) if PREDICTOR_MODE == 'lookup_table' else None
+        
+        # 이전 모델의 예측 결과 무효화
+        model_version += 1
+        prediction_cache.clear()
+        
+        logger.info(f"모델 로드 시간: {time.perf_counter() - load_start:.2f}초")
         return True
         
     except Exception as e:
         logger.error(f"모델 로드 실패: {str(e)}")
         return False
 
+def load_flat_model(model_path):
+    """평탄화 추론 엔진 로드 (없으면 메모리에서 변환, 원본 모델과 예측값 검증)"""
+    try:
+        path = flat_model_path(model_path)
+        if os.path.exists(path):
+            flat = FlatEnsemble.load(path, mmap=True)
+            if not flat.verify(model):
+                logger.warning(f"⚠️  평탄화 모델이 현재 모델과 일치하지 않습니다: {path}")
+                flat = FlatEnsemble.from_model(model)
+        else:
+            flat = FlatEnsemble.from_model(model)
+        
+        logger.info(f"평탄화 추론 엔진 사용: 트리 {flat.n_trees}개, 노드 {flat.n_nodes}개")
+        return flat
+        
+    except Exception as e:
+        logger.warning(f"⚠️  평탄화 추론 엔진을 사용할 수 없어 sklearn 모델로 예측합니다: {str(e)}")
+        return None
+
+def load_fast_predictor(model_path):
+    """pandas를 거치지 않는 고속 예측 경로 준비 (DataFrame 경로와 결과가 같을 때만 사용)"""
+    try:
+        feature_order = load_feature_order(model_path, model)
+        if feature_order is None:
+            logger.warning("⚠️  피처 열 순서 정보가 없어 DataFrame 경로로 예측합니다.")
+            return None
+        
+        predictor = FastPredictor(model, feature_order, flat_model)
+        if not predictor.validate(predict_temperature_frame, FAST_PATH_PROBES):
+            logger.warning("⚠️  고속 예측 경로 결과가 DataFrame 경로와 달라 사용하지 않습니다.")
+            return None
+        
+        logger.info(f"고속 예측 경로 사용 ({predictor.engine} 엔진)")
+        return predictor
+        
+    except Exception as e:
+        logger.warning(f"⚠️  고속 예측 경로를 사용할 수 없습니다: {str(e)}")
+        return None
+
+def load_lookup_table(model_path):
+    """예측 룩업 테이블 로드 (현재 모델로 만들었고 오차가 허용 범위인 테이블만 사용)"""
+    try:
+        table = LookupTablePredictor.load(model_path)
+        if not table.within_tolerance(LOOKUP_TABLE_MAX_ERROR):
+            logger.warning(f"⚠️  룩업 테이블 최대 오차 {table.max_abs_error}°C가 허용 오차 {LOOKUP_TABLE_MAX_ERROR}°C를 넘어 "
+                           f"앙상블로 예측합니다. lookup_table.py --axis로 간격을 줄여 다시 생성하세요.")
+            return None
+        
+        predict_arrays = lambda **inputs: get_predictor().predict(build_feature_frame(**inputs))
+        if not table.matches(predict_arrays):
+            logger.warning("⚠️  룩업 테이블이 현재 모델과 맞지 않아 앙상블로 예측합니다. lookup_table.py로 다시 생성하세요.")
+            return None
+        
+        logger.info(f"룩업 테이블 예측 사용: 격자 {table.table.shape}, 최대 오차 {table.max_abs_error:.4f}°C, "
+                    f"p99 {table.p99_abs_error:.4f}°C (표본 측정)")
+        return table
+        
+    except Exception as e:
+        logger.warning(f"⚠️  룩업 테이블을 사용할 수 없어 앙상블로 예측합니다: {str(e)}")
+        return None
+
+def set_single_threaded():
+    """sklearn 트리 모델의 예측 병렬화 해제 (멀티 워커 서버에서 코어 과다 사용 방지)"""
+    if model is None:
+        return
+    for _, regressor in ensemble_members(model)[0]:
+        if hasattr(regressor, 'n_jobs'):
+            regressor.n_jobs = 1
+
+REQUIRED_PARAMS = INPUT_KEYS
+# 숫자 파라미터의 변환 함수 (/predict와 같은 float()/int() 변환)
+NUMERIC_PARAM_TYPES = {'hr_mean': float, 'hrv_sdnn': float, 'bmi': float, 'mean_sa02': float, 'age': int}
+
+# 한 번의 /predict_batch 요청에서 처리할 수 있는 최대 레코드 수
+MAX_BATCH_SIZE = 1000
+
+def get_predictor():
+    """예측에 사용할 모델 (평탄화 엔진 우선)"""
+    return flat_model if flat_model is not None else model
+
 def predict_temperature(hr_mean, hrv_sdnn, bmi, mean_sa02, gender, age):
     """
     체온 예측 함수 (나이 포함)
@@ -89,35 +234,92 @@ def predict_temperature(hr_mean, hrv_sdnn, bmi, mean_sa02, gender, age):
     if not model_loaded:
         raise ValueError("모델이 로드되지 않았습니다.")
     
-    # 파생 피처 계산
-    hrv_hr_ratio = hrv_sdnn / hr_mean
-    bmi_hr_interaction = bmi * hr_mean
-    age_bmi_interaction = age * bmi
-    age_hrv_ratio = age / (hrv_sdnn + 1)  # 0으로 나누기 방지
+    # 룩업 테이블 보간 (격자 범위 안의 입력만)
+    if lookup_table is not None and lookup_table.covers(hr_mean, hrv_sdnn, bmi, mean_sa02, gender, age):
+        return lookup_table.predict_one(hr_mean, hrv_sdnn, bmi, mean_sa02, gender, age)
     
+    # 고속 경로 (NumPy 행), 실패 시 DataFrame 경로로 대체
+    if fast_predictor is not None:
+        try:
+            return fast_predictor.predict_one(hr_mean, hrv_sdnn, bmi, mean_sa02, gender, age)
+        except Exception as e:
+            logger.warning(f"⚠️  고속 예측 경로 실패, DataFrame 경로로 예측합니다: {str(e)}")
+    
+    return predict_temperature_frame(hr_mean, hrv_sdnn, bmi, mean_sa02, gender, age)
+
+def predict_temperature_cached(hr_mean, hrv_sdnn, bmi, mean_sa02, gender, age):
+    """
+    예측 캐시를 거치는 체온 예측 (입력값은 피처별 간격으로 양자화)
+    
+    Returns:
+    - (예측된 체온, 캐시 적중 여부)
+    """
+    inputs = {
+        'hr_mean': hr_mean,
+        'hrv_sdnn': hrv_sdnn,
+        'bmi': bmi,
+        'mean_sa02': mean_sa02,
+        'gender': gender,
+        'age': age
+    }
+    return prediction_cache.get_or_compute(inputs, predict_temperature, version=model_version)
+
+def predict_temperature_frame(hr_mean, hrv_sdnn, bmi, mean_sa02, gender, age):
+    """DataFrame을 거치는 기본 예측 경로"""
     # 데이터 준비
-    data = pd.DataFrame({
-        'bmi': [bmi],
-        'mean_sa02': [mean_sa02], 
-        'HRV_SDNN': [hrv_sdnn],
-        'hrv_hr_ratio': [hrv_hr_ratio],
-        'bmi_hr_interaction': [bmi_hr_interaction],
-        'age': [age],
-        'age_bmi_interaction': [age_bmi_interaction],
-        'age_hrv_ratio': [age_hrv_ratio],
-        'gender': [gender]
-    })
+    data = build_feature_frame(hr_mean, hrv_sdnn, bmi, mean_sa02, gender, age)
     
     # 예측
-    temp_pred = model.predict(data)[0]
+    temp_pred = get_predictor().predict(data)[0]
     return float(temp_pred)
 
+def predict_temperature_batch(records):
+    """
+    여러 레코드의 체온을 한 번의 model.predict 호출로 예측
+    
+    Parameters:
+    - records: predict_temperature()와 같은 키를 가진 dict 리스트
+    
+    Returns:
+    - 예측된 체온 리스트 (°C)
+    """
+    if not model_loaded:
+        raise ValueError("모델이 로드되지 않았습니다.")
+    
+    if not records:
+        return []
+    
+    # 레코드를 키별 배열로 한 번에 변환하고 파생 피처는 배열 단위로 계산
+    columns = columns_from_records(records)
+    if flat_model is not None and set(flat_model.indicator_features) <= {'gender'}:
+        # 평탄화 엔진은 DataFrame 없이 원본 입력 행렬을 바로 평가
+        X = feature_matrix(**columns, numeric_features=flat_model.numeric_features,
+                           indicator_categories=flat_model.indicator_categories)
+        temp_preds = flat_model.predict_raw(X)
+    else:
+        temp_preds = model.predict(build_feature_frame(**columns))
+    return temp_preds.tolist()
+
+def classify_temperature(temp, cold_threshold=34.5, hot_threshold=35.6):
+    """온도 분류 (앱과 동일한 기준: 34.5도부터 35.6도까지 쾌적 범위에 포함)"""
+    if temp < cold_threshold:
+        return "추움"
+    elif temp > hot_threshold:
+        return "더움"
+    else:
+        # 34.5 <= temp <= 35.6: 쾌적함 (경계값 포함)
+        return "적정"
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """서버 상태 확인"""
     return jsonify({
         'status': 'healthy',
-        'model_loaded': model_loaded
+        'model_loaded': model_loaded,
+        'prediction_cache': prediction_cache.stats(),
+        'device_state_cache': device_state_cache.stats(),
+        'device_events': device_state_store.stats() if DEVICE_EVENTS_ENABLED and device_state_store else None,
+        'command_gate': command_gate.stats()
     })
 
 @app.route('/predict', methods=['POST'])
@@ -134,32 +336,23 @@ def predict():
         logger.info(f"📱 앱에서 예측 요청 받음: {data}")
         
         # 필수 파라미터 확인
-        required_params = ['hr_mean', 'hrv_sdnn', 'bmi', 'mean_sa02', 'gender', 'age']
-        for param in required_params:
+        for param in REQUIRED_PARAMS:
             if param not in data:
                 return jsonify({
                     'error': f'필수 파라미터가 누락되었습니다: {param}'
                 }), 400
         
-        # 예측 수행
-        predicted_temp = predict_temperature(
-            hr_mean=float(data['hr_mean']),
-            hrv_sdnn=float(data['hrv_sdnn']),
-            bmi=float(data['bmi']),
-            mean_sa02=float(data['mean_sa02']),
-            gender=str(data['gender']),
-            age=int(data['age'])
-        )
-        
-        # 온도 분류 (앱과 동일한 기준: 34.5도부터 35.6도까지 쾌적 범위에 포함)
-        def classify_temperature(temp, cold_threshold=34.5, hot_threshold=35.6):
-            if temp < 34.5:
-                return "추움"
-            elif temp > 35.6:
-                return "더움"
-            else:
-                # 34.5 <= temp <= 35.6: 쾌적함 (경계값 포함)
-                return "적정"
+        inputs = {
+            'hr_mean': float(data['hr_mean']),
+            'hrv_sdnn': float(data['hrv_sdnn']),
+            'bmi': float(data['bmi']),
+            'mean_sa02': float(data['mean_sa02']),
+            'gender': str(data['gender']),
+            'age': int(data['age'])
+        }
+        
+        # 예측 수행 (캐시 우선)
+        predicted_temp, cache_hit = predict_temperature_cached(**inputs)
         
         temperature_category = classify_temperature(predicted_temp)
         
@@ -167,9 +360,14 @@ def predict():
             'success': True,
             'predicted_temperature': predicted_temp,
             'temperature_category': temperature_category,
+            'cache_hit': cache_hit,
             'input_data': data
         }
-        logger.info(f"✅ 예측 완료: {predicted_temp:.2f}°C ({temperature_category})")
+        if lookup_table is not None and lookup_table.covers(**inputs):
+            # 생성 시 무작위 표본으로 측정한 보간값의 원본 모델 대비 오차 (보장 상한이 아님)
+            result['lookup_max_abs_error_sampled'] = lookup_table.max_abs_error
+            result['lookup_p99_abs_error_sampled'] = lookup_table.p99_abs_error
+        logger.info(f"✅ 예측 완료: {predicted_temp:.2f}°C ({temperature_category}){' [캐시]' if cache_hit else ''}")
         return jsonify(result)
         
     except Exception as e:
@@ -178,6 +376,78 @@ def predict():
             'error': f'예측 실패: {str(e)}'
         }), 500
 
+@app.route('/predict_batch', methods=['POST'])
+def predict_batch():
+    """체온 일괄 예측 API (수면 구간 여러 개를 한 번에 예측)"""
+    try:
+        if not model_loaded:
+            return jsonify({
+                'error': '모델이 로드되지 않았습니다.'
+            }), 500
+        
+        # 요청 데이터 파싱 (JSON이 아니면 None)
+        data = request.get_json(silent=True)
+        records = data.get('records') if isinstance(data, dict) else data
+        if not isinstance(records, list):
+            return jsonify({
+                'error': 'records 배열이 필요합니다.'
+            }), 400
+        
+        logger.info(f"📱 앱에서 일괄 예측 요청 받음: {len(records)}건")
+        
+        if len(records) > MAX_BATCH_SIZE:
+            return jsonify({
+                'error': f'한 번에 최대 {MAX_BATCH_SIZE}건까지 예측할 수 있습니다: {len(records)}건'
+            }), 400
+        
+        # 필수 파라미터와 숫자 값 확인
+        for index, record in enumerate(records):
+            if not isinstance(record, dict):
+                return jsonify({
+                    'error': f'records[{index}]가 객체가 아닙니다.'
+                }), 400
+            for param in REQUIRED_PARAMS:
+                if param not in record:
+                    return jsonify({
+                        'error': f'records[{index}]에 필수 파라미터가 누락되었습니다: {param}'
+                    }), 400
+                if param in NUMERIC_PARAM_TYPES:
+                    try:
+                        NUMERIC_PARAM_TYPES[param](record[param])
+                    except (TypeError, ValueError):
+                        return jsonify({
+                            'error': f'records[{index}]의 {param} 값이 숫자가 아닙니다: {record[param]!r}'
+                        }), 400
+        
+        # 예측 수행 (model.predict 1회, NaN/inf 값은 400)
+        try:
+            predicted_temps = predict_temperature_batch(records)
+        except InvalidRecordError as e:
+            return jsonify({
+                'error': str(e)
+            }), 400
+        
+        predictions = [
+            {
+                'predicted_temperature': temp,
+                'temperature_category': classify_temperature(temp)
+            }
+            for temp in predicted_temps
+        ]
+        
+        logger.info(f"✅ 일괄 예측 완료: {len(predictions)}건")
+        return jsonify({
+            'success': True,
+            'count': len(predictions),
+            'predictions': predictions
+        })
+    
+    except Exception as e:
+        logger.error(f"일괄 예측 실패: {str(e)}")
+        return jsonify({
+            'error': f'일괄 예측 실패: {str(e)}'
+        }), 500
+
 @app.route('/model_info', methods=['GET'])
 def model_info():
     """모델 정보 반환"""
@@ -188,13 +458,55 @@ def model_info():
     
     return jsonify({
         'model_type': '앙상블 모델 (RandomForest + ExtraTrees + GradientBoosting) - 나이 포함',
-        'features': ['bmi', 'mean_sa02', 'HRV_SDNN', 'hrv_hr_ratio', 'bmi_hr_interaction', 'age', 'age_bmi_interaction', 'age_hrv_ratio', 'gender'],
+        'features': MODEL_FEATURES,
         'target': 'TEMP_median (체온)',
+        'inference_engine': 'flat' if flat_model is not None else 'sklearn',
+        'predictor_mode': 'lookup_table' if lookup_table is not None else 'model',
+        'lookup_table': lookup_table.info() if lookup_table is not None else None,
         'model_loaded': model_loaded
     })
 
 # ==================== 에어컨 제어 API ====================
 
+def ensure_device_events():
+    """MQTT 이벤트 구독 시작 (프로세스당 한 번, fork 이후 첫 요청에서)"""
+    global device_event_subscriber
+    if not DEVICE_EVENTS_ENABLED or device_event_subscriber is not None:
+        return
+    
+    with device_events_lock:
+        if device_event_subscriber is not None:
+            return
+        try:
+            if not MQTT_AVAILABLE:
+                raise ImportError("paho-mqtt가 설치되어 있지 않습니다.")
+            subscriber = DeviceEventSubscriber.from_env(device_state_store, device_ids=[AIR_CONDITIONER_DEVICE_ID])
+            subscriber.start()
+            device_event_subscriber = subscriber
+        except Exception as e:
+            logger.warning(f"⚠️  MQTT 이벤트 구독을 시작할 수 없어 상태 조회 API를 사용합니다: {e}")
+            device_event_subscriber = False
+
+def extract_device_state(state_response):
+    """상태 조회 응답에서 상태 객체 추출 (없으면 None)"""
+    if 'result' in state_response and 'value' in state_response['result']:
+        return state_response['result']['value']
+    if 'response' in state_response:
+        response = state_response['response']
+        if isinstance(response, dict):
+            return response.get('value', response)
+    return None
+
+def current_device_state(device_id):
+    """제어 명령 중복 판단용 현재 상태 (푸시 저장소 → 상태 캐시, 클라우드는 조회하지 않음)"""
+    state = device_state_store.get(device_id) if device_state_store else None
+    if state is None:
+        cached = device_state_cache.peek(device_id)
+        state = extract_device_state(cached) if cached else None
+    return state
+
+command_gate.state_provider = current_device_state
+
 @app.route('/air_conditioner/state', methods=['GET'])
 def get_air_conditioner_state_api():
     """에어컨 상태 조회 API"""
@@ -206,25 +518,29 @@ def get_air_conditioner_state_api():
     
     try:
         logger.info("📱 앱에서 에어컨 상태 조회 요청")
-        state_response = get_air_conditioner_state()
+        ensure_device_events()
+        
+        # MQTT 푸시로 갱신된 상태 우선, 없으면 캐시를 거쳐 클라우드 조회 (조회 결과는 저장소에 채움)
+        pushed_state = device_state_store.get(AIR_CONDITIONER_DEVICE_ID)
+        if pushed_state is not None:
+            state_response, cache_hit, source = {'response': pushed_state}, True, 'push'
+        else:
+            state_response, cache_hit = device_state_cache.get_or_fetch(
+                AIR_CONDITIONER_DEVICE_ID,
+                lambda: get_air_conditioner_state(AIR_CONDITIONER_DEVICE_ID, store=device_state_store)
+            )
+            source = 'cache' if cache_hit else 'cloud'
         
         # 응답 구조 분석 및 상태 정보 추출
-        state = None
-        if 'result' in state_response and 'value' in state_response['result']:
-            state = state_response['result']['value']
-        elif 'response' in state_response:
-            response = state_response['response']
-            if isinstance(response, dict):
-                if 'value' in response:
-                    state = response['value']
-                else:
-                    state = response
+        state = extract_device_state(state_response)
         
         if state:
             # 상태 정보를 앱에서 사용하기 쉬운 형태로 변환
             result = {
                 'success': True,
                 'device_id': AIR_CONDITIONER_DEVICE_ID,
+                'cache_hit': cache_hit,
+                'source': source,
                 'state': {
                     'power_on': state.get('operation', {}).get('airConOperationMode') == 'POWER_ON',
                     'current_temperature': state.get('temperature', {}).get('currentTemperature'),
@@ -242,7 +558,7 @@ def get_air_conditioner_state_api():
                     'raw_state': state  # 전체 상태 정보도 포함
                 }
             }
-            logger.info(f"✅ 에어컨 상태 조회 성공")
+            logger.info(f"✅ 에어컨 상태 조회 성공{' [캐시]' if cache_hit else ''}")
             return jsonify(result)
         else:
             return jsonify({
@@ -313,12 +629,35 @@ def control_air_conditioner_api():
             power_on = data.get('power_on', True)
             result = set_power(power_on=bool(power_on))
             
+        elif action == 'apply':
+            # 여러 설정을 한 번의 제어 요청으로 적용 (지정한 항목만 변경)
+            setting_keys = ('power_on', 'mode', 'target_temperature', 'strength', 'wind_direction')
+            if all(data.get(key) is None for key in setting_keys):
+                return jsonify({
+                    'success': False,
+                    'error': f'적용할 설정이 필요합니다: {", ".join(setting_keys)}'
+                }), 400
+            target_temp = data.get('target_temperature')
+            power_on = data.get('power_on')
+            result = apply_settings(
+                power_on=None if power_on is None else bool(power_on),
+                mode=data.get('mode'),
+                target_temp=None if target_temp is None else float(target_temp),
+                unit=data.get('unit', 'C'),
+                wind_strength=data.get('strength'),
+                wind_direction=data.get('wind_direction'),
+                wind_direction_enabled=bool(data.get('wind_direction_enabled', True))
+            )
+            
         else:
             return jsonify({
                 'success': False,
                 'error': f'지원하지 않는 action: {action}'
             }), 400
         
+        # 상태가 바뀌었으므로 다음 조회는 클라우드에서 새로 가져옴
+        device_state_cache.invalidate(AIR_CONDITIONER_DEVICE_ID)
+        
         logger.info(f"✅ 에어컨 제어 성공: {action}")
         return jsonify({
             'success': True,
@@ -326,6 +665,21 @@ def control_air_conditioner_api():
             'result': result
         })
         
+    except CommandRateLimited as e:
+        logger.warning(f"에어컨 제어 속도 제한: {str(e)}")
+        response = jsonify({
+            'success': False,
+            'error': str(e)
+        })
+        response.headers['Retry-After'] = str(int(e.retry_after) + 1)
+        return response, 429
+    except ValueError as e:
+        # 디바이스 프로파일에서 허용하지 않는 값 (클라우드에 보내지 않음)
+        logger.warning(f"에어컨 제어 값 오류: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         logger.error(f"에어컨 제어 실패: {str(e)}")
         return jsonify({
@@ -333,10 +687,83 @@ def control_air_conditioner_api():
             'error': f'에어컨 제어 실패: {str(e)}'
         }), 500
 
+# ==================== 수면 자동 제어 API ====================
+
+@app.route('/sleep_control/biometrics', methods=['POST'])
+def post_sleep_biometrics():
+    """수면 제어용 최신 생체 신호 수신 (제어는 sleep_controller.py 데몬이 주기적으로 수행)"""
+    try:
+        data = request.get_json()
+        if not isinstance(data, dict) or not data.get('user_id'):
+            return jsonify({
+                'success': False,
+                'error': 'user_id 파라미터가 필요합니다.'
+            }), 400
+        
+        for param in REQUIRED_PARAMS:
+            if param not in data:
+                return jsonify({
+                    'success': False,
+                    'error': f'필수 파라미터가 누락되었습니다: {param}'
+                }), 400
+        
+        record = {
+            'hr_mean': float(data['hr_mean']),
+            'hrv_sdnn': float(data['hrv_sdnn']),
+            'bmi': float(data['bmi']),
+            'mean_sa02': float(data['mean_sa02']),
+            'gender': str(data['gender']),
+            'age': int(data['age'])
+        }
+        if data.get('device_id'):
+            record['device_id'] = str(data['device_id'])
+        
+        user_id = str(data['user_id'])
+        biometrics_store.put_biometrics(user_id, record)
+        return jsonify({
+            'success': True,
+            'user_id': user_id,
+            'status': biometrics_store.get_status(user_id)
+        })
+    
+    except (ValueError, TypeError) as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"생체 신호 저장 실패: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': f'생체 신호 저장 실패: {str(e)}'
+        }), 500
+
+@app.route('/sleep_control/status', methods=['GET'])
+def get_sleep_control_status():
+    """수면 제어 상태 조회 (마지막 예측, 분류, 목표 온도, 적용 내역)"""
+    user_id = request.args.get('user_id')
+    if not user_id:
+        return jsonify({
+            'success': False,
+            'error': 'user_id 파라미터가 필요합니다.'
+        }), 400
+    try:
+        status = biometrics_store.get_status(user_id)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    return jsonify({
+        'success': True,
+        'user_id': user_id,
+        'status': status
+    })
+
 if __name__ == '__main__':
-    # 서버 시작 시 모델 로드
+    # 개발용 단일 프로세스 서버 (운영 환경은 gunicorn -c gunicorn.conf.py wsgi:app)
     if load_model():
-        logger.info("서버 시작 중...")
-        app.run(host='0.0.0.0', port=5000, debug=True)
+        logger.info("개발 서버 시작 중...")
+        app.run(host='0.0.0.0', port=5000, debug=os.environ.get('FLASK_DEBUG') == '1')
     else:
         logger.error("모델 로드 실패로 서버를 시작할 수 없습니다.")
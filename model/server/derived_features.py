@@ -0,0 +1,139 @@
+"""
+모델 입력 피처 계산 (학습과 서버가 함께 사용하는 유일한 정의)
+
+파생 피처 공식과 피처 열 순서를 한 곳에 두고,
+학습 스크립트(DataFrame 열), 단일 예측(스칼라), 일괄 예측(NumPy 배열)이 같은 함수를 사용합니다.
+모든 연산은 원소 단위라 스칼라, NumPy 배열, pandas Series에 그대로 적용됩니다.
+
+파생 피처:
+- hrv_hr_ratio = HRV_SDNN / HR_mean
+- bmi_hr_interaction = bmi × HR_mean
+- age_bmi_interaction = age × bmi
+- age_hrv_ratio = age / (HRV_SDNN + 1)  (0으로 나누기 방지)
+"""
+
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+
+# 모델 입력 열 순서 (학습 시 ColumnTransformer에 전달한 순서)
+NUMERIC_FEATURES = ['bmi', 'mean_sa02', 'HRV_SDNN', 'hrv_hr_ratio', 'bmi_hr_interaction', 'age',
+                    'age_bmi_interaction', 'age_hrv_ratio']
+CATEGORICAL_FEATURES = ['gender']
+MODEL_FEATURES = NUMERIC_FEATURES + CATEGORICAL_FEATURES
+
+# API 입력 키 (predict_temperature() 인자)
+INPUT_KEYS = ['hr_mean', 'hrv_sdnn', 'bmi', 'mean_sa02', 'gender', 'age']
+_NUMERIC_KEYS = ['hr_mean', 'hrv_sdnn', 'bmi', 'mean_sa02', 'age']
+
+
+def derive(hr_mean, hrv_sdnn, bmi, age):
+    """파생 피처 4개 (피처명 → 값)"""
+    return {
+        'hrv_hr_ratio': hrv_sdnn / hr_mean,
+        'bmi_hr_interaction': bmi * hr_mean,
+        'age_bmi_interaction': age * bmi,
+        'age_hrv_ratio': age / (hrv_sdnn + 1)  # 0으로 나누기 방지
+    }
+
+
+def compute_feature_values(hr_mean, hrv_sdnn, bmi, mean_sa02, age):
+    """입력값과 파생 피처를 NUMERIC_FEATURES 순서의 피처명 → 값 dict로 계산"""
+    derived = derive(hr_mean, hrv_sdnn, bmi, age)
+    return {
+        'bmi': bmi,
+        'mean_sa02': mean_sa02,
+        'HRV_SDNN': hrv_sdnn,
+        'hrv_hr_ratio': derived['hrv_hr_ratio'],
+        'bmi_hr_interaction': derived['bmi_hr_interaction'],
+        'age': age,
+        'age_bmi_interaction': derived['age_bmi_interaction'],
+        'age_hrv_ratio': derived['age_hrv_ratio']
+    }
+
+
+def add_derived_features(df):
+    """학습 테이블(HR_mean, HRV_SDNN, bmi, age 열)에 파생 피처 열 추가 (복사본 반환)"""
+    df = df.copy()
+    for name, values in derive(df['HR_mean'], df['HRV_SDNN'], df['bmi'], df['age']).items():
+        df[name] = values
+    return df
+
+
+def feature_matrix(hr_mean, hrv_sdnn, bmi, mean_sa02, gender, age, numeric_features=NUMERIC_FEATURES,
+                   indicator_categories=(), out=None):
+    """
+    원본 입력 행렬 [수치형 피처 | 성별 지시 열] (평탄화 엔진/고속 경로 입력)
+    
+    Parameters:
+    - 입력값: 스칼라(1행) 또는 같은 길이의 NumPy 배열
+    - numeric_features: 수치형 열 순서
+    - indicator_categories: 지시 열을 만들 성별 값 순서 (gender == 값이면 1)
+    - out: 결과를 채울 (n, 열 수) 배열 (미리 할당한 행 재사용)
+    """
+    values = compute_feature_values(hr_mean, hrv_sdnn, bmi, mean_sa02, age)
+    if out is None:
+        # 열 단위로 채우므로 열 우선 배열로 할당
+        out = np.empty((np.size(hr_mean), len(numeric_features) + len(indicator_categories)), order='F')
+    for j, name in enumerate(numeric_features):
+        out[:, j] = values[name]
+    
+    offset = len(numeric_features)
+    if indicator_categories and not isinstance(gender, str):
+        gender = np.asarray(gender)
+    for j, category in enumerate(indicator_categories):
+        out[:, offset + j] = (gender == category)
+    return out
+
+
+def build_feature_frame(hr_mean, hrv_sdnn, bmi, mean_sa02, gender, age):
+    """모델 입력 DataFrame 생성 (MODEL_FEATURES 순서, 스칼라 또는 배열 입력)"""
+    hr_mean = np.atleast_1d(np.asarray(hr_mean, dtype=float))
+    hrv_sdnn = np.atleast_1d(np.asarray(hrv_sdnn, dtype=float))
+    bmi = np.atleast_1d(np.asarray(bmi, dtype=float))
+    mean_sa02 = np.atleast_1d(np.asarray(mean_sa02, dtype=float))
+    gender = np.atleast_1d(np.asarray(gender, dtype=object))
+    age = np.atleast_1d(np.asarray(age))
+    
+    frame = pd.DataFrame(compute_feature_values(hr_mean, hrv_sdnn, bmi, mean_sa02, age))
+    frame['gender'] = gender
+    return frame
+
+
+class InvalidRecordError(ValueError):
+    """일괄 입력 레코드의 값이 숫자가 아니거나 유한하지 않음 (index: 레코드 위치, key: 파라미터)"""
+    
+    def __init__(self, index, key, value):
+        super().__init__(f"records[{index}]의 {key} 값이 올바르지 않습니다: {value!r}")
+        self.index = index
+        self.key = key
+
+
+def _numeric_column(records, key, convert):
+    """레코드의 key 값을 convert(float/int)로 변환한 배열 (null, 문자열, NaN/inf는 InvalidRecordError)"""
+    try:
+        column = np.fromiter(map(convert, map(itemgetter(key), records)), dtype=float, count=len(records))
+    except (TypeError, ValueError, OverflowError):
+        for index, record in enumerate(records):
+            try:
+                convert(record[key])
+            except (TypeError, ValueError, OverflowError):
+                raise InvalidRecordError(index, key, record[key]) from None
+        raise
+    bad = np.flatnonzero(~np.isfinite(column))
+    if bad.size:
+        raise InvalidRecordError(int(bad[0]), key, records[bad[0]][key])
+    return column
+
+
+def columns_from_records(records):
+    """
+    입력 dict 리스트 → 키별 NumPy 배열 (INPUT_KEYS)
+    
+    키마다 한 번씩 훑어 배열을 바로 채우며, 단일 예측과 같이 값마다 float()(나이는 int())로 변환합니다.
+    변환할 수 없거나 유한하지 않은 값은 InvalidRecordError로 거부합니다.
+    """
+    columns = {key: _numeric_column(records, key, int if key == 'age' else float) for key in _NUMERIC_KEYS}
+    columns['gender'] = np.array(list(map(str, map(itemgetter('gender'), records))), dtype=object)
+    return columns
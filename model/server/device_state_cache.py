@@ -0,0 +1,133 @@
+"""
+디바이스 ID별 에어컨 상태 캐시 (TTL + 요청 병합)
+
+앱이 상태를 자주 새로고침해도 ThinQ 클라우드 호출은 TTL마다 한 번만 발생합니다.
+- 요청 병합: 같은 디바이스를 동시에 조회하면 진행 중인 한 번의 호출 결과를 함께 사용
+- 무효화: 제어 명령이 성공하면 해당 디바이스 항목을 지워 다음 조회가 새 상태를 가져옴
+
+환경 변수:
+- DEVICE_STATE_CACHE_TTL: 항목 유효 시간(초, 0이면 비활성화, 기본 10)
+"""
+
+import os
+import time
+import threading
+from concurrent.futures import Future
+
+DEFAULT_TTL = 10.0
+
+# 진행 중인 조회를 기다리는 최대 시간(초)
+FETCH_WAIT_TIMEOUT = 30.0
+
+
+class DeviceStateCache:
+    """스레드 안전한 디바이스 상태 캐시"""
+    
+    def __init__(self, ttl=DEFAULT_TTL):
+        self.ttl = ttl
+        self._entries = {}       # device_id → (상태 응답, 만료 시각)
+        self._in_flight = {}     # device_id → Future
+        self._generation = {}    # device_id → 무효화 횟수 (무효화 전에 시작한 조회 결과는 저장하지 않음)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+    
+    @classmethod
+    def from_env(cls):
+        """환경 변수 설정으로 캐시 생성"""
+        return cls(ttl=float(os.environ.get('DEVICE_STATE_CACHE_TTL', DEFAULT_TTL)))
+    
+    @property
+    def enabled(self):
+        return self.ttl > 0
+    
+    def get_or_fetch(self, device_id, fetch):
+        """
+        캐시에서 상태를 찾고, 없으면 조회 (동시 조회는 한 번으로 병합)
+        
+        Parameters:
+        - device_id: 디바이스 ID
+        - fetch: 인자 없이 상태 응답을 반환하는 함수
+        
+        Returns:
+        - (상태 응답, 캐시 적중 여부)
+        """
+        if not self.enabled:
+            return fetch(), False
+        
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(device_id)
+            if entry is not None and entry[1] > now:
+                self.hits += 1
+                return entry[0], True
+            
+            future = self._in_flight.get(device_id)
+            if future is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                self.misses += 1
+                future = Future()
+                self._in_flight[device_id] = future
+                generation = self._generation.get(device_id, 0)
+                leader = True
+        
+        if not leader:
+            # 다른 요청이 진행 중인 조회 결과 공유 (실패하면 같은 예외 발생)
+            return future.result(timeout=FETCH_WAIT_TIMEOUT), True
+        
+        # 클라우드 호출은 잠금 밖에서 수행
+        try:
+            value = fetch()
+        except BaseException as e:
+            with self._lock:
+                self._in_flight.pop(device_id, None)
+            future.set_exception(e)
+            raise
+        
+        with self._lock:
+            self._in_flight.pop(device_id, None)
+            if self._generation.get(device_id, 0) == generation:
+                self._entries[device_id] = (value, time.monotonic() + self.ttl)
+        future.set_result(value)
+        return value, False
+    
+    def peek(self, device_id):
+        """조회 없이 유효한 캐시 항목만 반환 (없으면 None, 적중 통계에 포함하지 않음)"""
+        with self._lock:
+            entry = self._entries.get(device_id)
+            if entry is not None and entry[1] > time.monotonic():
+                return entry[0]
+            return None
+    
+    def invalidate(self, device_id):
+        """디바이스 항목 삭제 (제어 명령 성공 후)"""
+        with self._lock:
+            self._entries.pop(device_id, None)
+            self._generation[device_id] = self._generation.get(device_id, 0) + 1
+            self.invalidations += 1
+    
+    def clear(self):
+        """모든 항목 삭제"""
+        with self._lock:
+            for device_id in set(self._entries) | set(self._in_flight):
+                self._generation[device_id] = self._generation.get(device_id, 0) + 1
+            self._entries.clear()
+    
+    def stats(self):
+        """적중/실패 통계"""
+        with self._lock:
+            total = self.hits + self.misses + self.coalesced
+            return {
+                'enabled': self.enabled,
+                'size': len(self._entries),
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'invalidations': self.invalidations,
+                'hit_rate': round((self.hits + self.coalesced) / total, 4) if total else 0.0
+            }
@@ -0,0 +1,134 @@
+"""
+pandas 없이 NumPy 피처 행으로 예측하는 고속 경로
+
+학습 시 기록한 피처 열 순서(.features.json)대로 미리 할당한 NumPy 행을 채워
+DataFrame 생성과 ColumnTransformer의 열 이름 조회를 건너뜁니다.
+평탄화 엔진이 있으면 원본 입력 행을 그대로 평가하고,
+없으면 스케일러/인코더 연산을 직접 적용한 뒤 회귀 모델을 호출합니다.
+"""
+
+import os
+import json
+import threading
+import numpy as np
+
+from flat_model import ensemble_members, column_layout
+from derived_features import feature_matrix
+
+
+def feature_order_path(model_path):
+    """sklearn 모델 경로에 대응하는 피처 순서 파일 경로"""
+    root, _ = os.path.splitext(model_path)
+    return root + '.features.json'
+
+
+def load_feature_order(model_path, model=None):
+    """
+    학습 시 기록한 피처 열 순서 로드
+    
+    파일이 없으면 모델의 feature_names_in_에서 수치형/범주형을 구분해 사용합니다.
+    """
+    path = feature_order_path(model_path)
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    
+    names = getattr(model, 'feature_names_in_', None)
+    if names is None:
+        return None
+    names = [str(name) for name in names]
+    return {
+        'numeric_features': [name for name in names if name != 'gender'],
+        'categorical_features': [name for name in names if name == 'gender']
+    }
+
+
+class FastPredictor:
+    """미리 할당한 NumPy 행으로 단일 샘플을 예측하는 고속 경로"""
+    
+    def __init__(self, model, feature_order, flat_model=None):
+        self.numeric_features = list(feature_order['numeric_features'])
+        self.categorical_features = list(feature_order['categorical_features'])
+        if self.categorical_features not in ([], ['gender']):
+            raise ValueError(f"지원하지 않는 범주형 피처입니다: {self.categorical_features}")
+        
+        self._local = threading.local()
+        
+        if flat_model is not None and flat_model.numeric_features == self.numeric_features:
+            # 평탄화 엔진: [수치형 피처 | 범주 지시 열] 행을 그대로 평가
+            self.engine = 'flat'
+            self.flat_model = flat_model
+            self.indicator_categories = list(flat_model.indicator_categories)
+            self.width = len(self.numeric_features) + len(self.indicator_categories)
+        else:
+            # sklearn 엔진: 스케일러/인코더 연산을 직접 적용
+            self.engine = 'sklearn'
+            self.flat_model = None
+            self.indicator_categories = []
+            self.width = len(self.numeric_features)
+            members, self.weights = ensemble_members(model)
+            
+            # 전처리기를 공유하는 모델은 변환을 한 번만 수행
+            self.plans = []
+            self.members = []
+            plan_index = {}
+            for preprocessor, regressor in members:
+                if id(preprocessor) not in plan_index:
+                    plan_index[id(preprocessor)] = len(self.plans)
+                    self.plans.append(self._preprocess_plan(preprocessor))
+                self.members.append((plan_index[id(preprocessor)], regressor))
+    
+    def _preprocess_plan(self, preprocessor):
+        """전처리기 하나를 배열 연산으로 풀어 둔 실행 계획"""
+        numeric, indicators = column_layout(preprocessor)
+        return {
+            'n_columns': len(numeric) + len(indicators),
+            'num_out': np.asarray([index for index, _, _, _ in numeric], dtype=np.intp),
+            'num_in': np.asarray([self.numeric_features.index(column) for _, column, _, _ in numeric],
+                                 dtype=np.intp),
+            'mean': np.asarray([mean for _, _, mean, _ in numeric]),
+            'scale': np.asarray([scale for _, _, _, scale in numeric]),
+            'indicators': [(index, category) for index, _, category in indicators]
+        }
+    
+    def _row(self):
+        """스레드별로 미리 할당한 피처 행"""
+        row = getattr(self._local, 'row', None)
+        if row is None:
+            row = np.zeros((1, self.width))
+            self._local.row = row
+        return row
+    
+    def predict_one(self, hr_mean, hrv_sdnn, bmi, mean_sa02, gender, age):
+        """단일 샘플 체온 예측"""
+        row = feature_matrix(hr_mean, hrv_sdnn, bmi, mean_sa02, gender, age, self.numeric_features,
+                             self.indicator_categories, out=self._row())
+        
+        if self.engine == 'flat':
+            return float(self.flat_model.predict_raw(row)[0])
+        
+        transformed = []
+        for plan in self.plans:
+            X = np.zeros((1, plan['n_columns']))
+            X[0, plan['num_out']] = (row[0, plan['num_in']] - plan['mean']) / plan['scale']
+            for index, category in plan['indicators']:
+                X[0, index] = (gender == category)
+            transformed.append(X)
+        
+        predictions = [regressor.predict(transformed[plan_index]) for plan_index, regressor in self.members]
+        return float(np.average(np.asarray(predictions).T, axis=1, weights=self.weights)[0])
+    
+    def validate(self, reference_predict, probes):
+        """
+        DataFrame 경로와 예측값이 정확히 일치하는지 확인
+        
+        Parameters:
+        - reference_predict: 입력 dict를 받아 DataFrame 경로로 예측하는 함수
+        - probes: predict_one() 인자 dict 리스트
+        """
+        # 평탄화 엔진은 비트 단위 일치, sklearn 엔진은 스레드 누적 순서 차이만 허용
+        tolerance = 0.0 if self.engine == 'flat' else 1e-9
+        for probe in probes:
+            if abs(self.predict_one(**probe) - reference_predict(**probe)) > tolerance:
+                return False
+        return True
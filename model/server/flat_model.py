@@ -0,0 +1,488 @@
+"""
+앙상블 트리 평탄화(flat array) 추론 엔진
+
+앙상블(RandomForest + ExtraTrees + GradientBoosting)의 모든 트리를
+연속된 NumPy 노드 배열로 펼쳐서, 트리 3000개를 한 번에 벡터 연산으로 탐색합니다.
+
+- StandardScaler: 분기 임계값을 원본 피처 공간으로 접어 넣음 (정확한 경계값 계산)
+- OneHotEncoder: 범주별 0/1 지시 열로 변환
+- 예측값은 sklearn 모델(n_jobs=1 기준)과 비트 단위로 동일
+
+사용법:
+    python flat_model.py ../pycode/ai_thermal_model_with_age.pkl
+"""
+
+import os
+import sys
+import zipfile
+import numpy as np
+
+FLAT_MODEL_FORMAT_VERSION = 1
+
+# 검증용 프로브 샘플 수
+N_PROBE_SAMPLES = 64
+
+# 임계값 보정 시 최대 ulp 이동 횟수
+MAX_FOLD_STEPS = 10000
+
+
+def flat_model_path(model_path):
+    """sklearn 모델 경로에 대응하는 평탄화 모델 경로"""
+    root, _ = os.path.splitext(model_path)
+    return root + '.flat.npz'
+
+
+def _scaled32(x, mean, scale):
+    """StandardScaler.transform과 동일한 연산 후 트리 입력과 같은 float32로 변환"""
+    with np.errstate(over='ignore', invalid='ignore'):
+        return ((x - mean) / scale).astype(np.float32)
+
+
+def _fold_thresholds(threshold, mean, scale):
+    """
+    스케일된 공간의 분기 조건을 원본 공간의 임계값으로 변환
+    
+    float32((x - mean) / scale) <= threshold 를 만족하는 가장 큰 x를 찾습니다.
+    좌변은 x에 대해 단조 증가하므로 x <= 반환값 과 정확히 동치입니다.
+    """
+    threshold = np.asarray(threshold, dtype=np.float64)
+    mean = np.asarray(mean, dtype=np.float64)
+    scale = np.asarray(scale, dtype=np.float64)
+    
+    # threshold 이하인 가장 큰 float32 값과 다음 float32 값의 중점이 스케일 공간의 경계
+    lower = threshold.astype(np.float32)
+    lower = np.where(lower > threshold, np.nextafter(lower, np.float32(-np.inf)), lower)
+    upper = np.nextafter(lower, np.float32(np.inf))
+    with np.errstate(over='ignore', invalid='ignore'):
+        boundary = (lower.astype(np.float64) + upper.astype(np.float64)) / 2
+        folded = boundary * scale + mean
+    
+    finite = np.isfinite(folded)
+    folded = np.where(finite, folded, np.inf)
+    
+    # 부동소수점 반올림 오차를 ulp 단위 이동으로 보정
+    for _ in range(MAX_FOLD_STEPS):
+        ok = _scaled32(folded, mean, scale) <= threshold
+        next_ok = _scaled32(np.nextafter(folded, np.inf), mean, scale) <= threshold
+        step_down = finite & ~ok
+        step_up = finite & ok & next_ok
+        if not (step_down.any() or step_up.any()):
+            return folded
+        folded = np.where(step_down, np.nextafter(folded, -np.inf), folded)
+        folded = np.where(step_up, np.nextafter(folded, np.inf), folded)
+    
+    raise ValueError("분기 임계값 변환이 수렴하지 않았습니다.")
+
+
+def ensemble_members(model):
+    """
+    앙상블 모델에서 (전처리기, 회귀 모델) 목록과 가중치 추출
+    
+    - Pipeline(preprocess → VotingRegressor): 전처리를 공유하는 구조
+    - VotingRegressor(Pipeline × 3): 모델마다 전처리를 따로 가진 기존 구조
+    """
+    if hasattr(model, 'named_steps'):
+        preprocessor = model.named_steps['preprocess']
+        voting = model.steps[-1][1]
+        return [(preprocessor, regressor) for regressor in voting.estimators_], voting.weights
+    
+    members = []
+    for estimator in model.estimators_:
+        steps = dict(estimator.named_steps)
+        members.append((steps['preprocess'], steps['model']))
+    return members, model.weights
+
+
+def column_layout(preprocessor):
+    """
+    ColumnTransformer 출력 열 정보 추출
+    
+    Returns:
+    - numeric: [(출력 열 인덱스, 피처명, mean, scale)]
+    - indicators: [(출력 열 인덱스, 피처명, 범주값)]
+    """
+    numeric = []
+    indicators = []
+    for name, transformer, columns in preprocessor.transformers_:
+        if transformer == 'drop' or name == 'remainder':
+            continue
+        out = preprocessor.output_indices_[name]
+        class_name = type(transformer).__name__
+        
+        if class_name == 'StandardScaler':
+            mean = transformer.mean_ if transformer.mean_ is not None else np.zeros(len(columns))
+            scale = transformer.scale_ if transformer.scale_ is not None else np.ones(len(columns))
+            for i, column in enumerate(columns):
+                numeric.append((out.start + i, column, float(mean[i]), float(scale[i])))
+        
+        elif class_name == 'OneHotEncoder':
+            if transformer.min_frequency is not None or transformer.max_categories is not None:
+                raise ValueError("빈도 기반 OneHotEncoder는 지원하지 않습니다.")
+            index = out.start
+            drop_idx = transformer.drop_idx_
+            for j, column in enumerate(columns):
+                for k, category in enumerate(transformer.categories_[j]):
+                    if drop_idx is not None and drop_idx[j] is not None and k == drop_idx[j]:
+                        continue
+                    indicators.append((index, column, str(category)))
+                    index += 1
+        
+        else:
+            raise ValueError(f"지원하지 않는 전처리기입니다: {class_name}")
+    
+    return numeric, indicators
+
+
+def _encoder_categories(preprocessor, column):
+    """OneHotEncoder가 학습한 범주 목록 (드롭된 범주 포함)"""
+    for name, transformer, columns in preprocessor.transformers_:
+        if type(transformer).__name__ == 'OneHotEncoder' and column in list(columns):
+            return [str(c) for c in transformer.categories_[list(columns).index(column)]]
+    return []
+
+
+def _tree_arrays(tree):
+    """sklearn Tree 객체의 노드 배열"""
+    return (tree.children_left, tree.children_right, tree.feature,
+            tree.threshold, tree.value[:, 0, 0])
+
+
+def _mmap_npz(path):
+    """
+    비압축 npz의 각 배열을 파일에서 바로 메모리 매핑 (np.load는 npz에 mmap_mode를 지원하지 않음)
+    
+    같은 파일을 매핑한 프로세스들은 페이지 캐시의 물리 메모리 한 벌을 공유합니다.
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as f:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"압축된 npz는 메모리 매핑할 수 없습니다: {info.filename}")
+            
+            # 로컬 파일 헤더(30바이트 + 파일명 + extra 필드) 다음이 .npy 데이터
+            f.seek(info.header_offset)
+            header = f.read(30)
+            name_length = int.from_bytes(header[26:28], 'little')
+            extra_length = int.from_bytes(header[28:30], 'little')
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+            
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            if dtype.hasobject:
+                raise ValueError(f"객체 배열은 메모리 매핑할 수 없습니다: {info.filename}")
+            
+            key = info.filename[:-len('.npy')] if info.filename.endswith('.npy') else info.filename
+            if int(np.prod(shape)) == 0:
+                arrays[key] = np.empty(shape, dtype=dtype)
+            else:
+                arrays[key] = np.memmap(path, dtype=dtype, mode='r', offset=f.tell(), shape=shape,
+                                        order='F' if fortran_order else 'C')
+    return arrays
+
+
+class FlatEnsemble:
+    """평탄화된 앙상블 모델 (연속 노드 배열 + 벡터화 평가기)"""
+    
+    ARRAY_KEYS = (
+        'left', 'right', 'feature', 'threshold', 'value', 'roots',
+        'member_kind', 'member_start', 'member_stop', 'member_init', 'weights',
+        'numeric_features', 'indicator_features', 'indicator_categories',
+        'max_depth', 'format_version', 'probe_numeric', 'probe_categories', 'probe_expected'
+    )
+    
+    def __init__(self, arrays):
+        self.arrays = arrays
+        self.left = arrays['left']
+        self.right = arrays['right']
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.value = arrays['value']
+        self.roots = arrays['roots']
+        self.max_depth = int(arrays['max_depth'])
+        self.numeric_features = [str(f) for f in arrays['numeric_features']]
+        self.indicator_features = [str(f) for f in arrays['indicator_features']]
+        self.indicator_categories = [str(c) for c in arrays['indicator_categories']]
+        self.weights = arrays['weights'] if len(arrays['weights']) else None
+        self.members = [
+            (str(kind), int(start), int(stop), float(init))
+            for kind, start, stop, init in zip(arrays['member_kind'], arrays['member_start'],
+                                               arrays['member_stop'], arrays['member_init'])
+        ]
+        self.n_trees = len(self.roots)
+        self.n_nodes = len(self.left)
+    
+    # ==================== 변환 (export) ====================
+    
+    @classmethod
+    def from_model(cls, model):
+        """학습된 앙상블 모델을 평탄화 모델로 변환"""
+        members, weights = ensemble_members(model)
+        
+        # 원본 입력 열 배치: 수치형 피처 + 범주 지시 열
+        numeric_features = []
+        indicator_specs = []
+        for preprocessor, _ in members:
+            numeric, indicators = column_layout(preprocessor)
+            for _, column, _, _ in numeric:
+                if column not in numeric_features:
+                    numeric_features.append(column)
+            for _, column, category in indicators:
+                if (column, category) not in indicator_specs:
+                    indicator_specs.append((column, category))
+        
+        lefts, rights, features, thresholds, values, roots = [], [], [], [], [], []
+        member_kind, member_start, member_stop, member_init = [], [], [], []
+        offset = 0
+        max_depth = 0
+        
+        for preprocessor, regressor in members:
+            numeric, indicators = column_layout(preprocessor)
+            n_columns = len(numeric) + len(indicators)
+            raw_index = np.zeros(n_columns, dtype=np.int64)
+            col_mean = np.zeros(n_columns)
+            col_scale = np.ones(n_columns)
+            col_scaled = np.zeros(n_columns, dtype=bool)
+            for index, column, mean, scale in numeric:
+                raw_index[index] = numeric_features.index(column)
+                col_mean[index] = mean
+                col_scale[index] = scale
+                col_scaled[index] = True
+            for index, column, category in indicators:
+                raw_index[index] = len(numeric_features) + indicator_specs.index((column, category))
+            
+            class_name = type(regressor).__name__
+            if class_name in ('RandomForestRegressor', 'ExtraTreesRegressor'):
+                trees = [est.tree_ for est in regressor.estimators_]
+                kind, init, scale_value = 'forest', 0.0, None
+            elif class_name == 'GradientBoostingRegressor':
+                trees = [est.tree_ for est in regressor.estimators_[:, 0]]
+                kind, scale_value = 'boosting', regressor.learning_rate
+                if regressor.init_ == 'zero':
+                    init = 0.0
+                else:
+                    init = float(regressor.init_.predict(np.zeros((1, regressor.n_features_in_)))[0])
+            else:
+                raise ValueError(f"지원하지 않는 회귀 모델입니다: {class_name}")
+            
+            member_kind.append(kind)
+            member_start.append(len(roots))
+            member_init.append(init)
+            
+            for tree in trees:
+                left, right, feature, threshold, value = _tree_arrays(tree)
+                n = len(left)
+                node_ids = np.arange(n) + offset
+                is_leaf = left < 0
+                
+                # 리프 노드는 자기 자신을 가리키도록 하여 고정 횟수 탐색이 가능하게 함
+                lefts.append(np.where(is_leaf, node_ids, left + offset))
+                rights.append(np.where(is_leaf, node_ids, right + offset))
+                
+                column = np.where(is_leaf, 0, feature)
+                features.append(np.where(is_leaf, 0, raw_index[column]))
+                
+                folded = threshold.astype(np.float64)
+                scaled = ~is_leaf & col_scaled[column]
+                if scaled.any():
+                    folded[scaled] = _fold_thresholds(threshold[scaled], col_mean[column[scaled]],
+                                                      col_scale[column[scaled]])
+                folded[is_leaf] = 0.0
+                thresholds.append(folded)
+                
+                if scale_value is None:
+                    values.append(value.astype(np.float64))
+                else:
+                    values.append(scale_value * value)
+                
+                roots.append(offset)
+                max_depth = max(max_depth, int(tree.max_depth))
+                offset += n
+            
+            member_stop.append(len(roots))
+        
+        arrays = {
+            'left': np.concatenate(lefts).astype(np.int32),
+            'right': np.concatenate(rights).astype(np.int32),
+            'feature': np.concatenate(features).astype(np.int32),
+            'threshold': np.concatenate(thresholds),
+            'value': np.concatenate(values),
+            'roots': np.asarray(roots, dtype=np.int32),
+            'member_kind': np.asarray(member_kind),
+            'member_start': np.asarray(member_start, dtype=np.int64),
+            'member_stop': np.asarray(member_stop, dtype=np.int64),
+            'member_init': np.asarray(member_init, dtype=np.float64),
+            'weights': np.asarray(weights if weights is not None else [], dtype=np.float64),
+            'numeric_features': np.asarray(numeric_features),
+            'indicator_features': np.asarray([c for c, _ in indicator_specs]),
+            'indicator_categories': np.asarray([v for _, v in indicator_specs]),
+            'max_depth': np.asarray(max_depth),
+            'format_version': np.asarray(FLAT_MODEL_FORMAT_VERSION),
+        }
+        flat = cls(arrays)
+        
+        # 검증용 프로브 샘플 (분기 경계값 포함) 및 sklearn 기준 예측값 저장
+        probe_numeric, probe_categories = flat._probe_inputs(members)
+        probe_frame = flat._probe_frame(probe_numeric, probe_categories)
+        arrays['probe_numeric'] = probe_numeric
+        arrays['probe_categories'] = probe_categories
+        arrays['probe_expected'] = sequential_predict(model, probe_frame)
+        
+        if not np.array_equal(flat.predict_frame(probe_frame), arrays['probe_expected']):
+            raise ValueError("평탄화 모델 예측값이 원본 모델과 일치하지 않습니다.")
+        
+        return flat
+    
+    def _probe_inputs(self, members, n_samples=N_PROBE_SAMPLES, seed=42):
+        """스케일러 통계 기반 무작위 입력 + 분기 경계값 바로 위/아래 입력 생성"""
+        rng = np.random.default_rng(seed)
+        numeric, _ = column_layout(members[0][0])
+        stats = {column: (mean, scale) for _, column, mean, scale in numeric}
+        
+        X = np.empty((n_samples, len(self.numeric_features)))
+        for j, column in enumerate(self.numeric_features):
+            mean, scale = stats.get(column, (0.0, 1.0))
+            X[:, j] = mean + scale * rng.standard_normal(n_samples)
+        
+        # 절반은 임의 내부 노드의 접힌 임계값과 그 다음 값으로 설정
+        internal = np.flatnonzero((self.left != np.arange(self.n_nodes))
+                                  & (self.feature < len(self.numeric_features)))
+        if len(internal):
+            nodes = rng.choice(internal, size=n_samples // 2)
+            for i, node in enumerate(nodes):
+                value = self.threshold[node]
+                if np.isfinite(value):
+                    X[i, self.feature[node]] = value if i % 2 == 0 else np.nextafter(value, np.inf)
+        
+        # 범주형 피처는 드롭된 범주를 포함한 전체 범주를 번갈아 사용
+        columns = self._categorical_features()
+        probe_categories = np.empty((n_samples, len(columns)), dtype=object)
+        for j, column in enumerate(columns):
+            categories = _encoder_categories(members[0][0], column)
+            probe_categories[:, j] = [categories[i % len(categories)] for i in range(n_samples)]
+        return X, probe_categories.astype(str)
+    
+    def _categorical_features(self):
+        """범주형 원본 피처명 (등장 순서 유지)"""
+        return list(dict.fromkeys(self.indicator_features))
+    
+    def _probe_frame(self, X_numeric, categories):
+        """프로브 입력을 sklearn 모델 입력 DataFrame으로 변환"""
+        import pandas as pd
+        frame = pd.DataFrame(X_numeric, columns=self.numeric_features)
+        for j, column in enumerate(self._categorical_features()):
+            frame[column] = categories[:, j].astype(object)
+        return frame
+    
+    # ==================== 저장 / 로드 ====================
+    
+    def save(self, path):
+        """평탄화 모델을 비압축 npz로 저장"""
+        np.savez(path, **{key: self.arrays[key] for key in self.ARRAY_KEYS})
+    
+    @classmethod
+    def load(cls, path, mmap=False):
+        """저장된 평탄화 모델 로드 (mmap=True이면 노드 배열을 복사하지 않고 메모리 매핑)"""
+        if mmap:
+            arrays = _mmap_npz(path)
+        else:
+            with np.load(path, allow_pickle=False) as data:
+                arrays = {key: data[key] for key in data.files}
+        if int(arrays['format_version']) != FLAT_MODEL_FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 평탄화 모델 형식입니다: {int(arrays['format_version'])}")
+        return cls(arrays)
+    
+    def verify(self, model):
+        """저장된 프로브 샘플로 원본 모델과 예측값이 일치하는지 확인"""
+        frame = self._probe_frame(self.arrays['probe_numeric'], self.arrays['probe_categories'])
+        expected = self.arrays['probe_expected']
+        return (np.array_equal(self.predict_frame(frame), expected)
+                and np.array_equal(sequential_predict(model, frame), expected))
+    
+    # ==================== 추론 ====================
+    
+    def transform_frame(self, frame):
+        """모델 입력 DataFrame을 원본 입력 행렬(수치형 + 범주 지시 열)로 변환"""
+        X = np.empty((len(frame), len(self.numeric_features) + len(self.indicator_features)))
+        for j, column in enumerate(self.numeric_features):
+            X[:, j] = frame[column].to_numpy(dtype=np.float64)
+        offset = len(self.numeric_features)
+        for j, (column, category) in enumerate(zip(self.indicator_features, self.indicator_categories)):
+            X[:, offset + j] = (frame[column].astype(str).to_numpy() == category)
+        return X
+    
+    def predict_raw(self, X):
+        """원본 입력 행렬에 대한 예측"""
+        X = np.asarray(X, dtype=np.float64)
+        n_samples = X.shape[0]
+        rows = np.arange(n_samples)
+        
+        # 모든 트리를 동시에 한 단계씩 탐색 (리프는 자기 자신으로 이동)
+        node = np.repeat(self.roots[:, np.newaxis], n_samples, axis=1)
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        leaf_values = self.value[node]
+        
+        # sklearn과 같은 순서로 누적하여 비트 단위로 동일한 결과 보장
+        predictions = []
+        for kind, start, stop, init in self.members:
+            member_values = leaf_values[start:stop]
+            if kind == 'forest':
+                predictions.append(np.add.accumulate(member_values, axis=0)[-1] / (stop - start))
+            else:
+                stages = np.vstack([np.full((1, n_samples), init), member_values])
+                predictions.append(np.add.accumulate(stages, axis=0)[-1])
+        
+        return np.average(np.asarray(predictions).T, axis=1, weights=self.weights)
+    
+    def predict_frame(self, frame):
+        """모델 입력 DataFrame에 대한 예측"""
+        return self.predict_raw(self.transform_frame(frame))
+    
+    def predict(self, frame):
+        """sklearn 모델과 같은 인터페이스"""
+        return self.predict_frame(frame)
+
+
+def sequential_predict(model, X):
+    """n_jobs=1로 sklearn 모델 예측 (스레드 누적 순서에 따른 차이 제거)"""
+    params = model.get_params()
+    n_jobs = {key: value for key, value in params.items() if key.endswith('n_jobs')}
+    try:
+        model.set_params(**{key: 1 for key in n_jobs})
+        return model.predict(X)
+    finally:
+        model.set_params(**n_jobs)
+
+
+def export_flat_model(model, path):
+    """학습된 모델을 평탄화하여 저장"""
+    flat = FlatEnsemble.from_model(model)
+    flat.save(path)
+    return flat
+
+
+if __name__ == '__main__':
+    import time
+    import joblib
+    
+    if len(sys.argv) < 2:
+        print("사용법: python flat_model.py <모델.pkl> [출력.flat.npz]")
+        sys.exit(1)
+    
+    model_path = sys.argv[1]
+    output_path = sys.argv[2] if len(sys.argv) > 2 else flat_model_path(model_path)
+    
+    print(f"📦 모델 로드: {model_path}")
+    model = joblib.load(model_path)
+    
+    start = time.perf_counter()
+    flat = export_flat_model(model, output_path)
+    elapsed = time.perf_counter() - start
+    
+    print(f"✅ 평탄화 완료: 트리 {flat.n_trees}개, 노드 {flat.n_nodes}개, 최대 깊이 {flat.max_depth} ({elapsed:.1f}초)")
+    print(f"✅ 원본 모델과 예측값 일치 확인 (프로브 {N_PROBE_SAMPLES}개)")
+    print(f"💾 저장 완료: {output_path}")
@@ -0,0 +1,23 @@
+"""
+gunicorn 설정 (운영 서버)
+
+환경 변수:
+- SERVER_BIND: 바인드 주소 (기본 0.0.0.0:5000)
+- SERVER_WORKERS: 워커 프로세스 수 (기본 CPU 코어 수)
+- SERVER_THREADS: 워커당 스레드 수 (기본 1, 에어컨 API처럼 I/O 대기가 많으면 늘림)
+- SERVER_TIMEOUT: 요청 제한 시간(초, 기본 30)
+"""
+
+import os
+import multiprocessing
+
+bind = os.environ.get('SERVER_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('SERVER_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.environ.get('SERVER_THREADS', 1))
+timeout = int(os.environ.get('SERVER_TIMEOUT', 30))
+
+# 마스터에서 모델을 한 번 로드한 뒤 fork하여 워커 간 메모리 공유
+preload_app = True
+
+accesslog = '-'
+errorlog = '-'
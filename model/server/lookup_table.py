@@ -0,0 +1,271 @@
+"""
+이산화된 입력 공간에 대한 예측 룩업 테이블
+
+생체 입력값은 생리적 범위가 좁으므로(산소포화도 85~100, 나이 0~100, BMI 15~45, 성별 2종)
+격자 위의 예측값을 미리 계산해 메모리 매핑된 NumPy 배열로 저장하고,
+서버에서는 앙상블 대신 다중 선형 보간으로 응답합니다.
+격자 밖 입력은 원래 모델로 예측합니다.
+
+생성된 파일:
+- <모델>.lut.npy: 예측값 테이블 (성별 × 심박수 × HRV × BMI × 산소포화도 × 나이, float32)
+- <모델>.lut.json: 격자 정의, 원본 모델 대비 오차(표본 측정), 모델 확인용 프로브
+
+측정한 최대 오차가 허용 오차(LOOKUP_TABLE_MAX_ERROR, 기본 0.5°C)를 넘으면
+생성 도구는 실패 코드로 종료하고 서버는 테이블을 사용하지 않습니다.
+
+사용법:
+    python lookup_table.py ../pycode/ai_thermal_model_with_age.pkl
+    python lookup_table.py ../pycode/ai_thermal_model_with_age.pkl --axis hr_mean=40,120,2 --samples 50000
+    python lookup_table.py ../pycode/ai_thermal_model_with_age.pkl --max-error 1.0
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+
+from derived_features import compute_feature_values, feature_matrix
+
+LOOKUP_TABLE_FORMAT_VERSION = 1
+
+# 연속형 입력 축: (최소, 최대, 간격)
+DEFAULT_AXES = {
+    'hr_mean': (40.0, 120.0, 4.0),
+    'hrv_sdnn': (10.0, 310.0, 20.0),
+    'bmi': (15.0, 45.0, 2.0),
+    'mean_sa02': (85.0, 100.0, 1.0),
+    'age': (0.0, 100.0, 10.0)
+}
+AXIS_NAMES = ['hr_mean', 'hrv_sdnn', 'bmi', 'mean_sa02', 'age']
+DEFAULT_GENDERS = ['F', 'M']
+
+# 오차 측정용 무작위 샘플 수
+DEFAULT_ERROR_SAMPLES = 20000
+
+# 한 번에 평가할 격자점 수
+EVAL_CHUNK_SIZE = 2048
+
+# 원본 모델 대비 허용 최대 오차(°C) 기본값
+DEFAULT_MAX_ERROR = 0.5
+
+
+def max_error_from_env():
+    """허용 최대 오차(°C) (LOOKUP_TABLE_MAX_ERROR 환경 변수)"""
+    return float(os.environ.get('LOOKUP_TABLE_MAX_ERROR', DEFAULT_MAX_ERROR))
+
+
+def lookup_table_paths(model_path):
+    """sklearn 모델 경로에 대응하는 (테이블, 메타데이터) 경로"""
+    root, _ = os.path.splitext(model_path)
+    return root + '.lut.npy', root + '.lut.json'
+
+
+def axis_values(axis):
+    """(최소, 최대, 간격) 축 정의의 격자값"""
+    start, stop, step = axis
+    count = int(round((stop - start) / step)) + 1
+    return start + step * np.arange(count)
+
+
+def make_batch_predictor(model):
+    """입력 배열 dict → 예측값 배열 함수 (평탄화 엔진 우선)"""
+    try:
+        from flat_model import FlatEnsemble
+        flat = FlatEnsemble.from_model(model)
+    except Exception as e:
+        print(f"⚠️  평탄화 엔진을 사용할 수 없어 sklearn 모델로 계산합니다: {e}")
+        flat = None
+    
+    def predict(hr_mean, hrv_sdnn, bmi, mean_sa02, gender, age):
+        if flat is not None:
+            return flat.predict_raw(feature_matrix(hr_mean, hrv_sdnn, bmi, mean_sa02, gender, age,
+                                                   flat.numeric_features, flat.indicator_categories))
+        
+        import pandas as pd
+        frame = pd.DataFrame(compute_feature_values(hr_mean, hrv_sdnn, bmi, mean_sa02, age))
+        frame['gender'] = np.asarray(gender, dtype=object)
+        return model.predict(frame)
+    
+    return predict
+
+
+class LookupTablePredictor:
+    """메모리 매핑된 예측 테이블 + 다중 선형 보간 예측기"""
+    
+    def __init__(self, table, metadata):
+        self.table = table
+        self.metadata = metadata
+        self.axes = [tuple(metadata['axes'][name]) for name in AXIS_NAMES]
+        self.genders = list(metadata['genders'])
+        self.max_abs_error = metadata.get('error', {}).get('max_abs_error')
+        self.p99_abs_error = metadata.get('error', {}).get('p99_abs_error')
+        self._start = np.asarray([axis[0] for axis in self.axes])
+        self._stop = np.asarray([axis[1] for axis in self.axes])
+        self._step = np.asarray([axis[2] for axis in self.axes])
+        self._last = np.asarray(table.shape[1:]) - 1
+    
+    @classmethod
+    def load(cls, model_path):
+        """테이블을 메모리 매핑으로 로드"""
+        table_path, metadata_path = lookup_table_paths(model_path)
+        with open(metadata_path, encoding='utf-8') as f:
+            metadata = json.load(f)
+        if metadata.get('format_version') != LOOKUP_TABLE_FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 룩업 테이블 형식입니다: {metadata.get('format_version')}")
+        table = np.load(table_path, mmap_mode='r')
+        return cls(table, metadata)
+    
+    def matches(self, predict):
+        """저장된 프로브로 현재 모델과 같은 모델로 만든 테이블인지 확인"""
+        probes = self.metadata['probes']
+        inputs = {name: np.asarray([p[name] for p in probes]) for name in AXIS_NAMES + ['gender']}
+        return np.allclose(predict(**inputs), [p['expected'] for p in probes], rtol=0, atol=1e-9)
+    
+    def within_tolerance(self, max_error):
+        """측정한 최대 오차가 허용 오차 이하인지 확인 (오차 기록이 없으면 False)"""
+        return self.max_abs_error is not None and self.max_abs_error <= max_error
+    
+    def covers(self, hr_mean, hrv_sdnn, bmi, mean_sa02, gender, age):
+        """입력이 격자 범위 안에 있는지 확인"""
+        point = np.asarray([hr_mean, hrv_sdnn, bmi, mean_sa02, age], dtype=np.float64)
+        return gender in self.genders and bool(np.all((point >= self._start) & (point <= self._stop)))
+    
+    def predict_one(self, hr_mean, hrv_sdnn, bmi, mean_sa02, gender, age):
+        """격자 안의 단일 입력을 다중 선형 보간으로 예측"""
+        point = np.asarray([hr_mean, hrv_sdnn, bmi, mean_sa02, age], dtype=np.float64)
+        position = (point - self._start) / self._step
+        lower = np.minimum(np.floor(position).astype(np.intp), np.maximum(self._last - 1, 0))
+        fraction = position - lower
+        
+        # 주변 2^5개 격자점을 잘라낸 뒤 축마다 선형 보간
+        index = (self.genders.index(gender),) + tuple(slice(i, i + 2) for i in lower)
+        block = np.asarray(self.table[index], dtype=np.float64)
+        for f in fraction:
+            if block.shape[0] == 2:
+                block = block[0] * (1.0 - f) + block[1] * f
+            else:
+                block = block[0]
+        return float(block)
+    
+    def info(self):
+        """/model_info 용 요약"""
+        return {
+            'axes': {name: list(axis) for name, axis in zip(AXIS_NAMES, self.axes)},
+            'genders': self.genders,
+            'max_abs_error': self.max_abs_error,
+            'p99_abs_error': self.p99_abs_error,
+            'error': self.metadata['error']
+        }
+
+
+def build_lookup_table(model, model_path, axes=None, genders=None, n_samples=DEFAULT_ERROR_SAMPLES, seed=42):
+    """격자 전체에 대해 모델을 평가하여 테이블과 메타데이터 저장"""
+    axes = dict(DEFAULT_AXES, **(axes or {}))
+    genders = list(genders or DEFAULT_GENDERS)
+    table_path, metadata_path = lookup_table_paths(model_path)
+    predict = make_batch_predictor(model)
+    
+    grids = [axis_values(axes[name]) for name in AXIS_NAMES]
+    shape = (len(genders),) + tuple(len(g) for g in grids)
+    n_points = int(np.prod(shape))
+    print(f"📐 격자 크기: {' × '.join(str(n) for n in shape)} = {n_points:,}개")
+    
+    table = np.lib.format.open_memmap(table_path, mode='w+', dtype=np.float32, shape=shape)
+    flat_table = table.reshape(-1)
+    
+    start = time.perf_counter()
+    for chunk_start in range(0, n_points, EVAL_CHUNK_SIZE):
+        flat_index = np.arange(chunk_start, min(chunk_start + EVAL_CHUNK_SIZE, n_points))
+        index = np.unravel_index(flat_index, shape)
+        inputs = {name: grids[k][index[k + 1]] for k, name in enumerate(AXIS_NAMES)}
+        inputs['gender'] = np.asarray(genders)[index[0]]
+        flat_table[flat_index] = predict(**inputs)
+        
+        done = flat_index[-1] + 1
+        if done == n_points or (chunk_start // EVAL_CHUNK_SIZE) % 100 == 0:
+            elapsed = time.perf_counter() - start
+            print(f"  {done:,}/{n_points:,} ({done / n_points * 100:.1f}%, {done / max(elapsed, 1e-9):,.0f}개/초)")
+    table.flush()
+    
+    # 격자 안 무작위 입력으로 원본 모델 대비 오차 측정
+    rng = np.random.default_rng(seed)
+    samples = {name: rng.uniform(axes[name][0], axes[name][1], n_samples) for name in AXIS_NAMES}
+    samples['gender'] = rng.choice(genders, n_samples)
+    expected = predict(**samples)
+    
+    metadata = {
+        'format_version': LOOKUP_TABLE_FORMAT_VERSION,
+        'axes': {name: list(axes[name]) for name in AXIS_NAMES},
+        'genders': genders,
+        'error': {},
+        'probes': []
+    }
+    predictor = LookupTablePredictor(table, metadata)
+    approx = np.asarray([
+        predictor.predict_one(gender=samples['gender'][i], **{name: samples[name][i] for name in AXIS_NAMES})
+        for i in range(n_samples)
+    ])
+    errors = np.abs(approx - expected)
+    metadata['error'] = {
+        'max_abs_error': float(errors.max()),
+        'p99_abs_error': float(np.percentile(errors, 99)),
+        'mean_abs_error': float(errors.mean()),
+        'n_samples': n_samples
+    }
+    metadata['probes'] = [
+        {**{name: float(samples[name][i]) for name in AXIS_NAMES},
+         'gender': str(samples['gender'][i]), 'expected': float(expected[i])}
+        for i in range(min(8, n_samples))
+    ]
+    
+    with open(metadata_path, 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, ensure_ascii=False, indent=2)
+    
+    return LookupTablePredictor(np.load(table_path, mmap_mode='r'), metadata)
+
+
+def parse_axis(text):
+    """'hr_mean=40,120,2' 형식의 축 정의 파싱"""
+    name, _, spec = text.partition('=')
+    if name not in AXIS_NAMES:
+        raise argparse.ArgumentTypeError(f"알 수 없는 축입니다: {name} (가능: {', '.join(AXIS_NAMES)})")
+    values = [float(v) for v in spec.split(',')]
+    if len(values) != 3 or values[2] <= 0 or values[1] <= values[0]:
+        raise argparse.ArgumentTypeError(f"축 정의는 최소,최대,간격 형식이어야 합니다: {text}")
+    return name, tuple(values)
+
+
+if __name__ == '__main__':
+    import joblib
+    
+    parser = argparse.ArgumentParser(description="예측 룩업 테이블 생성")
+    parser.add_argument('model_path', help="학습된 모델 (.pkl)")
+    parser.add_argument('--axis', action='append', type=parse_axis, default=[],
+                        help="축 정의 변경 (예: hr_mean=40,120,2)")
+    parser.add_argument('--genders', default=','.join(DEFAULT_GENDERS), help="성별 목록 (기본: F,M)")
+    parser.add_argument('--samples', type=int, default=DEFAULT_ERROR_SAMPLES, help="오차 측정 샘플 수")
+    parser.add_argument('--max-error', type=float, default=max_error_from_env(),
+                        help=f"허용 최대 오차 °C (기본: LOOKUP_TABLE_MAX_ERROR 또는 {DEFAULT_MAX_ERROR})")
+    args = parser.parse_args()
+    
+    print(f"📦 모델 로드: {args.model_path}")
+    model = joblib.load(args.model_path)
+    
+    start = time.perf_counter()
+    lut = build_lookup_table(model, args.model_path, axes=dict(args.axis),
+                             genders=args.genders.split(','), n_samples=args.samples)
+    elapsed = time.perf_counter() - start
+    
+    error = lut.metadata['error']
+    print(f"✅ 룩업 테이블 생성 완료 ({elapsed:.1f}초)")
+    print(f"  최대 오차: {error['max_abs_error']:.4f}°C, p99: {error['p99_abs_error']:.4f}°C, "
+          f"평균: {error['mean_abs_error']:.4f}°C (샘플 {error['n_samples']}개)")
+    print(f"💾 저장 완료: {', '.join(lookup_table_paths(args.model_path))}")
+    
+    if not lut.within_tolerance(args.max_error):
+        print(f"❌ 최대 오차 {error['max_abs_error']:.4f}°C가 허용 오차 {args.max_error}°C를 넘습니다. "
+              f"서버는 이 테이블을 사용하지 않습니다.")
+        print("   --axis로 격자 간격을 줄여 다시 생성하세요.")
+        sys.exit(1)
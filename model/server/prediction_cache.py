@@ -0,0 +1,155 @@
+"""
+양자화된 생체 입력값을 키로 하는 예측 결과 캐시 (LRU + TTL)
+
+수면 단계가 안정적인 동안 웨어러블은 거의 같은 값을 몇 분마다 다시 보내므로,
+입력값을 피처별 간격으로 양자화한 뒤 같은 구간이면 이전 예측 결과를 재사용합니다.
+예측은 양자화된 값(구간 대표값)으로 수행하여 캐시 적중 여부와 관계없이 결과가 같습니다.
+
+환경 변수:
+- PREDICTION_CACHE_SIZE: 최대 항목 수 (0이면 비활성화, 기본 4096)
+- PREDICTION_CACHE_TTL: 항목 유효 시간(초, 기본 600)
+- PREDICTION_CACHE_QUANTIZATION: 피처별 양자화 간격 (예: "hr_mean=0.5,hrv_sdnn=1", 0이면 양자화 안 함)
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+
+# 피처별 기본 양자화 간격
+DEFAULT_QUANTIZATION = {
+    'hr_mean': 0.5,     # bpm
+    'hrv_sdnn': 1.0,    # ms
+    'bmi': 0.1,
+    'mean_sa02': 0.5,   # %
+    'age': 1
+}
+
+DEFAULT_MAX_SIZE = 4096
+DEFAULT_TTL = 600.0
+
+
+def parse_quantization(text):
+    """'hr_mean=0.5,hrv_sdnn=1' 형식의 양자화 설정 파싱"""
+    quantization = {}
+    for item in text.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, step = item.partition('=')
+        quantization[name.strip()] = float(step)
+    return quantization
+
+
+class PredictionCache:
+    """스레드 안전한 LRU + TTL 예측 캐시"""
+    
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, ttl=DEFAULT_TTL, quantization=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.quantization = dict(DEFAULT_QUANTIZATION)
+        if quantization:
+            self.quantization.update(quantization)
+        
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @classmethod
+    def from_env(cls):
+        """환경 변수 설정으로 캐시 생성"""
+        return cls(
+            max_size=int(os.environ.get('PREDICTION_CACHE_SIZE', DEFAULT_MAX_SIZE)),
+            ttl=float(os.environ.get('PREDICTION_CACHE_TTL', DEFAULT_TTL)),
+            quantization=parse_quantization(os.environ.get('PREDICTION_CACHE_QUANTIZATION', ''))
+        )
+    
+    @property
+    def enabled(self):
+        return self.max_size > 0
+    
+    def quantize(self, inputs):
+        """
+        입력값을 양자화
+        
+        Returns:
+        - key: 구간 번호로 이루어진 캐시 키
+        - quantized: 구간 대표값으로 바꾼 입력 dict
+        """
+        key = []
+        quantized = {}
+        for name in sorted(inputs):
+            value = inputs[name]
+            step = self.quantization.get(name, 0)
+            if step and isinstance(value, (int, float)):
+                bucket = round(value / step)
+                value = bucket * step
+                value = int(round(value)) if isinstance(inputs[name], int) else round(value, 10)
+                key.append((name, bucket))
+            else:
+                key.append((name, value))
+            quantized[name] = value
+        return tuple(key), quantized
+    
+    def get_or_compute(self, inputs, compute, version=None):
+        """
+        캐시에서 예측 결과를 찾고, 없으면 양자화된 입력으로 계산하여 저장
+        
+        Parameters:
+        - inputs: 예측 함수 인자 dict
+        - compute: 양자화된 입력 dict를 키워드 인자로 받는 예측 함수
+        - version: 모델 버전 (모델 재로드 시 이전 결과와 섞이지 않도록 키에 포함)
+        
+        Returns:
+        - (예측값, 캐시 적중 여부)
+        """
+        if not self.enabled:
+            return compute(**inputs), False
+        
+        key, quantized = self.quantize(inputs)
+        key = (version, key)
+        now = time.monotonic()
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0], True
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+        
+        # 모델 계산은 잠금 밖에서 수행
+        value = compute(**quantized)
+        
+        with self._lock:
+            self._entries[key] = (value, now + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value, False
+    
+    def clear(self):
+        """모든 항목 삭제 (모델 재로드 시)"""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self):
+        """적중/실패 통계"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0,
+                'quantization': self.quantization
+            }
@@ -1,11 +1,33 @@
 #!/usr/bin/env python3
 """
 AI 체온 예측 서버 실행 스크립트
+
+사용법:
+    python run_server.py                      # 운영 서버 (gunicorn, 멀티 워커)
+    python run_server.py --workers 16 --bind 0.0.0.0:8000
+    python run_server.py --dev                # 개발 서버 (Flask, 코드 변경 시 재시작)
 """
 
 import sys
 import os
+import re
+import time
+import argparse
 import subprocess
+import importlib.util
+from importlib import metadata
+
+# 시작 시각 (콜드 스타트 시간 측정용)
+START_TIME = time.perf_counter()
+
+# requirements.txt 패키지명 → import 모듈명 (다른 것만)
+IMPORT_NAMES = {
+    'flask-cors': 'flask_cors',
+    'scikit-learn': 'sklearn'
+}
+
+# 운영 서버에서만 사용하는 패키지 (--dev에서는 확인하지 않음)
+PRODUCTION_ONLY = {'gunicorn'}
 
 def install_requirements():
     """필요한 패키지 설치"""
@@ -18,21 +40,110 @@ def install_requirements():
         print(f"❌ 패키지 설치 실패: {e}")
         return False
 
+def parse_version(text):
+    """'1.3.0' → (1, 3, 0) (숫자가 아닌 접미사는 무시)"""
+    parts = []
+    for part in text.split('.'):
+        match = re.match(r'\d+', part)
+        if match is None:
+            break
+        parts.append(int(match.group()))
+    return tuple(parts)
+
+def check_requirements(path="requirements.txt", skip=()):
+    """
+    설치 없이 requirements.txt의 패키지가 import 가능하고 최소 버전을 만족하는지 확인
+    
+    Parameters:
+    - skip: 확인하지 않을 패키지명 (소문자)
+    
+    Returns:
+    - 문제 목록 (비어 있으면 정상)
+    """
+    problems = []
+    with open(path, encoding='utf-8') as f:
+        lines = [line.split('#')[0].strip() for line in f]
+    
+    for line in lines:
+        if not line:
+            continue
+        match = re.match(r'([A-Za-z0-9_.\-]+)\s*(?:>=\s*([\w.]+))?', line)
+        name, minimum = match.group(1), match.group(2)
+        if name.lower() in skip:
+            continue
+        module = IMPORT_NAMES.get(name.lower(), name.lower().replace('-', '_'))
+        
+        if importlib.util.find_spec(module) is None:
+            problems.append(f"{name}: 설치되어 있지 않습니다")
+            continue
+        try:
+            installed = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            continue
+        if minimum and parse_version(installed) < parse_version(minimum):
+            problems.append(f"{name}: {installed} 설치됨, {minimum} 이상 필요")
+    
+    return problems
+
+def run_dev_server():
+    """Flask 개발 서버 실행 (단일 프로세스, 디버그 모드)"""
+    try:
+        from app import app, load_model
+        if load_model():
+            print(f"⏱️  콜드 스타트 완료: {time.perf_counter() - START_TIME:.2f}초")
+            app.run(host='0.0.0.0', port=5000, debug=True)
+        else:
+            print("❌ 모델 로드 실패로 서버를 시작할 수 없습니다.")
+    except KeyboardInterrupt:
+        print("\n👋 서버를 종료합니다.")
+    except Exception as e:
+        print(f"❌ 서버 실행 실패: {e}")
+
+def run_production_server(args):
+    """gunicorn 멀티 워커 서버 실행 (마스터에서 모델을 로드한 뒤 fork)"""
+    if args.workers:
+        os.environ['SERVER_WORKERS'] = str(args.workers)
+    if args.bind:
+        os.environ['SERVER_BIND'] = args.bind
+    
+    sys.stdout.flush()
+    command = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:app"]
+    try:
+        os.execv(sys.executable, command)
+    except OSError as e:
+        print(f"❌ gunicorn 실행 실패: {e}")
+        print("   pip install gunicorn 후 다시 시도하거나 --dev 옵션으로 개발 서버를 사용하세요.")
+
 def main():
     """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="AI 체온 예측 서버 실행")
+    parser.add_argument('--dev', action='store_true', help="Flask 개발 서버로 실행 (디버그 모드)")
+    parser.add_argument('--workers', type=int, help="워커 프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument('--bind', help="바인드 주소 (기본: 0.0.0.0:5000)")
+    parser.add_argument('--install', action='store_true', help="시작 전에 requirements.txt 패키지 설치")
+    args = parser.parse_args()
+    
     print("🚀 AI 체온 예측 서버를 시작합니다...")
     print("=" * 50)
     
     # 현재 디렉토리를 server 폴더로 변경
     os.chdir(os.path.dirname(os.path.abspath(__file__)))
     
-    # 패키지 설치
-    if not install_requirements():
+    # 패키지 설치 (--install) 또는 설치 없이 환경 확인
+    if args.install and not install_requirements():
         return
+    problems = check_requirements(skip=PRODUCTION_ONLY if args.dev else ())
+    if problems:
+        print("❌ 실행 환경이 requirements.txt와 맞지 않습니다:")
+        for problem in problems:
+            print(f"  - {problem}")
+        print("   python run_server.py --install 로 설치하세요.")
+        return
+    print(f"✅ 실행 환경 확인 완료 ({time.perf_counter() - START_TIME:.2f}초)")
     
     # 서버 실행
-    print("\n🌐 서버를 시작합니다...")
-    print("서버 주소: http://localhost:5000")
+    print(f"\n🌐 {'개발' if args.dev else '운영'} 서버를 시작합니다...")
+    print(f"서버 주소: http://{args.bind or '0.0.0.0:5000'}")
     print("API 문서:")
     print("  - GET  /health      : 서버 상태 확인")
     print("  - POST /predict     : 체온 예측")
@@ -40,16 +151,10 @@ def main():
     print("\n종료하려면 Ctrl+C를 누르세요.")
     print("=" * 50)
     
-    try:
-        from app import app, load_model
-        if load_model():
-            app.run(host='0.0.0.0', port=5000, debug=True)
-        else:
-            print("❌ 모델 로드 실패로 서버를 시작할 수 없습니다.")
-    except KeyboardInterrupt:
-        print("\n👋 서버를 종료합니다.")
-    except Exception as e:
-        print(f"❌ 서버 실행 실패: {e}")
+    if args.dev:
+        run_dev_server()
+    else:
+        run_production_server(args)
 
 if __name__ == "__main__":
     main()
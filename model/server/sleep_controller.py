@@ -0,0 +1,314 @@
+"""
+수면 중 에어컨 자동 제어 (서버 측 폐루프 컨트롤러)
+
+앱이 /sleep_control/biometrics로 최신 생체 신호를 올리면, 컨트롤러 데몬이 주기적으로
+predict_temperature()로 체온을 예측하고 분류 결과에 따라 에어컨 목표 온도를 조정합니다.
+- 히스테리시스: 예측 체온이 분류 경계를 margin 이상 넘어야 분류가 바뀜 (경계 근처에서 예측이 흔들려도 명령하지 않음)
+- 속도 제한: 목표 온도는 한 번에 step씩, min_interval 초에 한 번만 변경
+- 변경분만 전송: 마지막으로 적용한 설정(전원, 모드, 목표 온도)과 다른 항목만 apply_settings()로 보냄
+
+생체 신호와 컨트롤러 상태는 디렉토리의 JSON 파일로 공유하므로, gunicorn 워커 수와 관계없이
+데몬 하나가 모든 사용자를 제어합니다.
+
+사용법:
+    python sleep_controller.py
+
+환경 변수:
+- SLEEP_CONTROL_DIR: 생체 신호/상태 파일 경로 (기본 model/server/.sleep_control)
+- SLEEP_CONTROL_INTERVAL: 제어 주기(초, 기본 60)
+- SLEEP_CONTROL_MAX_AGE: 이 시간(초)보다 오래된 생체 신호는 무시 (기본 300)
+- SLEEP_CONTROL_MIN_INTERVAL: 목표 온도 변경 최소 간격(초, 기본 600)
+- SLEEP_CONTROL_TARGET / SLEEP_CONTROL_MIN / SLEEP_CONTROL_MAX / SLEEP_CONTROL_STEP: 시작 목표 온도, 범위, 변경 단위(°C)
+- SLEEP_CONTROL_HYSTERESIS: 분류 경계 여유(°C, 기본 0.1)
+- SLEEP_CONTROL_MODE: 작동 모드 (기본 COOL)
+"""
+
+import os
+import re
+import json
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.sleep_control')
+
+# 파일 이름으로 쓰므로 사용자 ID는 영문/숫자/-/_만 허용
+USER_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+# 분류별 목표 온도 조정 방향 (체온이 높으면 낮추고, 낮으면 올림)
+CATEGORY_ADJUSTMENT = {
+    "더움": -1,
+    "적정": 0,
+    "추움": 1
+}
+
+
+def classify_with_hysteresis(temp, previous, classify, margin):
+    """
+    히스테리시스를 적용한 온도 분류
+    
+    Parameters:
+    - temp: 예측 체온
+    - previous: 이전 분류 (None이면 그대로 분류)
+    - classify: 체온 → 분류 함수 (classify_temperature)
+    - margin: 경계 여유(°C), temp ± margin이 모두 새 분류여야 변경
+    
+    Returns:
+    - 분류
+    """
+    category = classify(temp)
+    if previous is None or category == previous:
+        return category
+    if classify(temp - margin) == category and classify(temp + margin) == category:
+        return category
+    return previous
+
+
+class BiometricsStore:
+    """사용자별 최신 생체 신호와 컨트롤러 상태를 저장하는 파일 저장소 (프로세스 간 공유)"""
+    
+    def __init__(self, directory=DEFAULT_DIR):
+        self.directory = directory
+    
+    @classmethod
+    def from_env(cls):
+        """환경 변수 설정으로 저장소 생성"""
+        return cls(os.environ.get('SLEEP_CONTROL_DIR', DEFAULT_DIR))
+    
+    def _path(self, user_id, kind):
+        if not USER_ID_PATTERN.match(str(user_id)):
+            raise ValueError(f"사용할 수 없는 user_id: {user_id}")
+        return os.path.join(self.directory, f"{user_id}.{kind}.json")
+    
+    def _write(self, path, data):
+        # 임시 파일에 쓴 뒤 교체하여 다른 프로세스가 쓰다 만 파일을 읽지 않게 함
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    
+    def _read(self, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def put_biometrics(self, user_id, record):
+        """최신 생체 신호 저장 (수신 시각 기록)"""
+        self._write(self._path(user_id, 'biometrics'), {'received_at': time.time(), 'record': record})
+    
+    def get_biometrics(self, user_id, max_age=None):
+        """
+        최신 생체 신호 조회
+        
+        Returns:
+        - 생체 신호 dict (없거나 max_age보다 오래되었으면 None)
+        """
+        entry = self._read(self._path(user_id, 'biometrics'))
+        if entry is None:
+            return None
+        if max_age is not None and time.time() - entry.get('received_at', 0) > max_age:
+            return None
+        return entry.get('record')
+    
+    def put_status(self, user_id, status):
+        """컨트롤러 상태 저장"""
+        self._write(self._path(user_id, 'status'), status)
+    
+    def get_status(self, user_id):
+        """컨트롤러 상태 조회 (없으면 None)"""
+        return self._read(self._path(user_id, 'status'))
+    
+    def user_ids(self):
+        """생체 신호가 있는 사용자 목록"""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        suffix = '.biometrics.json'
+        return sorted(name[:-len(suffix)] for name in names if name.endswith(suffix))
+
+
+class SleepClimateController:
+    """생체 신호 → 체온 예측 → 목표 온도 결정 → 변경분만 에어컨에 적용"""
+    
+    def __init__(self, store, predict, classify, actuate, default_device_id=None,
+                 interval=60.0, max_age=300.0, min_interval=600.0,
+                 initial_target=26.0, min_target=24.0, max_target=28.0, step=1.0,
+                 hysteresis=0.1, mode="COOL"):
+        """
+        Parameters:
+        - store: BiometricsStore
+        - predict: predict_temperature(hr_mean, hrv_sdnn, bmi, mean_sa02, gender, age) 함수
+        - classify: classify_temperature(temp) 함수
+        - actuate: apply_settings(device_id=..., power_on=..., mode=..., target_temp=...) 함수
+        - default_device_id: 생체 신호에 device_id가 없을 때 제어할 디바이스
+        """
+        self.store = store
+        self.predict = predict
+        self.classify = classify
+        self.actuate = actuate
+        self.default_device_id = default_device_id
+        self.interval = interval
+        self.max_age = max_age
+        self.min_interval = min_interval
+        self.initial_target = initial_target
+        self.min_target = min_target
+        self.max_target = max_target
+        self.step_size = step
+        self.hysteresis = hysteresis
+        self.mode = mode
+        self._states = {}    # user_id → 컨트롤러 상태
+    
+    @classmethod
+    def from_env(cls, store, predict, classify, actuate, default_device_id=None):
+        """환경 변수 설정으로 컨트롤러 생성"""
+        env = os.environ.get
+        return cls(
+            store, predict, classify, actuate, default_device_id=default_device_id,
+            interval=float(env('SLEEP_CONTROL_INTERVAL', 60)),
+            max_age=float(env('SLEEP_CONTROL_MAX_AGE', 300)),
+            min_interval=float(env('SLEEP_CONTROL_MIN_INTERVAL', 600)),
+            initial_target=float(env('SLEEP_CONTROL_TARGET', 26)),
+            min_target=float(env('SLEEP_CONTROL_MIN', 24)),
+            max_target=float(env('SLEEP_CONTROL_MAX', 28)),
+            step=float(env('SLEEP_CONTROL_STEP', 1)),
+            hysteresis=float(env('SLEEP_CONTROL_HYSTERESIS', 0.1)),
+            mode=env('SLEEP_CONTROL_MODE', 'COOL')
+        )
+    
+    def _state(self, user_id):
+        state = self._states.get(user_id)
+        if state is None:
+            # 데몬을 다시 시작해도 마지막 목표 온도와 적용 내역을 이어서 사용
+            saved = self.store.get_status(user_id) or {}
+            state = {
+                'category': saved.get('category'),
+                'target': saved.get('target', self.initial_target),
+                'applied': saved.get('applied', {}),
+                'device_id': saved.get('device_id'),
+                'last_change': saved.get('last_change', 0.0)
+            }
+            self._states[user_id] = state
+        return state
+    
+    def step(self, user_id, now=None):
+        """
+        사용자 한 명에 대해 제어 한 주기 수행
+        
+        Returns:
+        - 결정 내용 dict (action: skip / hold / apply)
+        """
+        now = time.time() if now is None else now
+        record = self.store.get_biometrics(user_id, max_age=self.max_age)
+        if record is None:
+            return {'user_id': user_id, 'action': 'skip', 'reason': '최신 생체 신호 없음'}
+        
+        state = self._state(user_id)
+        device_id = record.get('device_id') or self.default_device_id
+        if device_id != state['device_id']:
+            # 다른 디바이스는 적용 내역을 모르므로 처음부터 적용
+            state['applied'] = {}
+            state['device_id'] = device_id
+        
+        predicted = self.predict(
+            hr_mean=float(record['hr_mean']),
+            hrv_sdnn=float(record['hrv_sdnn']),
+            bmi=float(record['bmi']),
+            mean_sa02=float(record['mean_sa02']),
+            gender=str(record['gender']),
+            age=int(record['age'])
+        )
+        category = classify_with_hysteresis(predicted, state['category'], self.classify, self.hysteresis)
+        state['category'] = category
+        
+        target = state['target']
+        desired = target + CATEGORY_ADJUSTMENT.get(category, 0) * self.step_size
+        desired = min(self.max_target, max(self.min_target, desired))
+        rate_limited = desired != target and now - state['last_change'] < self.min_interval
+        if desired != target and not rate_limited:
+            state['target'] = desired
+            state['last_change'] = now
+        
+        settings = {'power_on': True, 'mode': self.mode, 'target_temp': state['target']}
+        changes = {key: value for key, value in settings.items() if state['applied'].get(key) != value}
+        
+        decision = {
+            'user_id': user_id,
+            'device_id': device_id,
+            'predicted_temperature': predicted,
+            'category': category,
+            'target': state['target'],
+            'rate_limited': rate_limited,
+            'action': 'apply' if changes else 'hold',
+            'changes': changes
+        }
+        
+        if changes:
+            self.actuate(device_id=device_id, **changes)
+            state['applied'].update(changes)
+            logger.info(f"🛏️  {user_id}: {predicted:.2f}°C ({category}) → {changes}")
+        
+        self.store.put_status(user_id, {
+            'updated_at': now,
+            'category': category,
+            'target': state['target'],
+            'applied': state['applied'],
+            'device_id': device_id,
+            'last_change': state['last_change'],
+            'last_decision': decision
+        })
+        return decision
+    
+    def run_once(self, now=None):
+        """생체 신호가 있는 모든 사용자에 대해 한 주기 수행 (사용자별 오류는 기록 후 계속)"""
+        decisions = []
+        for user_id in self.store.user_ids():
+            try:
+                decisions.append(self.step(user_id, now))
+            except Exception as e:
+                logger.error(f"수면 제어 실패 ({user_id}): {str(e)}")
+        return decisions
+    
+    def run_forever(self, stop_event=None):
+        """stop_event가 설정될 때까지 interval마다 run_once 실행"""
+        stop_event = stop_event or threading.Event()
+        logger.info(f"🛏️  수면 제어 시작 (주기 {self.interval:.0f}초)")
+        while not stop_event.is_set():
+            started = time.monotonic()
+            self.run_once()
+            stop_event.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+
+if __name__ == '__main__':
+    import sys
+    
+    logging.basicConfig(level=logging.INFO)
+    
+    # 모델 경로가 server 폴더 기준 상대 경로이므로 작업 디렉토리 고정
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    
+    import app as server
+    
+    if not server.AIR_CONDITIONER_AVAILABLE:
+        logger.error("에어컨 모듈을 사용할 수 없어 수면 제어를 시작할 수 없습니다.")
+        sys.exit(1)
+    if not server.load_model():
+        logger.error("모델 로드 실패로 수면 제어를 시작할 수 없습니다.")
+        sys.exit(1)
+    
+    controller = SleepClimateController.from_env(
+        BiometricsStore.from_env(),
+        predict=server.predict_temperature,
+        classify=server.classify_temperature,
+        actuate=server.apply_settings,
+        default_device_id=server.AIR_CONDITIONER_DEVICE_ID
+    )
+    try:
+        controller.run_forever()
+    except KeyboardInterrupt:
+        logger.info("수면 제어 종료")
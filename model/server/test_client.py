@@ -59,6 +59,7 @@ def test_prediction():
                 "gender": "F",
                 "age": 30
             }
+        },
         {
             "name": "높은 심박수 (40대 남성)",
             "data": {
@@ -119,6 +120,36 @@ def test_prediction():
         except Exception as e:
             print(f"❌ 예측 요청 실패: {e}")
 
+def test_batch_prediction():
+    """체온 일괄 예측 테스트"""
+    print("\n📦 체온 일괄 예측 테스트...")
+    
+    records = [
+        {"hr_mean": 72.0, "hrv_sdnn": 45.2, "bmi": 22.5, "mean_sa02": 98.5, "gender": "F", "age": 30},
+        {"hr_mean": 95.0, "hrv_sdnn": 35.8, "bmi": 25.1, "mean_sa02": 97.2, "gender": "M", "age": 45},
+        {"hr_mean": 65.0, "hrv_sdnn": 52.1, "bmi": 18.5, "mean_sa02": 99.1, "gender": "F", "age": 25},
+        {"hr_mean": 68.0, "hrv_sdnn": 28.5, "bmi": 24.0, "mean_sa02": 96.8, "gender": "M", "age": 72}
+    ]
+    
+    try:
+        response = requests.post(
+            f"{SERVER_URL}/predict_batch",
+            json={"records": records},
+            timeout=10
+        )
+        
+        if response.status_code == 200:
+            data = response.json()
+            print(f"✅ 예측 건수: {data['count']}")
+            for record, prediction in zip(records, data['predictions']):
+                print(f"  {record} -> {prediction['predicted_temperature']:.2f}°C ({prediction['temperature_category']})")
+        else:
+            print(f"❌ 서버 오류: {response.status_code}")
+            print(f"응답: {response.text}")
+            
+    except Exception as e:
+        print(f"❌ 일괄 예측 요청 실패: {e}")
+
 def main():
     """메인 테스트 함수"""
     print("🚀 AI 체온 예측 서버 테스트 시작")
@@ -136,6 +167,9 @@ def main():
     # 3. 예측 테스트
     test_prediction()
     
+    # 4. 일괄 예측 테스트
+    test_batch_prediction()
+    
     print("\n" + "=" * 50)
     print("✅ 테스트 완료!")
 
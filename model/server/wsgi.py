@@ -0,0 +1,37 @@
+"""
+운영 서버용 WSGI 진입점
+
+gunicorn이 preload_app 설정으로 마스터 프로세스에서 이 모듈을 한 번 import하여
+모델을 로드한 뒤 워커를 fork하므로, 모델과 평탄화 트리 배열은 워커 간에 copy-on-write로 공유됩니다.
+
+사용법:
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+import os
+import gc
+import sys
+import time
+import logging
+
+start_time = time.perf_counter()
+
+# 모델 경로가 server 폴더 기준 상대 경로이므로 작업 디렉토리 고정
+os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, load_model, set_single_threaded
+
+logger = logging.getLogger(__name__)
+
+if not load_model():
+    logger.error("모델 로드 실패로 서버를 시작할 수 없습니다.")
+    sys.exit(1)
+
+# 워커마다 트리 예측 스레드를 띄우지 않도록 단일 스레드로 (병렬화는 워커 수로)
+set_single_threaded()
+
+# 로드된 객체를 GC 추적 대상에서 빼서, 워커의 GC가 공유 페이지를 건드려 복사되지 않도록 함
+gc.collect()
+gc.freeze()
+
+logger.info(f"콜드 스타트 완료: {time.perf_counter() - start_time:.2f}초 (import + 모델 로드)")